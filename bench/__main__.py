@@ -0,0 +1,45 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.suite import compare, format_regressions, format_report, format_scaling, run_suite, scaling
+from bench.workloads import SYNTHETIC
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m bench', description='Time each phase of the Jan pipeline')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per workload; the best time is compared (default: 5)')
+    parser.add_argument('--quick', action='store_true', help='use small sizes for a fast smoke run')
+    parser.add_argument('--only', action='append', choices=sorted(SYNTHETIC),
+                        help='run just this synthetic workload (repeatable); skips the examples')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against a JSON file written by --output')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='fractional slowdown that counts as a regression (default: 0.10)')
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help='ignore phases faster than this in the baseline (default: 0.001)')
+    args = parser.parse_args()
+
+    # The recursion workload nests a few Python frames per Jan call.
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 20000))
+
+    report = run_suite(args.repeat, args.quick, args.only)
+    format_report(report)
+    format_scaling(scaling(report))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_seconds)
+        format_regressions(regressions, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
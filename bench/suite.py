@@ -0,0 +1,184 @@
+import contextlib
+import io
+import math
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from src import __version__
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+from src.tokens import TokenType
+
+from .workloads import examples, synthetic
+
+PHASES = ['lex', 'parse', 'interpret']
+
+class Tokens:
+    # Feeds already-lexed tokens to the parser so the parse phase does not
+    # include lexing.
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def tokenize(self):
+        return iter(self.tokens)
+
+def lex(source):
+    tokens = []
+    for token in RegexLexer(source).tokenize():
+        tokens.append(token)
+        if token.type == TokenType.EOF:
+            return tokens
+
+def parse(tokens):
+    return SimpleParser(Tokens(tokens)).parse()
+
+def interpret(program):
+    with contextlib.redirect_stdout(io.StringIO()):
+        Interpreter().interpret(program)
+
+def run_phases(source):
+    # Returns the seconds spent in each phase. The interpreter resolves the
+    # AST in place, so every run parses a fresh copy.
+    timings = {}
+    start = time.perf_counter()
+    tokens = lex(source)
+    timings['lex'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    program = parse(tokens)
+    timings['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    interpret(program)
+    timings['interpret'] = time.perf_counter() - start
+    return timings
+
+def measure_memory(source):
+    # Peak bytes allocated by each phase on top of what was already live
+    # when it started.
+    peaks = {}
+    tracemalloc.start()
+    try:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        tokens = lex(source)
+        peaks['lex'] = tracemalloc.get_traced_memory()[1] - current
+
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        program = parse(tokens)
+        peaks['parse'] = tracemalloc.get_traced_memory()[1] - current
+
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        interpret(program)
+        peaks['interpret'] = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+def measure(workload, size, source, repeat=5):
+    samples = [run_phases(source) for _ in range(repeat)]
+    peaks = measure_memory(source)
+    results = []
+    for phase in PHASES:
+        times = [sample[phase] for sample in samples]
+        results.append({
+            'workload': workload,
+            'size': size,
+            'phase': phase,
+            'seconds': min(times),
+            'median': statistics.median(times),
+            'peak_bytes': peaks[phase],
+        })
+    return results
+
+def run_suite(repeat=5, quick=False, only=None, include_examples=True):
+    results = []
+    if include_examples and not only:
+        for name, source in examples():
+            results.extend(measure('examples/' + name, len(source), source, repeat))
+    for name, size, source in synthetic(quick, only):
+        results.extend(measure(name, size, source, repeat))
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def result_key(result):
+    return (result['workload'], result['size'], result['phase'])
+
+def scaling(report):
+    # For each synthetic workload and phase, the exponent k in
+    # time ~ size ** k between the smallest and largest size measured.
+    by_series = {}
+    for result in report['results']:
+        if result['workload'].startswith('examples/'):
+            continue
+        by_series.setdefault((result['workload'], result['phase']), []).append(result)
+
+    rows = []
+    for (workload, phase), series in by_series.items():
+        series.sort(key=lambda result: result['size'])
+        first, last = series[0], series[-1]
+        if len(series) < 2 or first['seconds'] <= 0 or first['peak_bytes'] <= 0:
+            continue
+        size_ratio = math.log(last['size'] / first['size'])
+        rows.append({
+            'workload': workload,
+            'phase': phase,
+            'time_exponent': math.log(last['seconds'] / first['seconds']) / size_ratio,
+            'memory_exponent': math.log(max(last['peak_bytes'], 1) / first['peak_bytes']) / size_ratio,
+        })
+    return rows
+
+def compare(report, baseline, threshold=0.10, min_seconds=0.001):
+    # Entries present in both reports whose best time grew by more than
+    # threshold (a fraction: 0.10 is 10%). Phases faster than min_seconds in
+    # the baseline are mostly timer noise and are skipped.
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        before = previous.get(result_key(result))
+        if before is None or before['seconds'] < min_seconds or before['seconds'] <= 0:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        if change > threshold:
+            regressions.append({
+                'workload': result['workload'],
+                'size': result['size'],
+                'phase': result['phase'],
+                'baseline': before['seconds'],
+                'seconds': result['seconds'],
+                'change': change,
+            })
+    return regressions
+
+def format_report(report, out=sys.stdout):
+    print(f"{'workload':<28} {'size':>8} {'phase':<10} {'best ms':>10} {'median ms':>10} {'peak KiB':>10}", file=out)
+    for result in report['results']:
+        print(f"{result['workload']:<28} {result['size']:>8} {result['phase']:<10} "
+              f"{result['seconds'] * 1000:>10.3f} {result['median'] * 1000:>10.3f} "
+              f"{result['peak_bytes'] / 1024:>10.1f}", file=out)
+
+def format_scaling(rows, out=sys.stdout):
+    print(f"\n{'workload':<28} {'phase':<10} {'time ~ n^k':>10} {'memory ~ n^k':>13}", file=out)
+    for row in rows:
+        print(f"{row['workload']:<28} {row['phase']:<10} {row['time_exponent']:>10.2f} {row['memory_exponent']:>13.2f}", file=out)
+
+def format_regressions(regressions, threshold, out=sys.stdout):
+    if not regressions:
+        print(f"\nNo regressions above {threshold:.0%}", file=out)
+        return
+    print(f"\n{len(regressions)} regression(s) above {threshold:.0%}:", file=out)
+    for regression in regressions:
+        print(f"  {regression['workload']} size={regression['size']} {regression['phase']}: "
+              f"{regression['baseline'] * 1000:.3f} ms -> {regression['seconds'] * 1000:.3f} ms "
+              f"(+{regression['change']:.0%})", file=out)
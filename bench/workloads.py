@@ -0,0 +1,83 @@
+import glob
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLES = os.path.join(ROOT, 'examples')
+
+# Each generator returns Jan source whose cost grows linearly with n. The
+# grammar has no calls inside expressions and a function body runs until
+# its first top-level return, so loops drive a function that updates
+# globals and each body opens with a var (parameter lists are greedy).
+
+def while_loop(n):
+    return f"var i is 0\nwhile i < {n} i = i + 1\nvar result is i\nresult\n"
+
+def recursion(n):
+    return (
+        "var deepest is 0\n"
+        "function down d n\n"
+        "    var m is n - 1\n"
+        "    deepest = deepest + 1\n"
+        "    if n > 0 down 0 m\n"
+        "    return nil\n"
+        f"down 0 {n}\n"
+        "var result is deepest\n"
+        "result\n"
+    )
+
+def string_concat(n):
+    return (
+        'var s is ""\n'
+        "var i is 0\n"
+        "function tick d\n"
+        "    var t is d\n"
+        '    s = s + "x"\n'
+        "    i = i + 1\n"
+        "    return nil\n"
+        f"while i < {n} tick 0\n"
+        "var result is i\n"
+        "result\n"
+    )
+
+def many_globals(n):
+    lines = [f"var g{i} is {i}" for i in range(n)]
+    lines.append("var total is 0")
+    lines.extend(f"total = total + g{i}" for i in range(n))
+    lines.append("total")
+    return "\n".join(lines) + "\n"
+
+def large_file(n):
+    lines = []
+    for i in range(n):
+        lines.append(f"var x{i} is ({i} + 1) * 2 - {i} / 4")
+        lines.append(f'var s{i} is "line " + x{i}')
+        lines.append(f"if x{i} > {i} x{i} = x{i} - 1 else x{i} = x{i} + 1")
+    return "\n".join(lines) + "\n"
+
+SYNTHETIC = {
+    'while_loop': (while_loop, [10000, 40000, 160000]),
+    'recursion': (recursion, [100, 300, 900]),
+    'string_concat': (string_concat, [2000, 8000, 32000]),
+    'many_globals': (many_globals, [500, 2000, 8000]),
+    'large_file': (large_file, [500, 2000, 8000]),
+}
+
+QUICK_SIZES = {
+    'while_loop': [1000, 4000],
+    'recursion': [50, 150],
+    'string_concat': [200, 800],
+    'many_globals': [100, 400],
+    'large_file': [100, 400],
+}
+
+def examples():
+    for path in sorted(glob.glob(os.path.join(EXAMPLES, '*.jan'))):
+        with open(path) as f:
+            yield os.path.splitext(os.path.basename(path))[0], f.read()
+
+def synthetic(quick=False, only=None):
+    for name, (generate, sizes) in SYNTHETIC.items():
+        if only and name not in only:
+            continue
+        for size in (QUICK_SIZES[name] if quick else sizes):
+            yield name, size, generate(size)
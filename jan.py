@@ -1,37 +1,192 @@
 #!/usr/bin/env python3
 
+import argparse
 import sys
+from src.execution import ENGINES, parse
+from src.execution import execute as run_program
 from src.interpreter import Interpreter
-from src.lexer import Lexer
-from src.simple_parser import SimpleParser
+from src.limits import JanLimitError, parse_size
+from src.memo import DEFAULT_MEMO_SIZE
+
+# Distinct from the status of an uncaught Jan error, so job runners can
+# tell bad input from a program that was cut off.
+EXIT_LIMIT = 3
 
 def main():
-    if len(sys.argv) > 1:
-        with open(sys.argv[1], 'r') as f:
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(prog='jan', description='Run Jan programs',
+                                     epilog='commands: ' + ', '.join(COMMANDS) + ' (see jan.py COMMAND --help)')
+    parser.add_argument('file', nargs='?', help='Jan source file; starts the REPL when omitted')
+    parser.add_argument('--engine', choices=ENGINES, default='tree',
+                        help='execution engine (default: tree)')
+    parser.add_argument('-O', dest='optimize', action='store_true',
+                        help='fold constants and prune dead branches before running')
+    parser.add_argument('--memo-size', type=int, default=DEFAULT_MEMO_SIZE,
+                        help='entries cached per pure function by the tree engine; 0 disables memoization')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='always parse the source instead of using the compiled .janc cache')
+    parser.add_argument('--cache-dir', help='keep .janc files here instead of in __jancache__ next to the source')
+    parser.add_argument('--profile', action='store_true',
+                        help='report time per Jan function and source line (tree engine only)')
+    parser.add_argument('--profile-output', help='where --profile writes its JSON report (default: FILE.profile.json)')
+    parser.add_argument('--sample', action='store_true',
+                        help='sample the Jan call stack and write collapsed stacks for flamegraph tools (tree engine only)')
+    parser.add_argument('--sample-interval', type=float, default=5.0, help='milliseconds between samples (default: 5)')
+    parser.add_argument('--sample-output', help='where --sample writes its stacks (default: FILE.folded)')
+    parser.add_argument('--stats', action='store_true',
+                        help='print statement, environment, call and call-depth counters to stderr (tree engine only)')
+    add_limit_arguments(parser)
+    args = parser.parse_args()
+    limits = limits_from(args)
+    if limits and args.engine != 'tree':
+        parser.error('execution limits need the tree engine')
+    if args.profile and (args.engine != 'tree' or not args.file):
+        parser.error('--profile needs a file and the tree engine')
+    if args.sample and (args.engine != 'tree' or not args.file):
+        parser.error('--sample needs a file and the tree engine')
+
+    if args.file:
+        with open(args.file, 'r') as f:
             code = f.read()
-        run(code)
+        if args.cache:
+            from src.cache import load_program
+            ast = load_program(args.file, code, lambda source: parse(source, args.optimize),
+                               args.optimize, args.cache_dir)
+        else:
+            ast = parse(code, args.optimize)
+        if args.profile:
+            profile(ast, args.profile_output or args.file + '.profile.json', args.memo_size)
+        elif args.sample:
+            sample(ast, args.sample_output or args.file + '.folded', args.sample_interval / 1000, args.memo_size)
+        else:
+            execute(ast, args.engine, args.memo_size, args.stats, limits)
     else:
-        repl()
+        repl(args.engine, args.optimize, args.memo_size)
+
+def serve_command(argv):
+    from src.server import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_TIMEOUT, serve
+    parser = argparse.ArgumentParser(prog='jan serve', description='Run Jan snippets over HTTP for the playground')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'address to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'seconds a snippet may run (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--quiet', action='store_true', help='do not log requests')
+    parser.add_argument('--cors-origin', metavar='ORIGIN',
+                        help="origin allowed to call the server from a browser, e.g. http://localhost:3000 or '*'")
+    add_limit_arguments(parser)
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.timeout, not args.quiet, limits_from(args), args.cors_origin)
+
+def run_many_command(argv):
+    import json
+    from src.batch import BatchOptions, BatchSummary, expand, run_many, worker_count
+    parser = argparse.ArgumentParser(prog='jan run-many', description='Run many Jan programs in parallel')
+    parser.add_argument('files', nargs='+', help='Jan source files or glob patterns such as "tests/**/*.jan"')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--engine', choices=ENGINES, default='tree', help='execution engine (default: tree)')
+    parser.add_argument('-O', dest='optimize', action='store_true',
+                        help='fold constants and prune dead branches before running')
+    parser.add_argument('--memo-size', type=int, default=DEFAULT_MEMO_SIZE,
+                        help='entries cached per pure function by the tree engine; 0 disables memoization')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='always parse the sources instead of using the compiled .janc cache')
+    parser.add_argument('--cache-dir', help='keep .janc files here instead of in __jancache__ next to each source')
+    parser.add_argument('--timeout', type=float, help='seconds each program may run')
+    parser.add_argument('--json', action='store_true', help='print one JSON result per line instead of the outputs')
+    parser.add_argument('--quiet', action='store_true', help='only print failures and the summary')
+    add_limit_arguments(parser)
+    args = parser.parse_args(argv)
+    limits = limits_from(args)
+    if limits and args.engine != 'tree':
+        parser.error('execution limits need the tree engine')
+
+    paths = expand(args.files)
+    if not paths:
+        parser.error('no files matched')
+    options = BatchOptions(args.engine, args.optimize, args.memo_size, args.timeout, limits, args.cache, args.cache_dir)
+    summary = BatchSummary(worker_count(paths, args.workers))
+    for result in run_many(paths, options, args.workers):
+        summary.add(result)
+        if args.json:
+            print(json.dumps(result))
+        elif not args.quiet or result['status']:
+            print(f"==> {result['path']} (exit {result['status']}) <==")
+            sys.stdout.write(result['output'])
+            if result['error'] is not None:
+                print(f"Error: {result['error']}")
+    print(summary.format(), file=sys.stderr)
+    sys.exit(1 if summary.failed or summary.limited else 0)
+
+COMMANDS = {'serve': serve_command, 'run-many': run_many_command}
 
-def run(code):
-    lexer = Lexer(code)
-    parser = SimpleParser(lexer)
-    interpreter = Interpreter()
-    ast = parser.parse()
-    interpreter.interpret(ast)
+def run(code, engine='tree', optimize=False, memo_size=DEFAULT_MEMO_SIZE):
+    execute(parse(code, optimize), engine, memo_size)
 
-def repl():
+def execute(ast, engine='tree', memo_size=DEFAULT_MEMO_SIZE, stats=False, limits=None):
+    if engine != 'tree' or not (stats or limits):
+        run_program(ast, engine, memo_size)
+        return
+
+    interpreter = Interpreter(memo_size)
+    interpreter.instrument()
+    if limits:
+        interpreter.set_limits(**limits)
+    try:
+        run_program(ast, engine, memo_size, interpreter)
+    except JanLimitError as error:
+        print(f"Error: {error}", file=sys.stderr)
+        sys.exit(EXIT_LIMIT)
+    finally:
+        if stats:
+            for name, value in interpreter.stats().items():
+                print(f"{name}: {value}", file=sys.stderr)
+
+def add_limit_arguments(parser):
+    parser.add_argument('--max-statements', type=int, help='abort after this many statements (tree engine only)')
+    parser.add_argument('--max-depth', type=int, help='abort when calls nest deeper than this (tree engine only)')
+    parser.add_argument('--max-memory', type=parse_size,
+                        help='abort when Jan values take roughly more than this, e.g. 64M (tree engine only)')
+
+def limits_from(args):
+    limits = {'max_statements': args.max_statements, 'max_call_depth': args.max_depth, 'max_memory': args.max_memory}
+    return limits if any(value is not None for value in limits.values()) else None
+
+def profile(ast, output, memo_size=DEFAULT_MEMO_SIZE):
+    from src.profiler import ProfilingInterpreter
+    interpreter = ProfilingInterpreter(memo_size)
+    try:
+        interpreter.interpret(ast)
+    finally:
+        interpreter.print_report()
+        interpreter.write(output)
+
+def sample(ast, output, interval, memo_size=DEFAULT_MEMO_SIZE):
+    from src.sampler import Sampler
+    sampler = Sampler(interval)
+    sampler.start()
+    try:
+        execute(ast, 'tree', memo_size)
+    finally:
+        sampler.stop()
+        sampler.write(output)
+
+def repl(engine='tree', optimize=False, memo_size=DEFAULT_MEMO_SIZE):
+    from src.repl import ReplSession
     print("Jan Language REPL")
-    print("Type 'exit' to quit")
-    interpreter = Interpreter()
-    
+    print("Type 'exit' to quit; end a function with a blank line")
+    session = ReplSession(engine, optimize, memo_size)
+    more = False
+
     while True:
         try:
-            code = input("jan> ")
-            if code.strip() == "exit":
+            code = input("...> " if more else "jan> ")
+            if not more and code.strip() == "exit":
                 break
-            if code.strip():
-                run(code)
+            more = session.push(code)
         except KeyboardInterrupt:
             print("\nGoodbye!")
             break
@@ -39,7 +194,9 @@ def repl():
             print("\nGoodbye!")
             break
         except Exception as e:
+            more = False
+            session.reset_buffer()
             print(f"Error: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1 +1 @@
- 
\ No newline at end of file
+__version__ = "0.1.0"
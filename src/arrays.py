@@ -0,0 +1,217 @@
+import operator
+from array import array
+from itertools import repeat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Element storage: 64-bit integers while every element is an int, doubles
+# otherwise. With NumPy installed the same data lives in an ndarray and
+# whole-array operations run in NumPy; integer overflow then wraps instead
+# of widening to floats.
+INT = 'q'
+FLOAT = 'd'
+
+OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+def is_number(value):
+    return value.__class__ is int or value.__class__ is float
+
+def check_element(value):
+    if not is_number(value):
+        raise Exception("Array elements must be numbers")
+
+def typecode(values):
+    return INT if all(value.__class__ is int for value in values) else FLOAT
+
+def store(values, code=None):
+    # values is a list of Python numbers.
+    if code is None:
+        code = typecode(values)
+    try:
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.int64 if code == INT else numpy.float64)
+        return array(code, values)
+    except OverflowError:
+        if numpy is not None:
+            return numpy.array(values, dtype=numpy.float64)
+        return array(FLOAT, values)
+
+class JanArray:
+    __slots__ = ('data',)
+    # Arrays are mutable, so they are never used as memo keys.
+    __hash__ = None
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __eq__(self, other):
+        if other.__class__ is not JanArray:
+            return False
+        if numpy is not None:
+            return bool(numpy.array_equal(self.data, other.data))
+        return self.data.tolist() == other.data.tolist()
+
+    def __str__(self):
+        return "[" + ", ".join(str(value) for value in self.tolist()) + "]"
+
+    def __repr__(self):
+        return str(self)
+
+    @property
+    def nbytes(self):
+        return len(self.data) * self.data.itemsize
+
+    @property
+    def is_float(self):
+        if numpy is not None:
+            return self.data.dtype.kind == 'f'
+        return self.data.typecode == FLOAT
+
+    def tolist(self):
+        return self.data.tolist()
+
+    def get(self, index):
+        self.check_index(index)
+        value = self.data[index]
+        return value.item() if numpy is not None else value
+
+    def set(self, index, value):
+        self.check_index(index)
+        check_element(value)
+        if value.__class__ is float and not self.is_float:
+            self.data = store(self.data.tolist(), FLOAT)
+        try:
+            self.data[index] = value
+        except OverflowError:
+            self.data = store(self.data.tolist(), FLOAT)
+            self.data[index] = value
+
+    def check_index(self, index):
+        if index.__class__ is not int:
+            raise Exception("Array index must be an integer")
+        if not 0 <= index < len(self.data):
+            raise Exception(f"Array index {index} out of range for length {len(self.data)}")
+
+def make_array(values):
+    for value in values:
+        check_element(value)
+    return JanArray(store(values))
+
+def fill_array(value, count):
+    check_element(value)
+    if count.__class__ is not int or count < 0:
+        raise Exception("Array size must be a non-negative integer")
+    if numpy is not None:
+        return JanArray(numpy.full(count, value, dtype=store([value]).dtype))
+    return JanArray(store([value], INT if value.__class__ is int else FLOAT) * count)
+
+def array_operation(symbol, left, right):
+    # +, -, * and / between two arrays of the same length or an array and a
+    # number, applied to every element at once. Anything else gets the error
+    # the scalar operator would have raised.
+    function = OPERATIONS.get(symbol)
+    if function is None or not (left.__class__ is JanArray or right.__class__ is JanArray):
+        if symbol == '+':
+            raise Exception("Operands must be numbers or strings")
+        raise Exception(f"Operands must be numbers for {symbol}")
+
+    if left.__class__ is JanArray and right.__class__ is JanArray:
+        if len(left.data) != len(right.data):
+            raise Exception(f"Array lengths differ for {symbol}: {len(left.data)} and {len(right.data)}")
+        if symbol == '/' and 0 in right.data:
+            raise Exception("Division by zero")
+        if numpy is not None:
+            return JanArray(function(left.data, right.data))
+        values = list(map(function, left.data, right.data))
+        is_float = symbol == '/' or left.is_float or right.is_float
+    elif left.__class__ is JanArray:
+        if not is_number(right):
+            raise Exception(f"Operands must be numbers for {symbol}")
+        if symbol == '/' and right == 0:
+            raise Exception("Division by zero")
+        if numpy is not None:
+            return JanArray(function(left.data, right))
+        values = list(map(function, left.data, repeat(right, len(left.data))))
+        is_float = symbol == '/' or left.is_float or right.__class__ is float
+    else:
+        if not is_number(left):
+            raise Exception(f"Operands must be numbers for {symbol}")
+        if symbol == '/' and 0 in right.data:
+            raise Exception("Division by zero")
+        if numpy is not None:
+            return JanArray(function(left, right.data))
+        values = list(map(function, repeat(left, len(right.data)), right.data))
+        is_float = symbol == '/' or right.is_float or left.__class__ is float
+    return JanArray(store(values, FLOAT if is_float else INT))
+
+def negate_array(value):
+    if numpy is not None:
+        return JanArray(-value.data)
+    return JanArray(store(list(map(operator.neg, value.data)), value.data.typecode))
+
+def reduce_array(name, values):
+    if not len(values):
+        raise Exception(f"{name} of an empty array")
+    if numpy is not None:
+        return getattr(values, name)().item()
+    return (min if name == 'min' else max)(values)
+
+def array_sum(target):
+    if numpy is not None:
+        return target.data.sum().item()
+    return sum(target.data)
+
+def array_dot(target, other):
+    if other.__class__ is not JanArray:
+        raise Exception("dot needs an array")
+    if len(target.data) != len(other.data):
+        raise Exception(f"Array lengths differ for dot: {len(target.data)} and {len(other.data)}")
+    if numpy is not None:
+        return numpy.dot(target.data, other.data).item()
+    return sum(map(operator.mul, target.data, other.data))
+
+def array_copy(target):
+    if numpy is not None:
+        return JanArray(target.data.copy())
+    return JanArray(array(target.data.typecode, target.data))
+
+METHODS = {
+    'length': (0, lambda target: len(target.data)),
+    'sum': (0, array_sum),
+    'min': (0, lambda target: reduce_array('min', target.data)),
+    'max': (0, lambda target: reduce_array('max', target.data)),
+    'dot': (1, array_dot),
+    'copy': (0, array_copy),
+}
+
+def index_value(target, index):
+    if target.__class__ is not JanArray:
+        raise Exception("Can only index arrays")
+    return target.get(index)
+
+def store_index(target, index, value):
+    if target.__class__ is not JanArray:
+        raise Exception("Can only index arrays")
+    target.set(index, value)
+
+def call_method(target, name, arguments):
+    if target.__class__ is not JanArray:
+        raise Exception("Can only call methods on arrays")
+    method = METHODS.get(name)
+    if method is None:
+        raise Exception(f"Unknown array method '{name}'")
+    arity, function = method
+    if len(arguments) != arity:
+        raise Exception(f"Expected {arity} arguments but got {len(arguments)}")
+    return function(target, *arguments)
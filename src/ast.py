@@ -1,5 +1,5 @@
 class ASTNode:
-    pass
+    line = None
 
 class Program(ASTNode):
     def __init__(self, statements):
@@ -12,6 +12,10 @@ class Statement(ASTNode):
     pass
 
 class BinaryOp(Expression):
+    # Filled in at run time by the tree interpreter; see quicken.py.
+    inline_cache = None
+    respecializations = 0
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -40,16 +44,22 @@ class NilLiteral(Expression):
 class Identifier(Expression):
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = None
 
 class Assignment(Statement):
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
 
 class VariableDeclaration(Statement):
     def __init__(self, name, initializer):
         self.name = name
         self.initializer = initializer
+        self.depth = None
+        self.slot = None
 
 class IfStatement(Statement):
     def __init__(self, condition, then_branch, else_branch=None):
@@ -62,19 +72,37 @@ class WhileStatement(Statement):
         self.condition = condition
         self.body = body
 
+class ForStatement(Statement):
+    # for name from start to end [step step]; end is inclusive and step is
+    # None when omitted.
+    def __init__(self, name, start, end, step, body):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.step = step
+        self.body = body
+        self.depth = None
+        self.slot = None
+
 class Block(Statement):
     def __init__(self, statements):
         self.statements = statements
+        self.scope = None
 
 class FunctionDeclaration(Statement):
     def __init__(self, name, params, body):
         self.name = name
         self.params = params
         self.body = body
+        self.scope = None
+        self.param_slots = None
+        self.memoize = None
+        self.pure = False
 
 class IndentedBlock(Statement):
     def __init__(self, statements):
         self.statements = statements
+        self.scope = None
 
 class FunctionCall(Expression):
     def __init__(self, callee, arguments):
@@ -87,4 +115,30 @@ class ReturnStatement(Statement):
 
 class ExpressionStatement(Statement):
     def __init__(self, expression):
-        self.expression = expression 
\ No newline at end of file
+        self.expression = expression
+
+class ArrayLiteral(Expression):
+    def __init__(self, elements):
+        self.elements = elements
+
+class ArrayFill(Expression):
+    def __init__(self, value, count):
+        self.value = value
+        self.count = count
+
+class IndexExpression(Expression):
+    def __init__(self, target, index):
+        self.target = target
+        self.index = index
+
+class MethodCall(Expression):
+    def __init__(self, target, name, arguments):
+        self.target = target
+        self.name = name
+        self.arguments = arguments
+
+class IndexAssignment(Statement):
+    def __init__(self, target, index, value):
+        self.target = target
+        self.index = index
+        self.value = value
@@ -0,0 +1,131 @@
+import glob
+import multiprocessing
+import os
+import sys
+import time
+
+from .execution import parse, run_captured
+from .memo import DEFAULT_MEMO_SIZE
+
+# Per-file statuses match what `jan.py FILE` would have exited with.
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_LIMIT = 3
+
+def expand(patterns):
+    # Shells expand globs themselves, but quoted patterns (and Windows
+    # shells) leave them to us. Each file runs once, in the order given.
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+class BatchOptions:
+    def __init__(self, engine='tree', optimize=False, memo_size=DEFAULT_MEMO_SIZE, timeout=None,
+                 limits=None, cache=True, cache_dir=None, max_output=None):
+        self.engine = engine
+        self.optimize = optimize
+        self.memo_size = memo_size
+        self.timeout = timeout
+        self.limits = limits
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self.max_output = max_output
+
+def run_file(path, options):
+    start = time.perf_counter()
+    try:
+        with open(path, 'r') as f:
+            code = f.read()
+    except OSError as error:
+        return {'path': path, 'status': EXIT_ERROR, 'output': '', 'truncated': False,
+                'error': f"Cannot read {path}: {error.strerror}", 'limit': None,
+                'timing': {'parse_ms': 0.0, 'run_ms': 0.0, 'total_ms': 0.0}}
+
+    if options.cache:
+        from .cache import load_program
+
+        def build(source, optimize):
+            return load_program(path, source, lambda text: parse(text, optimize), optimize, options.cache_dir)
+    else:
+        build = parse
+
+    max_output = options.max_output if options.max_output is not None else sys.maxsize
+    result = run_captured(code, options.engine, options.optimize, options.memo_size, options.timeout,
+                          max_output, options.limits, build)
+    result['path'] = path
+    if result['limit'] is not None:
+        result['status'] = EXIT_LIMIT
+    elif result['error'] is not None:
+        result['status'] = EXIT_ERROR
+    else:
+        result['status'] = EXIT_OK
+    result['timing']['total_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+def run_task(task):
+    return run_file(*task)
+
+def worker_count(paths, processes=None):
+    return min(processes or os.cpu_count() or 1, max(len(paths), 1))
+
+def run_many(paths, options=None, processes=None, chunksize=None):
+    # Yields one result per file, in the order of paths, as soon as it and
+    # every file before it have finished.
+    options = options or BatchOptions()
+    processes = worker_count(paths, processes)
+    tasks = [(path, options) for path in paths]
+    if processes == 1:
+        for task in tasks:
+            yield run_task(task)
+        return
+
+    # Small chunks keep every worker busy when run times are uneven, large
+    # ones cut the per-task overhead when there are many tiny scripts.
+    if chunksize is None:
+        chunksize = max(1, min(16, len(tasks) // (processes * 8)))
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    with context.Pool(processes) as pool:
+        yield from pool.imap(run_task, tasks, chunksize)
+
+class BatchSummary:
+    def __init__(self, processes):
+        self.processes = processes
+        self.files = 0
+        self.failed = 0
+        self.limited = 0
+        self.run_ms = 0.0
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, result):
+        self.files += 1
+        if result['status'] == EXIT_LIMIT:
+            self.limited += 1
+        elif result['status'] != EXIT_OK:
+            self.failed += 1
+        self.run_ms += result['timing']['total_ms']
+        self.elapsed = time.perf_counter() - self.start
+
+    def to_dict(self):
+        return {
+            'files': self.files,
+            'passed': self.files - self.failed - self.limited,
+            'failed': self.failed,
+            'limited': self.limited,
+            'workers': self.processes,
+            'seconds': self.elapsed,
+            'files_per_second': self.files / self.elapsed if self.elapsed else 0.0,
+            'run_seconds': self.run_ms / 1000,
+        }
+
+    def format(self):
+        summary = self.to_dict()
+        return (f"{summary['files']} files: {summary['passed']} passed, {summary['failed']} failed, "
+                f"{summary['limited']} over limits in {summary['seconds']:.2f}s "
+                f"({summary['files_per_second']:.1f} files/s on {summary['workers']} workers)")
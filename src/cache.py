@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from . import __version__
+
+CACHE_DIR = '__jancache__'
+SUFFIX = '.janc'
+MAGIC = b'JANC'
+# Bumped whenever the pickled AST changes shape or the same source
+# parses differently.
+FORMAT = 4
+
+def cache_key(source, optimize=False):
+    digest = hashlib.sha256()
+    digest.update(f"{__version__}/{FORMAT}".encode())
+    digest.update(b'O' if optimize else b'-')
+    digest.update(source.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+def cache_path(source_path, cache_dir=None):
+    source_path = os.path.abspath(source_path)
+    directory, filename = os.path.split(source_path)
+    name = os.path.splitext(filename)[0]
+    if cache_dir is None:
+        return os.path.join(directory, CACHE_DIR, name + SUFFIX)
+    # A shared cache directory holds files from many places, so the name
+    # also carries a hash of where the source lives.
+    location = hashlib.sha1(source_path.encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}-{location}{SUFFIX}")
+
+def load(path, key):
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            if f.read(len(key)).decode('ascii') != key:
+                return None
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def store(path, key, program):
+    # Caching is best effort: an unwritable directory or a tree too deep to
+    # pickle just means the next run parses again.
+    try:
+        data = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(key.encode('ascii'))
+                f.write(data)
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        return True
+    except Exception:
+        return False
+
+def load_program(source_path, source, build, optimize=False, cache_dir=None):
+    key = cache_key(source, optimize)
+    path = cache_path(source_path, cache_dir)
+    program = load(path, key)
+    if program is None:
+        program = build(source)
+        store(path, key, program)
+    return program
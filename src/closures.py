@@ -0,0 +1,466 @@
+from .arrays import JanArray, array_operation, call_method, fill_array, index_value, make_array, negate_array, store_index
+from .ast import *
+from .interpreter import RETURNED, STACK_OVERFLOW, TAIL_CALLED, UNDEFINED, Environment, Return, for_range
+from .natives import NativeFunction, define_natives
+from .resolver import Resolver, Scope
+
+def is_number(value):
+    return isinstance(value, (int, float))
+
+def check_number_operands(operator, left, right):
+    if not is_number(left) or not is_number(right):
+        raise Exception(f"Operands must be numbers for {operator}")
+
+def add(left, right):
+    if is_number(left) and is_number(right):
+        return left + right
+    elif isinstance(left, JanArray) or isinstance(right, JanArray):
+        return array_operation('+', left, right)
+    elif isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    raise Exception("Operands must be numbers or strings")
+
+def divide(left, right):
+    if not is_number(left) or not is_number(right):
+        return array_operation('/', left, right)
+    if right == 0:
+        raise Exception("Division by zero")
+    return left / right
+
+def is_truthy(value):
+    return value is not None and value is not False
+
+def is_equal(a, b):
+    if a is None and b is None:
+        return True
+    if a is None:
+        return False
+    return a == b
+
+def numeric(operator, function):
+    def apply(left, right):
+        if not is_number(left) or not is_number(right):
+            check_number_operands(operator, left, right)
+        return function(left, right)
+    return apply
+
+def arithmetic(operator, function):
+    # Like numeric, but arrays combine element by element.
+    def apply(left, right):
+        if not is_number(left) or not is_number(right):
+            return array_operation(operator, left, right)
+        return function(left, right)
+    return apply
+
+BINARY_OPERATIONS = {
+    '+': add,
+    '-': arithmetic('-', lambda left, right: left - right),
+    '*': arithmetic('*', lambda left, right: left * right),
+    '/': divide,
+    '<': numeric('<', lambda left, right: left < right),
+    '<=': numeric('<=', lambda left, right: left <= right),
+    '>': numeric('>', lambda left, right: left > right),
+    '>=': numeric('>=', lambda left, right: left >= right),
+    '==': is_equal,
+    '!=': lambda left, right: not is_equal(left, right),
+    'and': lambda left, right: is_truthy(left) and is_truthy(right),
+    'or': lambda left, right: is_truthy(left) or is_truthy(right),
+}
+
+NUMBER_OPERATIONS = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+}
+
+class ClosureFunction:
+    def __init__(self, declaration, body, closure):
+        self.declaration = declaration
+        self.body = body
+        self.closure = closure
+
+    def __repr__(self):
+        return f"<function {self.declaration.name}>"
+
+    def call(self, arguments):
+        function = self
+        # Compiled statements return None, (RETURNED, value) or
+        # (TAIL_CALLED, function, arguments). Tail calls are run by this
+        # loop, so a chain of them uses a single Python frame.
+        while True:
+            declaration = function.declaration
+            environment = Environment(function.closure, declaration.scope)
+            values = environment.values
+            for i, slot in enumerate(declaration.param_slots):
+                values[slot] = arguments[i]
+
+            signal = function.body(environment)
+            if signal is None:
+                return None
+            if signal[0] is RETURNED:
+                return signal[1]
+            function, arguments = signal[1], signal[2]
+
+def check_callee(callee, count):
+    if callee.__class__ is NativeFunction:
+        callee.check_arity(count)
+    elif not isinstance(callee, ClosureFunction):
+        raise Exception("Can only call functions")
+    elif count != len(callee.declaration.params):
+        raise Exception(f"Expected {len(callee.declaration.params)} arguments but got {count}")
+
+class ClosureCompiler:
+    def __init__(self, globals_scope=None):
+        self.globals_scope = globals_scope if globals_scope is not None else Scope()
+
+    def compile(self, program):
+        Resolver(self.globals_scope).resolve(program)
+        statements = program.statements if isinstance(program, Program) else [program]
+        return self.compile_sequence(statements)
+
+    def compile_sequence(self, statements):
+        compiled = [self.compile_statement(statement) for statement in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run_sequence(env):
+            for statement in compiled:
+                signal = statement(env)
+                if signal is not None:
+                    return signal
+        return run_sequence
+
+    def compile_statement(self, stmt):
+        if isinstance(stmt, ExpressionStatement):
+            expression = self.compile_expression(stmt.expression)
+
+            def run_expression(env):
+                value = expression(env)
+                if value is not None:
+                    print(value)
+            return run_expression
+
+        elif isinstance(stmt, Assignment):
+            value_of = self.compile_expression(stmt.value)
+            name, slot = stmt.name, stmt.slot
+
+            if stmt.depth != 0:
+                def run_assignment(env):
+                    value = value_of(env)
+                    try:
+                        env.assign(name, value)
+                    except:
+                        env.define(name, value)
+                return run_assignment
+
+            def run_local_assignment(env):
+                value = value_of(env)
+                values = env.values
+                if values[slot] is not UNDEFINED:
+                    values[slot] = value
+                else:
+                    try:
+                        env.assign(name, value)
+                    except:
+                        values[slot] = value
+            return run_local_assignment
+
+        elif isinstance(stmt, VariableDeclaration):
+            value_of = self.compile_expression(stmt.initializer)
+            name, slot = stmt.name, stmt.slot
+
+            if stmt.depth != 0:
+                def run_declaration(env):
+                    env.define(name, value_of(env))
+                return run_declaration
+
+            def run_local_declaration(env):
+                env.values[slot] = value_of(env)
+            return run_local_declaration
+
+        elif isinstance(stmt, IfStatement):
+            condition = self.compile_expression(stmt.condition)
+            then_branch = self.compile_statement(stmt.then_branch)
+
+            if not stmt.else_branch:
+                def run_if(env):
+                    value = condition(env)
+                    if value is not None and value is not False:
+                        return then_branch(env)
+                return run_if
+
+            else_branch = self.compile_statement(stmt.else_branch)
+
+            def run_if_else(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    return then_branch(env)
+                return else_branch(env)
+            return run_if_else
+
+        elif isinstance(stmt, WhileStatement):
+            condition = self.compile_expression(stmt.condition)
+            body = self.compile_statement(stmt.body)
+
+            def run_while(env):
+                while True:
+                    value = condition(env)
+                    if value is None or value is False:
+                        return None
+                    signal = body(env)
+                    if signal is not None:
+                        return signal
+            return run_while
+
+        elif isinstance(stmt, ForStatement):
+            start_of = self.compile_expression(stmt.start)
+            end_of = self.compile_expression(stmt.end)
+            step_of = self.compile_expression(stmt.step) if stmt.step is not None else None
+            body = self.compile_statement(stmt.body)
+            slot = stmt.slot
+
+            def run_for(env):
+                start = start_of(env)
+                end = end_of(env)
+                step = step_of(env) if step_of is not None else 1
+                values = env.values
+                for value in for_range(start, end, step):
+                    values[slot] = value
+                    signal = body(env)
+                    if signal is not None:
+                        return signal
+            return run_for
+
+        elif isinstance(stmt, (Block, IndentedBlock)):
+            scope = stmt.scope
+            body = self.compile_sequence(stmt.statements)
+
+            def run_block(env):
+                return body(Environment(env, scope))
+            return run_block
+
+        elif isinstance(stmt, FunctionDeclaration):
+            body = self.compile_sequence(stmt.body.statements)
+
+            def run_function_declaration(env):
+                env.define(stmt.name, ClosureFunction(stmt, body, env))
+            return run_function_declaration
+
+        elif isinstance(stmt, ReturnStatement):
+            if not stmt.value:
+                def run_empty_return(env):
+                    return (RETURNED, None)
+                return run_empty_return
+
+            if isinstance(stmt.value, FunctionCall):
+                callee_of = self.compile_expression(stmt.value.callee)
+                arguments_of = [self.compile_expression(argument) for argument in stmt.value.arguments]
+                count = len(arguments_of)
+
+                def run_tail_call(env):
+                    callee = callee_of(env)
+                    check_callee(callee, count)
+                    arguments = [argument(env) for argument in arguments_of]
+                    if callee.__class__ is NativeFunction:
+                        return (RETURNED, callee.function(*arguments))
+                    return (TAIL_CALLED, callee, arguments)
+                return run_tail_call
+
+            value_of = self.compile_expression(stmt.value)
+
+            def run_return(env):
+                return (RETURNED, value_of(env))
+            return run_return
+
+        elif isinstance(stmt, IndexAssignment):
+            target_of = self.compile_expression(stmt.target)
+            index_of = self.compile_expression(stmt.index)
+            value_of = self.compile_expression(stmt.value)
+
+            def run_index_assignment(env):
+                target = target_of(env)
+                store_index(target, index_of(env), value_of(env))
+            return run_index_assignment
+
+        def run_nothing(env):
+            pass
+        return run_nothing
+
+    def compile_expression(self, expr):
+        if isinstance(expr, BinaryOp):
+            return self.compile_binary(expr)
+
+        elif isinstance(expr, UnaryOp):
+            operand = self.compile_expression(expr.operand)
+
+            if expr.operator == '-':
+                def negate(env):
+                    value = operand(env)
+                    if not is_number(value):
+                        if isinstance(value, JanArray):
+                            return negate_array(value)
+                        raise Exception("Operand must be a number for -")
+                    return -value
+                return negate
+
+            if expr.operator == '!':
+                def logical_not(env):
+                    value = operand(env)
+                    return value is None or value is False
+                return logical_not
+
+            def unknown_unary(env):
+                operand(env)
+                return None
+            return unknown_unary
+
+        elif isinstance(expr, (NumberLiteral, StringLiteral, BooleanLiteral)):
+            value = expr.value
+
+            def constant(env):
+                return value
+            return constant
+
+        elif isinstance(expr, Identifier):
+            return self.compile_identifier(expr)
+
+        elif isinstance(expr, FunctionCall):
+            return self.compile_call(expr)
+
+        elif isinstance(expr, IndexExpression):
+            target_of = self.compile_expression(expr.target)
+            index_of = self.compile_expression(expr.index)
+
+            def index(env):
+                return index_value(target_of(env), index_of(env))
+            return index
+
+        elif isinstance(expr, MethodCall):
+            target_of = self.compile_expression(expr.target)
+            arguments_of = [self.compile_expression(argument) for argument in expr.arguments]
+            name = expr.name
+
+            def method_call(env):
+                target = target_of(env)
+                return call_method(target, name, [argument(env) for argument in arguments_of])
+            return method_call
+
+        elif isinstance(expr, ArrayLiteral):
+            elements_of = [self.compile_expression(element) for element in expr.elements]
+
+            def array_literal(env):
+                return make_array([element(env) for element in elements_of])
+            return array_literal
+
+        elif isinstance(expr, ArrayFill):
+            value_of = self.compile_expression(expr.value)
+            count_of = self.compile_expression(expr.count)
+
+            def array_fill(env):
+                return fill_array(value_of(env), count_of(env))
+            return array_fill
+
+        def nil(env):
+            return None
+        return nil
+
+    def compile_identifier(self, expr):
+        name, depth, slot = expr.name, expr.depth, expr.slot
+
+        if depth is None:
+            def load_name(env):
+                return env.get(name)
+            return load_name
+
+        if depth == 0:
+            def load_local(env):
+                value = env.values[slot]
+                if value is UNDEFINED:
+                    return env.get(name)
+                return value
+            return load_local
+
+        def load_enclosing(env):
+            environment = env
+            for _ in range(depth):
+                environment = environment.enclosing
+            value = environment.values[slot]
+            if value is UNDEFINED:
+                return env.get(name)
+            return value
+        return load_enclosing
+
+    def compile_binary(self, expr):
+        left = self.compile_expression(expr.left)
+        operation = BINARY_OPERATIONS.get(expr.operator)
+
+        if operation is None:
+            right = self.compile_expression(expr.right)
+
+            def unknown_binary(env):
+                left(env)
+                right(env)
+                return None
+            return unknown_binary
+
+        fast = NUMBER_OPERATIONS.get(expr.operator)
+        if fast is not None and isinstance(expr.right, NumberLiteral) and is_number(expr.right.value):
+            constant = expr.right.value
+
+            def binary_constant(env):
+                value = left(env)
+                if isinstance(value, (int, float)):
+                    return fast(value, constant)
+                return operation(value, constant)
+            return binary_constant
+
+        right = self.compile_expression(expr.right)
+
+        def binary(env):
+            return operation(left(env), right(env))
+        return binary
+
+    def compile_call(self, expr):
+        callee_of = self.compile_expression(expr.callee)
+        arguments_of = [self.compile_expression(argument) for argument in expr.arguments]
+        count = len(arguments_of)
+
+        def call(env):
+            callee = callee_of(env)
+
+            if callee.__class__ is NativeFunction:
+                callee.check_arity(count)
+                return callee.function(*[argument(env) for argument in arguments_of])
+
+            if not isinstance(callee, ClosureFunction):
+                raise Exception("Can only call functions")
+
+            if count != len(callee.declaration.params):
+                raise Exception(f"Expected {len(callee.declaration.params)} arguments but got {count}")
+
+            return callee.call([argument(env) for argument in arguments_of])
+        return call
+
+class ClosureInterpreter:
+    def __init__(self):
+        self.globals = Environment()
+        define_natives(self.globals)
+
+    def interpret(self, program):
+        code = ClosureCompiler(self.globals.scope).compile(program)
+        self.globals.grow()
+        try:
+            signal = code(self.globals)
+            if signal is None:
+                return
+            # A return outside any function ends the program like it does in
+            # the other engines.
+            if signal[0] is TAIL_CALLED:
+                raise Return(signal[1].call(signal[2]))
+            raise Return(signal[1])
+        except RecursionError:
+            raise Exception(STACK_OVERFLOW) from None
@@ -0,0 +1,295 @@
+from .ast import *
+from .resolver import Resolver, Scope
+
+LOAD_CONST = 0
+LOAD_NAME = 1
+STORE_NAME = 2
+DEFINE_NAME = 3
+POP = 4
+PRINT = 5
+ADD = 6
+SUBTRACT = 7
+MULTIPLY = 8
+DIVIDE = 9
+EQUAL = 10
+NOT_EQUAL = 11
+LESS = 12
+LESS_EQUAL = 13
+GREATER = 14
+GREATER_EQUAL = 15
+AND = 16
+OR = 17
+NEGATE = 18
+NOT = 19
+JUMP = 20
+JUMP_IF_FALSE = 21
+ENTER_SCOPE = 22
+EXIT_SCOPE = 23
+MAKE_FUNCTION = 24
+CHECK_CALL = 25
+CALL = 26
+RETURN = 27
+HALT = 28
+LOAD_LOCAL = 29
+LOAD_GLOBAL = 30
+STORE_LOCAL = 31
+DEFINE_LOCAL = 32
+BUILD_ARRAY = 33
+FILL_ARRAY = 34
+INDEX = 35
+STORE_INDEX = 36
+CALL_METHOD = 37
+FOR_RANGE = 38
+FOR_ITER = 39
+
+OPCODE_NAMES = {value: name for name, value in list(globals().items())
+                if name.isupper() and isinstance(value, int)}
+
+BINARY_OPCODES = {
+    '+': ADD,
+    '-': SUBTRACT,
+    '*': MULTIPLY,
+    '/': DIVIDE,
+    '==': EQUAL,
+    '!=': NOT_EQUAL,
+    '<': LESS,
+    '<=': LESS_EQUAL,
+    '>': GREATER,
+    '>=': GREATER_EQUAL,
+    'and': AND,
+    'or': OR,
+}
+
+UNARY_OPCODES = {
+    '-': NEGATE,
+    '!': NOT,
+}
+
+class Chunk:
+    def __init__(self, name):
+        self.name = name
+        self.code = []
+        self.constants = []
+        self.names = []
+        self.variables = []
+        self.constant_index = {}
+        self.name_index = {}
+        self.variable_index = {}
+        self.scope = None
+
+    def emit(self, opcode, argument=0):
+        self.code.append(opcode)
+        self.code.append(argument)
+        return len(self.code) - 2
+
+    def patch(self, position, argument):
+        self.code[position + 1] = argument
+
+    def add_constant(self, value):
+        key = (type(value), value)
+        if key not in self.constant_index:
+            self.constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_index[key]
+
+    def add_name(self, name):
+        if name not in self.name_index:
+            self.name_index[name] = len(self.names)
+            self.names.append(name)
+        return self.name_index[name]
+
+    def add_variable(self, slot, name):
+        key = (slot, name)
+        if key not in self.variable_index:
+            self.variable_index[key] = len(self.variables)
+            self.variables.append(key)
+        return self.variable_index[key]
+
+    def disassemble(self):
+        lines = []
+        for position in range(0, len(self.code), 2):
+            opcode = self.code[position]
+            argument = self.code[position + 1]
+            line = f"{position:04d} {OPCODE_NAMES[opcode]:<14} {argument}"
+            if opcode == LOAD_CONST:
+                line += f" ({self.constants[argument]!r})"
+            elif opcode in (LOAD_NAME, STORE_NAME, DEFINE_NAME):
+                line += f" ({self.names[argument]})"
+            elif opcode in (LOAD_LOCAL, LOAD_GLOBAL, STORE_LOCAL, DEFINE_LOCAL):
+                line += " (%s @ %d)" % (self.variables[argument][1], self.variables[argument][0])
+            lines.append(line)
+        return "\n".join(lines)
+
+class FunctionPrototype:
+    def __init__(self, name, params, chunk, scope=None, param_slots=None):
+        self.name = name
+        self.params = params
+        self.chunk = chunk
+        self.scope = scope
+        self.param_slots = param_slots
+
+    def __repr__(self):
+        return f"<prototype {self.name}>"
+
+class Compiler:
+    def __init__(self, globals_scope=None):
+        self.globals_scope = globals_scope if globals_scope is not None else Scope()
+        self.chunk = None
+        self.depth = 0
+
+    def compile(self, program):
+        Resolver(self.globals_scope).resolve(program)
+        chunk = Chunk("<main>")
+        chunk.scope = self.globals_scope
+        statements = program.statements if isinstance(program, Program) else [program]
+        self.compile_body(chunk, statements)
+        chunk.emit(HALT)
+        return chunk
+
+    def compile_function(self, name, statements):
+        chunk = Chunk(name)
+        self.compile_body(chunk, statements)
+        chunk.emit(LOAD_CONST, chunk.add_constant(None))
+        chunk.emit(RETURN)
+        return chunk
+
+    def compile_body(self, chunk, statements):
+        previous = self.chunk
+        self.chunk = chunk
+        try:
+            for statement in statements:
+                self.compile_statement(statement)
+        finally:
+            self.chunk = previous
+
+    def compile_statement(self, stmt):
+        chunk = self.chunk
+        if isinstance(stmt, ExpressionStatement):
+            self.compile_expression(stmt.expression)
+            chunk.emit(PRINT)
+        elif isinstance(stmt, Assignment):
+            self.compile_expression(stmt.value)
+            if stmt.depth == 0:
+                chunk.emit(STORE_LOCAL, chunk.add_variable(stmt.slot, stmt.name))
+            else:
+                chunk.emit(STORE_NAME, chunk.add_name(stmt.name))
+        elif isinstance(stmt, VariableDeclaration):
+            self.compile_expression(stmt.initializer)
+            if stmt.depth == 0:
+                chunk.emit(DEFINE_LOCAL, chunk.add_variable(stmt.slot, stmt.name))
+            else:
+                chunk.emit(DEFINE_NAME, chunk.add_name(stmt.name))
+        elif isinstance(stmt, IfStatement):
+            self.compile_expression(stmt.condition)
+            else_jump = chunk.emit(JUMP_IF_FALSE)
+            self.compile_statement(stmt.then_branch)
+            if stmt.else_branch:
+                end_jump = chunk.emit(JUMP)
+                chunk.patch(else_jump, len(chunk.code))
+                self.compile_statement(stmt.else_branch)
+                chunk.patch(end_jump, len(chunk.code))
+            else:
+                chunk.patch(else_jump, len(chunk.code))
+        elif isinstance(stmt, WhileStatement):
+            loop_start = len(chunk.code)
+            self.compile_expression(stmt.condition)
+            exit_jump = chunk.emit(JUMP_IF_FALSE)
+            self.compile_statement(stmt.body)
+            chunk.emit(JUMP, loop_start)
+            chunk.patch(exit_jump, len(chunk.code))
+        elif isinstance(stmt, ForStatement):
+            # The range iterator stays on the stack while the loop runs;
+            # FOR_ITER pushes its next value or pops it and jumps out.
+            self.compile_expression(stmt.start)
+            self.compile_expression(stmt.end)
+            if stmt.step is not None:
+                self.compile_expression(stmt.step)
+            else:
+                chunk.emit(LOAD_CONST, chunk.add_constant(1))
+            chunk.emit(FOR_RANGE)
+            loop_start = chunk.emit(FOR_ITER)
+            chunk.emit(DEFINE_LOCAL, chunk.add_variable(stmt.slot, stmt.name))
+            self.compile_statement(stmt.body)
+            chunk.emit(JUMP, loop_start)
+            chunk.patch(loop_start, len(chunk.code))
+        elif isinstance(stmt, (Block, IndentedBlock)):
+            chunk.emit(ENTER_SCOPE, chunk.add_constant(stmt.scope))
+            self.depth += 1
+            for statement in stmt.statements:
+                self.compile_statement(statement)
+            self.depth -= 1
+            chunk.emit(EXIT_SCOPE)
+        elif isinstance(stmt, FunctionDeclaration):
+            self.depth += 1
+            body = self.compile_function(stmt.name, stmt.body.statements)
+            self.depth -= 1
+            prototype = FunctionPrototype(stmt.name, stmt.params, body, stmt.scope, stmt.param_slots)
+            chunk.emit(LOAD_CONST, chunk.add_constant(prototype))
+            chunk.emit(MAKE_FUNCTION)
+            chunk.emit(DEFINE_NAME, chunk.add_name(stmt.name))
+        elif isinstance(stmt, ReturnStatement):
+            if stmt.value:
+                self.compile_expression(stmt.value)
+            else:
+                chunk.emit(LOAD_CONST, chunk.add_constant(None))
+            chunk.emit(RETURN)
+        elif isinstance(stmt, IndexAssignment):
+            self.compile_expression(stmt.target)
+            self.compile_expression(stmt.index)
+            self.compile_expression(stmt.value)
+            chunk.emit(STORE_INDEX)
+
+    def compile_expression(self, expr):
+        chunk = self.chunk
+        if isinstance(expr, BinaryOp):
+            self.compile_expression(expr.left)
+            self.compile_expression(expr.right)
+            opcode = BINARY_OPCODES.get(expr.operator)
+            if opcode is None:
+                chunk.emit(POP)
+                chunk.emit(POP)
+                chunk.emit(LOAD_CONST, chunk.add_constant(None))
+            else:
+                chunk.emit(opcode)
+        elif isinstance(expr, UnaryOp):
+            self.compile_expression(expr.operand)
+            opcode = UNARY_OPCODES.get(expr.operator)
+            if opcode is None:
+                chunk.emit(POP)
+                chunk.emit(LOAD_CONST, chunk.add_constant(None))
+            else:
+                chunk.emit(opcode)
+        elif isinstance(expr, (NumberLiteral, StringLiteral, BooleanLiteral)):
+            chunk.emit(LOAD_CONST, chunk.add_constant(expr.value))
+        elif isinstance(expr, Identifier):
+            if expr.depth == 0:
+                chunk.emit(LOAD_LOCAL, chunk.add_variable(expr.slot, expr.name))
+            elif expr.depth is not None and expr.depth == self.depth:
+                chunk.emit(LOAD_GLOBAL, chunk.add_variable(expr.slot, expr.name))
+            else:
+                chunk.emit(LOAD_NAME, chunk.add_name(expr.name))
+        elif isinstance(expr, FunctionCall):
+            self.compile_expression(expr.callee)
+            chunk.emit(CHECK_CALL, len(expr.arguments))
+            for argument in expr.arguments:
+                self.compile_expression(argument)
+            chunk.emit(CALL, len(expr.arguments))
+        elif isinstance(expr, IndexExpression):
+            self.compile_expression(expr.target)
+            self.compile_expression(expr.index)
+            chunk.emit(INDEX)
+        elif isinstance(expr, MethodCall):
+            self.compile_expression(expr.target)
+            for argument in expr.arguments:
+                self.compile_expression(argument)
+            chunk.emit(CALL_METHOD, chunk.add_constant((expr.name, len(expr.arguments))))
+        elif isinstance(expr, ArrayLiteral):
+            for element in expr.elements:
+                self.compile_expression(element)
+            chunk.emit(BUILD_ARRAY, len(expr.elements))
+        elif isinstance(expr, ArrayFill):
+            self.compile_expression(expr.value)
+            self.compile_expression(expr.count)
+            chunk.emit(FILL_ARRAY)
+        else:
+            chunk.emit(LOAD_CONST, chunk.add_constant(None))
@@ -0,0 +1,121 @@
+import contextlib
+import io
+import signal
+import time
+
+from .interpreter import Interpreter, Return
+from .limits import JanLimitError
+from .memo import DEFAULT_MEMO_SIZE
+
+ENGINES = ['tree', 'vm', 'closure']
+
+def parse(code, optimize=False):
+    from .lexer import RegexLexer
+    from .simple_parser import SimpleParser
+    ast = SimpleParser(RegexLexer(code)).parse()
+    if optimize:
+        from .optimizer import Optimizer
+        ast = Optimizer().optimize(ast)
+    return ast
+
+def execute(ast, engine='tree', memo_size=DEFAULT_MEMO_SIZE, interpreter=None):
+    if engine == 'vm':
+        from .compiler import Compiler
+        from .vm import VM
+        vm = VM()
+        vm.run(Compiler(vm.globals.scope).compile(ast))
+    elif engine == 'closure':
+        from .closures import ClosureInterpreter
+        ClosureInterpreter().interpret(ast)
+    else:
+        if interpreter is None:
+            interpreter = Interpreter(memo_size)
+        interpreter.interpret(ast)
+
+class TimeLimitExceeded(Exception):
+    pass
+
+@contextlib.contextmanager
+def time_limit(seconds):
+    # Interrupts the running program from a SIGALRM timer. Only the main
+    # thread of a process can receive it, which is where pool workers run
+    # their tasks; elsewhere the limit is not enforced.
+    if not seconds or not hasattr(signal, 'setitimer'):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeLimitExceeded(f"Time limit of {seconds:g}s exceeded")
+
+    try:
+        previous = signal.signal(signal.SIGALRM, expire)
+    except ValueError:
+        yield
+        return
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def has_limits(limits):
+    # limits holds Interpreter.set_limits keyword arguments; None or an empty
+    # dict means no limits.
+    return bool(limits) and any(value is not None for value in limits.values())
+
+def limit_engines(limits):
+    # The engines that can run under these limits. Only the tree engine can
+    # enforce them.
+    return ['tree'] if has_limits(limits) else ENGINES
+
+def limited_interpreter(engine, memo_size, limits):
+    if not has_limits(limits):
+        return None
+    if engine != 'tree':
+        raise Exception("Execution limits are only supported by the tree engine")
+    interpreter = Interpreter(memo_size)
+    interpreter.set_limits(**limits)
+    return interpreter
+
+def run_captured(code, engine='tree', optimize=False, memo_size=DEFAULT_MEMO_SIZE, timeout=None,
+                 max_output=100000, limits=None, build=parse):
+    # Runs a snippet and returns what it printed instead of printing it.
+    # build(code, optimize) turns the source into a program, so callers
+    # can put a cache in front of the parser.
+    output = io.StringIO()
+    error = None
+    limit = None
+    parse_seconds = run_seconds = 0.0
+    try:
+        with time_limit(timeout):
+            start = time.perf_counter()
+            ast = build(code, optimize)
+            parse_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(output):
+                    execute(ast, engine, memo_size, limited_interpreter(engine, memo_size, limits))
+            except Return as returned:
+                if returned.value is not None:
+                    output.write(f"{returned.value}\n")
+            finally:
+                run_seconds = time.perf_counter() - start
+    except JanLimitError as e:
+        error = str(e)
+        limit = e.to_dict()
+    except RecursionError:
+        error = "Maximum recursion depth exceeded"
+    except Exception as e:
+        error = str(e)
+
+    text = output.getvalue()
+    truncated = len(text) > max_output
+    return {
+        'output': text[:max_output],
+        'truncated': truncated,
+        'error': error,
+        'limit': limit,
+        'timing': {'parse_ms': parse_seconds * 1000, 'run_ms': run_seconds * 1000},
+    }
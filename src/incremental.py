@@ -0,0 +1,427 @@
+from bisect import bisect_left, bisect_right
+
+from .ast import *
+from .lexer import lex_line
+from .simple_parser import SimpleParser
+from .tokens import Token, TokenType
+
+CHUNK_LINES = 64
+
+class PositionedToken(Token):
+    # A token that also knows where it is stored: (document line, index in line).
+    __slots__ = ('position',)
+
+    def __init__(self, type, value, line, column, position):
+        Token.__init__(self, type, value, line, column)
+        self.position = position
+
+class Chunk:
+    # A run of consecutive lines with their tokens, lexer states and errors.
+    # `start` is the document line of the first one and the only absolute
+    # position kept: statements belong to the chunk their first token is in
+    # and are stored relative to it, so adding lines above only moves chunk
+    # starts. `applied` is the start the line numbers in those statements'
+    # trees were last brought up to date with.
+    __slots__ = ('start', 'applied', 'lines', 'states', 'tokens', 'errors', 'statements')
+
+    def __init__(self, start, lines, states, tokens, errors, statements):
+        self.start = start
+        self.applied = start
+        self.lines = lines
+        self.states = states
+        self.tokens = tokens
+        self.errors = errors
+        self.statements = statements
+
+class ParsedStatement:
+    # A top-level statement. start is (line in its chunk, token index); end,
+    # the token after it, and seen, the furthest token the parser looked at
+    # for it or any statement before it, are (lines after start, token index).
+    # It can be reused as long as the tokens up to seen are unchanged.
+    __slots__ = ('node', 'chunk', 'start', 'end', 'seen')
+
+    def __init__(self, node, chunk, start, end, seen):
+        self.node = node
+        self.chunk = chunk
+        self.start = start
+        self.end = end
+        self.seen = seen
+
+def chunk_start(chunk):
+    return chunk.start
+
+def statement_start(statement):
+    return statement.start
+
+def shift_lines(statement, delta):
+    statement.line += delta
+    if isinstance(statement, IfStatement):
+        shift_lines(statement.then_branch, delta)
+        if statement.else_branch is not None:
+            shift_lines(statement.else_branch, delta)
+    elif isinstance(statement, (WhileStatement, ForStatement)):
+        shift_lines(statement.body, delta)
+    elif isinstance(statement, FunctionDeclaration):
+        for child in statement.body.statements:
+            shift_lines(child, delta)
+    elif isinstance(statement, (Block, IndentedBlock)):
+        for child in statement.statements:
+            shift_lines(child, delta)
+
+class IncrementalDocument:
+    # A source text kept lexed and parsed across edits. Each line stores its
+    # tokens and the lexer state at its start, so an edit re-lexes only from
+    # the edited line until the state matches the old one again. Top-level
+    # statements whose tokens the edit did not touch are reused as they are:
+    # the parser starts after the last untouched statement before the edit
+    # and stops as soon as it reaches the start of an untouched one after it.
+    #
+    # An edit costs the lines it re-lexes and the statements it re-parses,
+    # plus one step per CHUNK_LINES lines to move later chunk starts. Reading
+    # `program` builds the statement list and renumbers statements that moved,
+    # so it is linear in the number of statements, like running them is.
+    #
+    # Reused statements are the same objects as in the previous program, so
+    # callers that rewrite the tree (the optimizer) should parse a copy.
+    def __init__(self, source="", parser_class=SimpleParser):
+        self.parser_class = parser_class
+        self.chunks = [Chunk(0, [""], [None], [[]], [None], [])]
+        self.line_count = 1
+        self.end_state = None
+        self.errors = 0
+        # Positions where parsing has to resume; empty once the text parses.
+        self.holes = []
+        self.built = None
+        self.error = None
+        self.seen = None
+        self.replace_lines(0, 1, source.split('\n'))
+
+    @property
+    def source(self):
+        return '\n'.join(line for chunk in self.chunks for line in chunk.lines)
+
+    @property
+    def program(self):
+        # The current tree, or None while the text does not lex or parse.
+        if self.error is not None:
+            return None
+        if self.built is None:
+            statements = []
+            for chunk in self.chunks:
+                self.bring_up_to_date(chunk)
+                statements.extend(statement.node for statement in chunk.statements)
+            self.built = Program(statements)
+        return self.built
+
+    def edit(self, start, end, text):
+        # Replaces the text between two (line, column) positions, both
+        # zero-based, the way editors report changes.
+        (start_line, start_column), (end_line, end_column) = start, end
+        replaced = self.line(start_line)[:start_column] + text + self.line(end_line)[end_column:]
+        self.replace_lines(start_line, end_line + 1, replaced.split('\n'))
+
+    def update(self, source):
+        # Takes a whole new text and edits only the lines between the
+        # unchanged head and tail of the document.
+        old = self.source.split('\n')
+        new = source.split('\n')
+        limit = min(len(old), len(new))
+        first = 0
+        while first < limit and old[first] == new[first]:
+            first += 1
+        if first == len(old) == len(new):
+            return
+        last = 0
+        while last < limit - first and old[-1 - last] == new[-1 - last]:
+            last += 1
+        self.replace_lines(first, len(old) - last, new[first:len(new) - last])
+
+    def line(self, line):
+        chunk = self.chunks[self.locate(line)]
+        return chunk.lines[line - chunk.start]
+
+    def locate(self, line):
+        return bisect_right(self.chunks, line, key=chunk_start) - 1
+
+    def replace_lines(self, first, last, new_lines):
+        chunks = self.chunks
+        delta = len(new_lines) - (last - first)
+        low = self.locate(first)
+        high = self.locate(last - 1) if last > first else low
+        chunk = chunks[low]
+        final = chunks[high]
+        start = first - chunk.start
+        end = last - final.start if last > first else start
+        state = self.state_at(low, start)
+
+        # Fold the chunks the edit touches into the first one, keeping the
+        # statements outside the replaced lines.
+        kept = []
+        for index in range(low, high + 1):
+            part = chunks[index]
+            self.bring_up_to_date(part)
+            for statement in part.statements:
+                line = part.start + statement.start[0]
+                if line < first:
+                    kept.append(statement)
+                elif line >= last:
+                    statement.chunk = chunk
+                    statement.start = (line + delta - chunk.start, statement.start[1])
+                    shift_lines(statement.node, delta)
+                    kept.append(statement)
+        if low == high:
+            removed = chunk.errors[start:end]
+        else:
+            removed = chunk.errors[start:] + [error for part in chunks[low + 1:high] for error in part.errors]
+            removed += final.errors[:end]
+        self.errors -= len(removed) - removed.count(None)
+        count = len(new_lines)
+        chunk.lines = chunk.lines[:start] + new_lines + final.lines[end:]
+        chunk.states = chunk.states[:start] + [None] * count + final.states[end:]
+        chunk.tokens = chunk.tokens[:start] + [[] for _ in range(count)] + final.tokens[end:]
+        chunk.errors = chunk.errors[:start] + [None] * count + final.errors[end:]
+        chunk.statements = kept
+        del chunks[low + 1:high + 1]
+        if delta:
+            for later in chunks[low + 1:]:
+                later.start += delta
+        if not chunk.lines:
+            del chunks[low]
+        self.line_count += delta
+
+        for index, (line, token) in enumerate(self.holes):
+            if line >= last:
+                self.holes[index] = (line + delta, token)
+            elif line >= first:
+                self.holes[index] = (first, 0)
+
+        stop = self.relex(first, first + count, state)
+        self.invalidate(first, stop)
+        self.parse()
+        self.rebalance(min(first, self.line_count - 1))
+
+    def state_at(self, index, line):
+        chunks = self.chunks
+        if line < len(chunks[index].states):
+            return chunks[index].states[line]
+        if index + 1 < len(chunks):
+            return chunks[index + 1].states[0]
+        return self.end_state
+
+    def relex(self, first, edited_end, state):
+        # Lexes from `first` until past the edited lines the state at a line
+        # start is the one stored for it; returns that line.
+        chunks = self.chunks
+        index = self.locate(first)
+        chunk = chunks[index]
+        local = first - chunk.start
+        line = first
+        while True:
+            if local == len(chunk.lines):
+                index += 1
+                if index == len(chunks):
+                    self.end_state = state
+                    return line
+                chunk = chunks[index]
+                local = 0
+            if line >= edited_end and state == chunk.states[local]:
+                return line
+            chunk.states[local] = state
+            chunk.tokens[local], state, error = lex_line(chunk.lines[local], state)
+            self.errors += (error is not None) - (chunk.errors[local] is not None)
+            chunk.errors[local] = error
+            local += 1
+            line += 1
+
+    def invalidate(self, first, stop):
+        # Drops the statements that start on a re-lexed line or looked at
+        # one, and marks where parsing has to resume.
+        damage_start = (first, 0)
+        damage_end = (stop, 0)
+        following = self.statement_from(damage_start)
+        while following is not None and self.start_of(following) < damage_end:
+            after = self.statement_after(following)
+            self.remove(following)
+            following = after
+
+        previous = self.statement_before(damage_start)
+        while previous is not None and self.seen_of(previous) >= damage_start:
+            earlier = self.statement_before(self.start_of(previous))
+            self.remove(previous)
+            previous = earlier
+
+        hole = self.end_of(previous) if previous is not None else (0, 0)
+        holes = self.holes
+        del holes[bisect_left(holes, hole):bisect_left(holes, damage_end)]
+        holes.insert(bisect_left(holes, hole), hole)
+
+    def parse(self):
+        # Parses every hole until it reaches a stored statement or the end.
+        # Edits never raise: a broken text leaves program None and the first
+        # lexing or parsing error in self.error.
+        self.built = None
+        self.error = self.lex_error()
+        if self.error is not None:
+            return
+        holes = self.holes
+        while holes:
+            position = holes[0]
+            previous = self.statement_before(position)
+            reach = self.seen_of(previous) if previous is not None else position
+            following = self.statement_from(position)
+            parser = self.parser_class(self.tokens(*position))
+            start = position
+            try:
+                while True:
+                    start = parser.current_token.position
+                    # Statements the new ones ran over are gone.
+                    while following is not None and self.start_of(following) < start:
+                        after = self.statement_after(following)
+                        self.remove(following)
+                        following = after
+                    if following is not None and self.start_of(following) == start:
+                        break
+                    if parser.current_token.type == TokenType.EOF:
+                        break
+                    node = parser.parse_statement()
+                    reach = max(reach, self.seen)
+                    self.insert(node, start, parser.current_token.position, reach)
+            except Exception as error:
+                self.error = str(error)
+                del holes[:bisect_right(holes, start)]
+                holes.insert(0, start)
+                self.extend_reach(following, reach)
+                return
+            del holes[:bisect_right(holes, start)]
+            self.extend_reach(following, reach)
+
+    def lex_error(self):
+        if self.errors:
+            for chunk in self.chunks:
+                for error in chunk.errors:
+                    if error is not None:
+                        return error
+        if self.end_state is not None:
+            return "Unterminated string"
+        return None
+
+    def tokens(self, line=0, index=0):
+        # Tokens from a position to the end of file, each remembering its
+        # position; the furthest one handed out is kept in self.seen.
+        chunks = self.chunks
+        current = self.locate(line)
+        local = line - chunks[current].start
+        while current < len(chunks):
+            chunk = chunks[current]
+            line_tokens = chunk.tokens
+            while local < len(line_tokens):
+                stored = line_tokens[local]
+                absolute = chunk.start + local
+                while index < len(stored):
+                    token_type, value, lines_back, column = stored[index]
+                    self.seen = (absolute, index)
+                    yield PositionedToken(token_type, value, absolute - lines_back + 1, column, self.seen)
+                    index += 1
+                local += 1
+                index = 0
+            current += 1
+            local = 0
+        self.seen = (self.line_count, 0)
+        yield PositionedToken(TokenType.EOF, None, self.line_count, len(chunks[-1].lines[-1]) + 1, self.seen)
+
+    def start_of(self, statement):
+        return (statement.chunk.start + statement.start[0], statement.start[1])
+
+    def end_of(self, statement):
+        return (statement.chunk.start + statement.start[0] + statement.end[0], statement.end[1])
+
+    def seen_of(self, statement):
+        return (statement.chunk.start + statement.start[0] + statement.seen[0], statement.seen[1])
+
+    def statement_from(self, position):
+        # The first stored statement starting at or after a position.
+        chunks = self.chunks
+        index = self.locate(position[0])
+        chunk = chunks[index]
+        found = bisect_left(chunk.statements, (position[0] - chunk.start, position[1]), key=statement_start)
+        while found == len(chunk.statements):
+            index += 1
+            if index == len(chunks):
+                return None
+            chunk = chunks[index]
+            found = 0
+        return chunk.statements[found]
+
+    def statement_before(self, position):
+        chunks = self.chunks
+        index = self.locate(position[0])
+        chunk = chunks[index]
+        found = bisect_left(chunk.statements, (position[0] - chunk.start, position[1]), key=statement_start)
+        while found == 0:
+            index -= 1
+            if index < 0:
+                return None
+            chunk = chunks[index]
+            found = len(chunk.statements)
+        return chunk.statements[found - 1]
+
+    def statement_after(self, statement):
+        line, index = self.start_of(statement)
+        return self.statement_from((line, index + 1))
+
+    def extend_reach(self, statement, reach):
+        # Keeps seen non-decreasing along the statements, so the statements
+        # that looked at a line are always the ones just before it.
+        while statement is not None and self.seen_of(statement) < reach:
+            statement.seen = (reach[0] - self.start_of(statement)[0], reach[1])
+            statement = self.statement_after(statement)
+
+    def insert(self, node, start, end, seen):
+        chunk = self.chunks[self.locate(start[0])]
+        self.bring_up_to_date(chunk)
+        local = (start[0] - chunk.start, start[1])
+        statement = ParsedStatement(node, chunk, local, (end[0] - start[0], end[1]), (seen[0] - start[0], seen[1]))
+        statements = chunk.statements
+        statements.insert(bisect_left(statements, local, key=statement_start), statement)
+
+    def remove(self, statement):
+        statement.chunk.statements.remove(statement)
+
+    def bring_up_to_date(self, chunk):
+        delta = chunk.start - chunk.applied
+        if delta:
+            for statement in chunk.statements:
+                shift_lines(statement.node, delta)
+            chunk.applied = chunk.start
+
+    def rebalance(self, line):
+        # Keeps chunks between half and twice CHUNK_LINES lines long.
+        chunks = self.chunks
+        index = self.locate(line)
+        chunk = chunks[index]
+        if len(chunk.lines) < CHUNK_LINES // 2 and index + 1 < len(chunks):
+            following = chunks.pop(index + 1)
+            self.bring_up_to_date(chunk)
+            self.bring_up_to_date(following)
+            offset = len(chunk.lines)
+            for statement in following.statements:
+                statement.chunk = chunk
+                statement.start = (statement.start[0] + offset, statement.start[1])
+            chunk.lines += following.lines
+            chunk.states += following.states
+            chunk.tokens += following.tokens
+            chunk.errors += following.errors
+            chunk.statements += following.statements
+        if len(chunk.lines) > 2 * CHUNK_LINES:
+            self.bring_up_to_date(chunk)
+            pieces = []
+            for offset in range(0, len(chunk.lines), CHUNK_LINES):
+                limit = offset + CHUNK_LINES
+                pieces.append(Chunk(chunk.start + offset, chunk.lines[offset:limit], chunk.states[offset:limit],
+                                    chunk.tokens[offset:limit], chunk.errors[offset:limit], []))
+            for statement in chunk.statements:
+                piece = pieces[statement.start[0] // CHUNK_LINES]
+                statement.chunk = piece
+                statement.start = (statement.start[0] - (piece.start - chunk.start), statement.start[1])
+                piece.statements.append(statement)
+            chunks[index:index + 1] = pieces
@@ -1,30 +1,63 @@
+import math
+
 from .ast import *
+from .resolver import Resolver, Scope
+from .memo import DEFAULT_MEMO_SIZE, MISSING, LRUCache, cache_key, find_pure_functions
+from .quicken import quicken
+from .rope import Rope, concat
+from .arrays import OPERATIONS as ARRAY_OPERATIONS
+from .arrays import JanArray, array_operation, call_method, fill_array, index_value, make_array, negate_array, store_index
+from .natives import NativeFunction, define_natives, is_native
+from .limits import MEMORY_CHECK_INTERVAL, SLOT_BYTES, STRING_BYTES, JanLimitError, estimate_memory
+
+UNDEFINED = object()
+
+# Completion signals returned by Interpreter.execute when a return statement
+# runs; normal completion returns None.
+RETURNED = object()
+TAIL_CALLED = object()
 
 class Environment:
-    def __init__(self, enclosing=None):
-        self.values = {}
+    def __init__(self, enclosing=None, scope=None):
+        self.scope = scope if scope is not None else Scope()
+        self.values = [UNDEFINED] * len(self.scope)
         self.enclosing = enclosing
     
+    def grow(self):
+        missing = len(self.scope) - len(self.values)
+        if missing > 0:
+            self.values.extend([UNDEFINED] * missing)
+    
     def define(self, name, value):
-        self.values[name] = value
+        slot = self.scope.declare(name)
+        if slot >= len(self.values):
+            self.grow()
+        self.values[slot] = value
+    
+    def lookup(self, name):
+        slot = self.scope.slots.get(name)
+        if slot is not None and slot < len(self.values):
+            return self.values[slot]
+        return UNDEFINED
     
     def get(self, name):
-        if name in self.values:
-            return self.values[name]
-        
-        if self.enclosing:
-            return self.enclosing.get(name)
+        environment = self
+        while environment is not None:
+            value = environment.lookup(name)
+            if value is not UNDEFINED:
+                return value
+            environment = environment.enclosing
         
         raise Exception(f"Undefined variable '{name}'")
     
     def assign(self, name, value):
-        if name in self.values:
-            self.values[name] = value
-            return
-        
-        if self.enclosing:
-            self.enclosing.assign(name, value)
-            return
+        environment = self
+        while environment is not None:
+            slot = environment.scope.slots.get(name)
+            if slot is not None and slot < len(environment.values) and environment.values[slot] is not UNDEFINED:
+                environment.values[slot] = value
+                return
+            environment = environment.enclosing
         
         raise Exception(f"Undefined variable '{name}'")
 
@@ -32,35 +65,309 @@ class Function:
     def __init__(self, declaration, closure):
         self.declaration = declaration
         self.closure = closure
+        self.cache = None
     
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
+        function = self
+        pending = []
         
-        for i, param in enumerate(self.declaration.params):
-            environment.define(param, arguments[i])
-        
-        try:
-            interpreter.execute_block(self.declaration.body.statements, environment)
-        except Return as return_value:
-            return return_value.value
-        
-        return None
+        # Tail calls come back as TAIL_CALLED and are run by this loop, so a
+        # chain of tail calls uses a single Python frame.
+        while True:
+            cache = function.cache
+            if cache is not None:
+                try:
+                    key = cache_key(arguments)
+                    value = cache.get(key)
+                except TypeError:
+                    value = MISSING
+                else:
+                    if value is not MISSING:
+                        return remember(pending, value)
+                    pending.append((cache, key))
+            
+            declaration = function.declaration
+            environment = Environment(function.closure, declaration.scope)
+            
+            if declaration.param_slots is not None:
+                values = environment.values
+                for i, slot in enumerate(declaration.param_slots):
+                    values[slot] = arguments[i]
+            else:
+                for i, param in enumerate(declaration.params):
+                    environment.define(param, arguments[i])
+            
+            signal = interpreter.execute_block(declaration.body.statements, environment)
+            
+            if signal is TAIL_CALLED:
+                function, arguments = interpreter.tail_call
+                interpreter.tail_call = None
+            elif signal is RETURNED:
+                value = interpreter.return_value
+                interpreter.return_value = None
+                return remember(pending, value)
+            else:
+                return remember(pending, None)
+
+def for_range(start, end, step):
+    # The values a for loop gives its variable: start to end inclusive.
+    # All-integer bounds become a range, so the loop never does arithmetic
+    # of its own.
+    for value in (start, end, step):
+        if value.__class__ is not int and value.__class__ is not float:
+            raise Exception("for loop bounds must be numbers")
+    if step == 0:
+        raise Exception("for loop step cannot be zero")
+    if start.__class__ is int and end.__class__ is int and step.__class__ is int:
+        return range(start, end + 1 if step > 0 else end - 1, step)
+    # Counting the values up front keeps start + i * step from drifting the
+    # way repeated addition would; the slack absorbs (0.3 - 0) / 0.1 < 3.
+    count = math.floor((end - start) / step + 1e-9) + 1
+    return (start + i * step for i in range(max(count, 0)))
+
+def remember(pending, value):
+    for cache, key in pending:
+        cache.put(key, value)
+    return value
 
 class Return(Exception):
     def __init__(self, value):
         self.value = value
 
+# Engines that recurse on the Python stack report running out of it with
+# this error instead of a RecursionError.
+STACK_OVERFLOW = "Maximum recursion depth exceeded"
+
+INFINITY = float('inf')
+
+HOOKS = ('on_statement', 'on_call', 'on_return', 'on_env_alloc', 'on_error')
+
 class Interpreter:
-    def __init__(self):
+    optimize_tail_calls = True
+    
+    def __init__(self, memo_size=DEFAULT_MEMO_SIZE):
         self.globals = Environment()
+        define_natives(self.globals)
         self.environment = self.globals
+        self.return_value = None
+        self.tail_call = None
+        self.memo_size = memo_size
+        self.functions = []
+        self.hooks = {event: [] for event in HOOKS}
+        self.instrumented = False
+        self.statements_executed = 0
+        self.environments_allocated = 0
+        self.calls_made = 0
+        self.call_depth = 0
+        self.max_call_depth = 0
+        self.statement_limit = INFINITY
+        self.call_depth_limit = INFINITY
+        self.memory_limit = INFINITY
+        self.next_memory_check = INFINITY
+        self.tracked_stores = ()
+        self.allocated = 0
+        self.live_environments = [self.globals]
     
-    def interpret(self, statements):
-        if isinstance(statements, Program):
-            for statement in statements.statements:
-                self.execute(statement)
+    def set_limits(self, max_statements=None, max_call_depth=None, max_memory=None):
+        # Limits are checked by the instrumented methods, so setting any
+        # limit instruments this interpreter.
+        self.statement_limit = max_statements if max_statements is not None else INFINITY
+        self.call_depth_limit = max_call_depth if max_call_depth is not None else INFINITY
+        self.memory_limit = max_memory if max_memory is not None else INFINITY
+        self.instrument()
+        if max_memory is not None:
+            self.next_memory_check = self.statements_executed + MEMORY_CHECK_INTERVAL
+            self.tracked_stores = (Assignment, VariableDeclaration)
         else:
-            self.execute(statements)
+            self.next_memory_check = INFINITY
+            self.tracked_stores = ()
+    
+    def limits(self):
+        return {
+            'max_statements': None if self.statement_limit is INFINITY else self.statement_limit,
+            'max_call_depth': None if self.call_depth_limit is INFINITY else self.call_depth_limit,
+            'max_memory': None if self.memory_limit is INFINITY else self.memory_limit,
+        }
+    
+    def check_budget(self, count):
+        if count > self.statement_limit:
+            raise JanLimitError('statements', self.statement_limit, count)
+        self.check_memory()
+    
+    def account_string(self, value):
+        # Interval checks alone would miss a string that doubles on every
+        # iteration, so strings are counted as they are stored.
+        self.account(STRING_BYTES + len(value))
+    
+    def account(self, size):
+        self.allocated += size
+        if self.allocated > self.memory_limit // 4:
+            self.check_memory()
+    
+    def reserve(self, size):
+        # A single value can be too large to build at all, so its size is
+        # checked before it is allocated rather than once it exists.
+        if size > self.memory_limit // 4:
+            used = self.check_memory() + size
+            if used > self.memory_limit:
+                raise JanLimitError('memory', self.memory_limit, used)
+    
+    def check_memory(self):
+        self.allocated = 0
+        self.next_memory_check = self.statements_executed + MEMORY_CHECK_INTERVAL
+        used = estimate_memory(self.live_environments)
+        if used > self.memory_limit:
+            raise JanLimitError('memory', self.memory_limit, used)
+        return used
+    
+    def add_hook(self, event, callback):
+        if event not in self.hooks:
+            raise Exception(f"Unknown hook '{event}'")
+        self.hooks[event].append(callback)
+        self.instrument()
+    
+    def remove_hook(self, event, callback):
+        if event not in self.hooks:
+            raise Exception(f"Unknown hook '{event}'")
+        self.hooks[event].remove(callback)
+    
+    def stats(self):
+        return {
+            'statements': self.statements_executed,
+            'environments': self.environments_allocated,
+            'calls': self.calls_made,
+            'max_call_depth': self.max_call_depth,
+        }
+    
+    def instrument(self):
+        # The plain methods never check for hooks. Instrumenting shadows
+        # them with counting wrappers on this instance only, so an
+        # interpreter that is never instrumented pays nothing.
+        if self.instrumented:
+            return
+        self.instrumented = True
+        hooks = self.hooks
+        execute = self.execute
+        execute_block = self.execute_block
+        prepare_call = self.prepare_call
+        evaluate_function_call = self.evaluate_function_call
+        
+        statement_hooks = hooks['on_statement']
+        error_hooks = hooks['on_error']
+        
+        def instrumented_execute(stmt):
+            count = self.statements_executed = self.statements_executed + 1
+            if count >= self.next_memory_check or count > self.statement_limit:
+                self.check_budget(count)
+            if statement_hooks:
+                for hook in statement_hooks:
+                    hook(stmt)
+            try:
+                signal = execute(stmt)
+            except Return:
+                raise
+            except Exception as error:
+                # Only the innermost statement reports an error.
+                if error_hooks and not getattr(error, 'jan_reported', False):
+                    error.jan_reported = True
+                    for hook in error_hooks:
+                        hook(error, stmt)
+                raise
+            if stmt.__class__ in self.tracked_stores:
+                value = self.environment.values[stmt.slot] if stmt.depth == 0 else self.lookup_variable(stmt)
+                if type(value) is str:
+                    self.account_string(value)
+                elif type(value) is Rope:
+                    # Only the newest piece of a rope was allocated by this store.
+                    self.account_string(value.pieces[value.count - 1])
+                elif type(value) is JanArray:
+                    self.account(value.nbytes)
+            return signal
+        
+        def instrumented_execute_block(statements, environment):
+            self.environments_allocated += 1
+            for hook in hooks['on_env_alloc']:
+                hook(environment)
+            live_environments = self.live_environments
+            live_environments.append(environment)
+            try:
+                return execute_block(statements, environment)
+            finally:
+                live_environments.pop()
+        
+        def instrumented_prepare_call(expr):
+            callee, arguments = prepare_call(expr)
+            if callee.__class__ is NativeFunction:
+                # Builtins flatten rope arguments into new strings.
+                size = sum(argument.length for argument in arguments if argument.__class__ is Rope)
+                if callee.size is not None:
+                    size += callee.size(*arguments)
+                self.reserve(size)
+            self.calls_made += 1
+            for hook in hooks['on_call']:
+                hook(callee, arguments)
+            return callee, arguments
+        
+        def instrumented_evaluate_function_call(expr):
+            # Tail calls reuse the caller's frame, so only this path adds depth.
+            depth = self.call_depth = self.call_depth + 1
+            if depth > self.max_call_depth:
+                self.max_call_depth = depth
+            if depth > self.call_depth_limit:
+                self.call_depth -= 1
+                raise JanLimitError('call_depth', self.call_depth_limit, depth)
+            try:
+                value = evaluate_function_call(expr)
+            finally:
+                self.call_depth -= 1
+            for hook in hooks['on_return']:
+                hook(expr, value)
+            return value
+        
+        self.execute = instrumented_execute
+        self.execute_block = instrumented_execute_block
+        self.prepare_call = instrumented_prepare_call
+        self.evaluate_function_call = instrumented_evaluate_function_call
+    
+    def interpret(self, statements):
+        if self.memo_size:
+            # Builtins are bound globals too: assigning to one inside a
+            # function writes through to it, so it must not count as local.
+            bindings = [(name, self.globals.lookup(name)) for name in self.globals.scope.names]
+            defined = [name for name, value in bindings if value is not UNDEFINED]
+            natives = [name for name, value in bindings if is_native(name, value) and value.pure]
+            pure = find_pure_functions(statements, defined, natives)
+            # A reused AST may have been pure against different globals.
+            for statement in (statements.statements if isinstance(statements, Program) else [statements]):
+                if isinstance(statement, FunctionDeclaration):
+                    statement.pure = statement in pure
+        
+        Resolver(self.globals.scope).resolve(statements)
+        self.globals.grow()
+        
+        try:
+            if isinstance(statements, Program):
+                for statement in statements.statements:
+                    self.execute_top_level(statement)
+            else:
+                self.execute_top_level(statements)
+        except RecursionError:
+            # The Python stack can run out before a configured depth limit
+            # is reached; that still stops the program at the limit.
+            if self.call_depth_limit is not INFINITY:
+                raise JanLimitError('call_depth', self.call_depth_limit, self.max_call_depth) from None
+            raise Exception(STACK_OVERFLOW) from None
+    
+    def execute_top_level(self, stmt):
+        signal = self.execute(stmt)
+        if signal is TAIL_CALLED:
+            function, arguments = self.tail_call
+            self.tail_call = None
+            raise Return(function.call(self, arguments))
+        if signal is RETURNED:
+            value = self.return_value
+            self.return_value = None
+            raise Return(value)
     
     def execute(self, stmt):
         if isinstance(stmt, ExpressionStatement):
@@ -69,50 +376,94 @@ class Interpreter:
                 print(result)
         elif isinstance(stmt, Assignment):
             value = self.evaluate(stmt.value)
-            try:
-                self.environment.assign(stmt.name, value)
-            except:
-                self.environment.define(stmt.name, value)
+            environment = self.environment
+            if stmt.depth == 0 and environment.values[stmt.slot] is not UNDEFINED:
+                environment.values[stmt.slot] = value
+            else:
+                try:
+                    environment.assign(stmt.name, value)
+                except:
+                    environment.define(stmt.name, value)
         elif isinstance(stmt, VariableDeclaration):
             value = self.evaluate(stmt.initializer)
-            self.environment.define(stmt.name, value)
+            if stmt.depth == 0:
+                self.environment.values[stmt.slot] = value
+            else:
+                self.environment.define(stmt.name, value)
         elif isinstance(stmt, IfStatement):
-            self.execute_if(stmt)
+            return self.execute_if(stmt)
         elif isinstance(stmt, WhileStatement):
-            self.execute_while(stmt)
+            return self.execute_while(stmt)
+        elif isinstance(stmt, ForStatement):
+            return self.execute_for(stmt)
         elif isinstance(stmt, Block):
-            self.execute_block(stmt.statements, Environment(self.environment))
+            return self.execute_block(stmt.statements, Environment(self.environment, stmt.scope))
         elif isinstance(stmt, IndentedBlock):
-            self.execute_block(stmt.statements, Environment(self.environment))
+            return self.execute_block(stmt.statements, Environment(self.environment, stmt.scope))
         elif isinstance(stmt, FunctionDeclaration):
             function = Function(stmt, self.environment)
+            if stmt.pure and self.memo_size:
+                function.cache = LRUCache(self.memo_size)
+                self.functions.append(function)
             self.environment.define(stmt.name, function)
         elif isinstance(stmt, ReturnStatement):
-            value = None
-            if stmt.value:
-                value = self.evaluate(stmt.value)
-            raise Return(value)
+            return self.execute_return(stmt)
+        elif isinstance(stmt, IndexAssignment):
+            target = self.evaluate(stmt.target)
+            store_index(target, self.evaluate(stmt.index), self.evaluate(stmt.value))
     
     def execute_if(self, stmt):
         condition = self.evaluate(stmt.condition)
         if self.is_truthy(condition):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
     
     def execute_while(self, stmt):
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            signal = self.execute(stmt.body)
+            if signal is not None:
+                return signal
+    
+    def execute_for(self, stmt):
+        start = self.evaluate(stmt.start)
+        end = self.evaluate(stmt.end)
+        step = self.evaluate(stmt.step) if stmt.step is not None else 1
+        values = self.environment.values
+        slot = stmt.slot
+        body = stmt.body
+        for value in for_range(start, end, step):
+            values[slot] = value
+            signal = self.execute(body)
+            if signal is not None:
+                return signal
     
     def execute_block(self, statements, environment):
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                signal = self.execute(statement)
+                if signal is not None:
+                    return signal
         finally:
             self.environment = previous
     
+    def execute_return(self, stmt):
+        if self.optimize_tail_calls and isinstance(stmt.value, FunctionCall):
+            callee, arguments = self.prepare_call(stmt.value)
+            if callee.__class__ is NativeFunction:
+                self.return_value = callee.function(*arguments)
+                return RETURNED
+            self.tail_call = (callee, arguments)
+            return TAIL_CALLED
+        
+        value = None
+        if stmt.value:
+            value = self.evaluate(stmt.value)
+        self.return_value = value
+        return RETURNED
+    
     def evaluate(self, expr):
         if isinstance(expr, BinaryOp):
             return self.evaluate_binary(expr)
@@ -127,62 +478,102 @@ class Interpreter:
         elif isinstance(expr, NilLiteral):
             return None
         elif isinstance(expr, Identifier):
-            return self.environment.get(expr.name)
+            return self.lookup_variable(expr)
         elif isinstance(expr, FunctionCall):
             return self.evaluate_function_call(expr)
+        elif isinstance(expr, IndexExpression):
+            return index_value(self.evaluate(expr.target), self.evaluate(expr.index))
+        elif isinstance(expr, MethodCall):
+            target = self.evaluate(expr.target)
+            return call_method(target, expr.name, [self.evaluate(argument) for argument in expr.arguments])
+        elif isinstance(expr, ArrayLiteral):
+            return make_array([self.evaluate(element) for element in expr.elements])
+        elif isinstance(expr, ArrayFill):
+            value = self.evaluate(expr.value)
+            count = self.evaluate(expr.count)
+            if count.__class__ is int:
+                self.reserve(count * SLOT_BYTES)
+            return fill_array(value, count)
+    
+    def lookup_variable(self, expr):
+        depth = expr.depth
+        if depth is not None:
+            environment = self.environment
+            while depth:
+                environment = environment.enclosing
+                depth -= 1
+            value = environment.values[expr.slot]
+            if value is not UNDEFINED:
+                return value
+        return self.environment.get(expr.name)
     
     def evaluate_binary(self, expr):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
         
-        if expr.operator == '+':
+        cache = expr.inline_cache
+        if cache is not None and cache[0] is left.__class__ and cache[1] is right.__class__:
+            return cache[2](left, right)
+        
+        result = self.binary_operation(expr.operator, left, right)
+        quicken(expr, left, right)
+        return result
+    
+    def binary_operation(self, operator, left, right):
+        if (left.__class__ is JanArray or right.__class__ is JanArray) and operator in ARRAY_OPERATIONS:
+            return array_operation(operator, left, right)
+        
+        if operator == '+':
             if isinstance(left, (int, float)) and isinstance(right, (int, float)):
                 return left + right
-            elif isinstance(left, str) or isinstance(right, str):
-                return str(left) + str(right)
+            elif isinstance(left, (str, Rope)) or isinstance(right, (str, Rope)):
+                if right.__class__ is Rope:
+                    # The right operand is flattened into a new string.
+                    self.reserve(right.length)
+                return concat(left, right)
             else:
                 raise Exception("Operands must be numbers or strings")
         
-        elif expr.operator == '-':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '-':
+            self.check_number_operands(operator, left, right)
             return left - right
         
-        elif expr.operator == '*':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '*':
+            self.check_number_operands(operator, left, right)
             return left * right
         
-        elif expr.operator == '/':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '/':
+            self.check_number_operands(operator, left, right)
             if right == 0:
                 raise Exception("Division by zero")
             return left / right
         
-        elif expr.operator == '==':
+        elif operator == '==':
             return self.is_equal(left, right)
         
-        elif expr.operator == '!=':
+        elif operator == '!=':
             return not self.is_equal(left, right)
         
-        elif expr.operator == '<':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '<':
+            self.check_number_operands(operator, left, right)
             return left < right
         
-        elif expr.operator == '<=':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '<=':
+            self.check_number_operands(operator, left, right)
             return left <= right
         
-        elif expr.operator == '>':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '>':
+            self.check_number_operands(operator, left, right)
             return left > right
         
-        elif expr.operator == '>=':
-            self.check_number_operands(expr.operator, left, right)
+        elif operator == '>=':
+            self.check_number_operands(operator, left, right)
             return left >= right
         
-        elif expr.operator == 'and':
+        elif operator == 'and':
             return self.is_truthy(left) and self.is_truthy(right)
         
-        elif expr.operator == 'or':
+        elif operator == 'or':
             return self.is_truthy(left) or self.is_truthy(right)
         
         return None
@@ -191,6 +582,8 @@ class Interpreter:
         right = self.evaluate(expr.operand)
         
         if expr.operator == '-':
+            if right.__class__ is JanArray:
+                return negate_array(right)
             self.check_number_operand(expr.operator, right)
             return -right
         
@@ -200,16 +593,28 @@ class Interpreter:
         return None
     
     def evaluate_function_call(self, expr):
+        callee, arguments = self.prepare_call(expr)
+        return callee.call(self, arguments)
+    
+    def prepare_call(self, expr):
         callee = self.evaluate(expr.callee)
         
-        if not isinstance(callee, Function):
+        if callee.__class__ is NativeFunction:
+            callee.check_arity(len(expr.arguments))
+        elif not isinstance(callee, Function):
             raise Exception("Can only call functions")
-        
-        if len(expr.arguments) != len(callee.declaration.params):
+        elif len(expr.arguments) != len(callee.declaration.params):
             raise Exception(f"Expected {len(callee.declaration.params)} arguments but got {len(expr.arguments)}")
         
         arguments = [self.evaluate(arg) for arg in expr.arguments]
-        return callee.call(self, arguments)
+        return callee, arguments
+    
+    def clear_memo(self):
+        for function in self.functions:
+            function.cache.clear()
+    
+    def memo_stats(self):
+        return {function.declaration.name: function.cache.stats() for function in self.functions}
     
     def check_number_operand(self, operator, operand):
         if not isinstance(operand, (int, float)):
@@ -1,4 +1,47 @@
-from .tokens import Token, TokenType
+import re
+
+from .tokens import Token, TokenBuffer, TokenType, unescape_string
+
+KEYWORDS = {
+    'if': TokenType.IF,
+    'else': TokenType.ELSE,
+    'while': TokenType.WHILE,
+    'for': TokenType.FOR,
+    'function': TokenType.FUNCTION,
+    'return': TokenType.RETURN,
+    'var': TokenType.VAR,
+    'is': TokenType.IS,
+    'true': TokenType.TRUE,
+    'false': TokenType.FALSE,
+    'nil': TokenType.NIL,
+    'and': TokenType.AND,
+    'or': TokenType.OR,
+    'not': TokenType.NOT
+}
+
+OPERATORS = {
+    '+': TokenType.PLUS,
+    '-': TokenType.MINUS,
+    '*': TokenType.MULTIPLY,
+    '/': TokenType.DIVIDE,
+    '=': TokenType.ASSIGN,
+    '==': TokenType.EQUALS,
+    '!': TokenType.NOT,
+    '!=': TokenType.NOT_EQUALS,
+    '<': TokenType.LESS_THAN,
+    '<=': TokenType.LESS_EQUALS,
+    '>': TokenType.GREATER_THAN,
+    '>=': TokenType.GREATER_EQUALS,
+    '(': TokenType.LPAREN,
+    ')': TokenType.RPAREN,
+    '{': TokenType.LBRACE,
+    '}': TokenType.RBRACE,
+    '[': TokenType.LBRACKET,
+    ']': TokenType.RBRACKET,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    '.': TokenType.DOT
+}
 
 class Lexer:
     def __init__(self, source):
@@ -8,22 +51,7 @@ class Lexer:
         self.column = 1
         self.current_char = self.source[0] if source else None
         
-        self.keywords = {
-            'if': TokenType.IF,
-            'else': TokenType.ELSE,
-            'while': TokenType.WHILE,
-            'for': TokenType.FOR,
-            'function': TokenType.FUNCTION,
-            'return': TokenType.RETURN,
-            'var': TokenType.VAR,
-            'is': TokenType.IS,
-            'true': TokenType.TRUE,
-            'false': TokenType.FALSE,
-            'nil': TokenType.NIL,
-            'and': TokenType.AND,
-            'or': TokenType.OR,
-            'not': TokenType.NOT
-        }
+        self.keywords = KEYWORDS
     
     def advance(self):
         self.position += 1
@@ -69,6 +97,7 @@ class Lexer:
             raise Exception(f"Invalid number: {result}")
     
     def read_string(self):
+        start_line = self.line
         start_column = self.column
         self.advance()
         result = ''
@@ -86,13 +115,16 @@ class Lexer:
                     result += self.current_char
             else:
                 result += self.current_char
+            if self.current_char == '\n':
+                self.line += 1
+                self.column = 0
             self.advance()
         
         if not self.current_char:
             raise Exception("Unterminated string")
         
         self.advance()
-        return Token(TokenType.STRING, result, self.line, start_column)
+        return Token(TokenType.STRING, result, start_line, start_column)
     
     def read_identifier(self):
         start_column = self.column
@@ -194,6 +226,14 @@ class Lexer:
                 self.advance()
                 return Token(TokenType.RBRACE, '}', self.line, start_column)
             
+            if self.current_char == '[':
+                self.advance()
+                return Token(TokenType.LBRACKET, '[', self.line, start_column)
+            
+            if self.current_char == ']':
+                self.advance()
+                return Token(TokenType.RBRACKET, ']', self.line, start_column)
+            
             if self.current_char == ';':
                 self.advance()
                 return Token(TokenType.SEMICOLON, ';', self.line, start_column)
@@ -208,4 +248,167 @@ class Lexer:
             
             raise Exception(f"Unknown character: {self.current_char}")
         
-        return Token(TokenType.EOF, None, self.line, self.column) 
\ No newline at end of file
+        return Token(TokenType.EOF, None, self.line, self.column)
+    
+    def tokenize(self):
+        while True:
+            token = self.get_next_token()
+            yield token
+            if token.type == TokenType.EOF:
+                return
+
+
+TOKEN_PATTERN = re.compile(r'''
+    [^\S\n]*
+    (?:
+        (?P<IDENTIFIER>[^\W\d]\w*)
+      | (?P<NUMBER>\d[\d.]*)
+      | (?P<NEWLINE>\s+)
+      | (?P<COMMENT>//[^\n]*)
+      | (?P<OPERATOR>[=!<>]=|[-+*/=!<>(){}\[\];,.])
+      | (?P<STRING>"(?:[^"\\]|\\[\s\S])*")
+      | (?P<ERROR>[\s\S])
+      | $
+    )
+''', re.VERBOSE)
+
+STRING_PATTERN = re.compile(r'"(?:[^"\\]|\\[\s\S])*"')
+
+class OpenString:
+    # Lexer state at the start of a line that is inside a string: the string
+    # opened `lines_back` lines earlier at `column`, and `text` holds it from
+    # the opening quote to the end of the previous line.
+    __slots__ = ('lines_back', 'column', 'text')
+    
+    def __init__(self, lines_back, column, text):
+        self.lines_back = lines_back
+        self.column = column
+        self.text = text
+    
+    def __eq__(self, other):
+        return (other.__class__ is OpenString and self.lines_back == other.lines_back
+                and self.column == other.column and self.text == other.text)
+
+def lex_line(text, state):
+    # Lexes one line given the state at its start; this is the one place
+    # that decides token lines. Tokens are returned as (type, value,
+    # lines_back, column): a string spanning lines is returned with the line
+    # it closes on but is positioned where it opened, so every token is on
+    # the physical line it starts on. Returns the tokens, the state at the
+    # start of the next line and an error message or None.
+    tokens = []
+    position = 0
+    if state is not None:
+        joined = state.text + '\n' + text
+        match = STRING_PATTERN.match(joined)
+        if match is None:
+            return tokens, OpenString(state.lines_back + 1, state.column, joined), None
+        tokens.append((TokenType.STRING, unescape_string(match.group()[1:-1]), state.lines_back, state.column))
+        position = match.end() - len(state.text) - 1
+    
+    keywords = KEYWORDS
+    operators = OPERATORS
+    identifier = TokenType.IDENTIFIER
+    append = tokens.append
+    for match in TOKEN_PATTERN.finditer(text, position):
+        kind = match.lastgroup
+        if kind == 'IDENTIFIER':
+            lexeme = match.group(kind)
+            append((keywords.get(lexeme, identifier), lexeme, 0, match.start(kind) + 1))
+        elif kind == 'OPERATOR':
+            lexeme = match.group(kind)
+            append((operators[lexeme], lexeme, 0, match.start(kind) + 1))
+        elif kind == 'NUMBER':
+            number = match.group(kind)
+            try:
+                value = float(number) if '.' in number else int(number)
+            except ValueError:
+                return tokens, None, f"Invalid number: {number}"
+            append((TokenType.NUMBER, value, 0, match.start(kind) + 1))
+        elif kind == 'STRING':
+            append((TokenType.STRING, unescape_string(match.group(kind)[1:-1]), 0, match.start(kind) + 1))
+        elif kind == 'ERROR':
+            if match.group(kind) == '"':
+                start = match.start(kind)
+                return tokens, OpenString(1, start + 1, text[start:]), None
+            return tokens, None, f"Unknown character: {match.group(kind)}"
+    return tokens, None, None
+
+class RegexLexer:
+    def __init__(self, source):
+        self.source = source
+        self.tokens = self.scan()
+    
+    def get_next_token(self):
+        return next(self.tokens)
+    
+    def tokenize(self):
+        while True:
+            token = next(self.tokens)
+            yield token
+            if token.type == TokenType.EOF:
+                return
+    
+    def scan(self):
+        token = Token
+        state = None
+        line = 0
+        for line, text in enumerate(self.source.split('\n'), 1):
+            tokens, state, error = lex_line(text, state)
+            for token_type, value, lines_back, column in tokens:
+                yield token(token_type, value, line - lines_back, column)
+            if error is not None:
+                raise Exception(error)
+        if state is not None:
+            raise Exception("Unterminated string")
+        
+        eof = Token(TokenType.EOF, None, line, len(text) + 1)
+        while True:
+            yield eof
+    
+    def to_buffer(self):
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+        line_starts = buffer.line_starts
+        keywords = KEYWORDS
+        operators = OPERATORS
+        identifier = TokenType.IDENTIFIER
+        line = 1
+        
+        for match in TOKEN_PATTERN.finditer(self.source):
+            kind = match.lastgroup
+            
+            if kind == 'IDENTIFIER':
+                append(keywords.get(match.group(kind), identifier), match.start(kind), match.end(kind), line)
+            elif kind == 'OPERATOR':
+                append(operators[match.group(kind)], match.start(kind), match.end(kind), line)
+            elif kind == 'NEWLINE':
+                text = match.group(kind)
+                start = match.start(kind)
+                newline = text.find('\n')
+                while newline != -1:
+                    line += 1
+                    line_starts.append(start + newline + 1)
+                    newline = text.find('\n', newline + 1)
+            elif kind == 'NUMBER':
+                text = match.group(kind)
+                if text.count('.') > 1:
+                    raise Exception(f"Invalid number: {text}")
+                append(TokenType.NUMBER, match.start(kind), match.end(kind), line)
+            elif kind == 'STRING':
+                start = match.start(kind)
+                append(TokenType.STRING, start, match.end(kind), line)
+                newline = self.source.find('\n', start, match.end(kind))
+                while newline != -1:
+                    line += 1
+                    line_starts.append(newline + 1)
+                    newline = self.source.find('\n', newline + 1, match.end(kind))
+            elif kind == 'ERROR':
+                text = match.group(kind)
+                if text == '"':
+                    raise Exception("Unterminated string")
+                raise Exception(f"Unknown character: {text}")
+        
+        end = len(self.source)
+        append(TokenType.EOF, end, end, line)
+        return buffer
@@ -0,0 +1,49 @@
+from .arrays import JanArray
+from .rope import Rope
+
+# Rough CPython sizes, enough to tell a runaway program from a normal one.
+ENVIRONMENT_BYTES = 120
+SLOT_BYTES = 8
+STRING_BYTES = 49
+
+# Statements between full memory estimates.
+MEMORY_CHECK_INTERVAL = 1000
+
+class JanLimitError(Exception):
+    def __init__(self, kind, limit, used):
+        super().__init__(f"{kind.replace('_', ' ').capitalize()} limit of {limit} exceeded ({used})")
+        self.kind = kind
+        self.limit = limit
+        self.used = used
+
+    def to_dict(self):
+        return {'kind': self.kind, 'limit': self.limit, 'used': self.used, 'message': str(self)}
+
+def estimate_memory(environments):
+    # Bytes held by Jan values in the given environments. Strings and arrays
+    # dominate any program that grows without bound, so only they are sized.
+    total = 0
+    for environment in environments:
+        values = environment.values
+        total += ENVIRONMENT_BYTES + SLOT_BYTES * len(values)
+        for value in values:
+            if type(value) is str:
+                total += STRING_BYTES + len(value)
+            elif type(value) is Rope:
+                total += (STRING_BYTES + SLOT_BYTES) * value.count + value.length
+            elif type(value) is JanArray:
+                total += value.nbytes
+    return total
+
+SIZE_SUFFIXES = {'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30}
+
+def parse_size(text):
+    # '512', '64k', '256M' or '1g' to bytes.
+    text = text.strip().lower().rstrip('b')
+    multiplier = SIZE_SUFFIXES.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        raise ValueError(f"Invalid size '{text}'")
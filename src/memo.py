@@ -0,0 +1,180 @@
+from collections import OrderedDict
+
+from .ast import *
+
+DEFAULT_MEMO_SIZE = 1024
+
+MISSING = object()
+
+class LRUCache:
+    def __init__(self, maxsize=DEFAULT_MEMO_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entries = self.entries
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        self.misses += 1
+        return MISSING
+
+    def put(self, key, value):
+        entries = self.entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries), 'maxsize': self.maxsize}
+
+def cache_key(arguments):
+    # 1, 1.0 and true hash alike but print differently, so the type is part
+    # of the key.
+    return tuple([(type(argument), argument) for argument in arguments])
+
+class BindingCollector:
+    # Maps each name to the top-level functions that bind it; None stands
+    # for a binding made at the top level.
+    def __init__(self):
+        self.bindings = {}
+
+    def collect(self, statements, owner=None):
+        for statement in statements:
+            self.collect_statement(statement, owner)
+        return self.bindings
+
+    def bind(self, name, owner):
+        self.bindings.setdefault(name, []).append(owner)
+
+    def collect_statement(self, stmt, owner):
+        if isinstance(stmt, (Assignment, VariableDeclaration)):
+            self.bind(stmt.name, owner)
+        elif isinstance(stmt, FunctionDeclaration):
+            self.bind(stmt.name, owner)
+            function = owner if owner is not None else stmt
+            for param in stmt.params:
+                self.bind(param, function)
+            self.collect(stmt.body.statements, function)
+        elif isinstance(stmt, IfStatement):
+            self.collect_statement(stmt.then_branch, owner)
+            if stmt.else_branch:
+                self.collect_statement(stmt.else_branch, owner)
+        elif isinstance(stmt, WhileStatement):
+            self.collect_statement(stmt.body, owner)
+        elif isinstance(stmt, ForStatement):
+            self.bind(stmt.name, owner)
+            self.collect_statement(stmt.body, owner)
+        elif isinstance(stmt, (Block, IndentedBlock)):
+            self.collect(stmt.statements, owner)
+
+class PurityChecker:
+    def __init__(self, declaration, bindings, pure_names, external_names, native_names=()):
+        self.declaration = declaration
+        self.bindings = bindings
+        self.pure_names = pure_names
+        self.external_names = external_names
+        self.native_names = native_names
+        self.params = set(declaration.params)
+
+    def is_local(self, name):
+        # Assignment writes through to an existing global, so a name is only
+        # local if nothing outside a function ever binds it.
+        if name in self.params:
+            return True
+        owners = self.bindings.get(name, [])
+        return self.declaration in owners and None not in owners and name not in self.external_names
+
+    def check(self):
+        return all(self.check_statement(statement) for statement in self.declaration.body.statements)
+
+    def check_statement(self, stmt):
+        if isinstance(stmt, (ExpressionStatement, FunctionDeclaration)):
+            return False
+        if isinstance(stmt, Assignment):
+            return self.is_local(stmt.name) and self.check_expression(stmt.value)
+        if isinstance(stmt, VariableDeclaration):
+            return self.is_local(stmt.name) and self.check_expression(stmt.initializer)
+        if isinstance(stmt, IfStatement):
+            return (self.check_expression(stmt.condition)
+                    and self.check_statement(stmt.then_branch)
+                    and (not stmt.else_branch or self.check_statement(stmt.else_branch)))
+        if isinstance(stmt, WhileStatement):
+            return self.check_expression(stmt.condition) and self.check_statement(stmt.body)
+        if isinstance(stmt, ForStatement):
+            return (self.is_local(stmt.name)
+                    and self.check_expression(stmt.start)
+                    and self.check_expression(stmt.end)
+                    and (stmt.step is None or self.check_expression(stmt.step))
+                    and self.check_statement(stmt.body))
+        if isinstance(stmt, (Block, IndentedBlock)):
+            return all(self.check_statement(statement) for statement in stmt.statements)
+        if isinstance(stmt, ReturnStatement):
+            return not stmt.value or self.check_expression(stmt.value)
+        return False
+
+    def check_expression(self, expr):
+        if isinstance(expr, (NumberLiteral, StringLiteral, BooleanLiteral, NilLiteral)):
+            return True
+        if isinstance(expr, Identifier):
+            return self.is_local(expr.name) or expr.name in self.pure_names or expr.name in self.native_names
+        if isinstance(expr, BinaryOp):
+            return self.check_expression(expr.left) and self.check_expression(expr.right)
+        if isinstance(expr, UnaryOp):
+            return self.check_expression(expr.operand)
+        if isinstance(expr, FunctionCall):
+            return (isinstance(expr.callee, Identifier)
+                    and (expr.callee.name in self.pure_names or expr.callee.name in self.native_names)
+                    and all(self.check_expression(argument) for argument in expr.arguments))
+        if isinstance(expr, IndexExpression):
+            return self.check_expression(expr.target) and self.check_expression(expr.index)
+        if isinstance(expr, MethodCall):
+            return (self.check_expression(expr.target)
+                    and all(self.check_expression(argument) for argument in expr.arguments))
+        # Array literals build a new mutable array on every call, which a
+        # cached result would share between callers; IndexAssignment
+        # (a statement) may write to an array the caller still holds.
+        return False
+
+def find_pure_functions(program, external_names=(), native_names=()):
+    # native_names are pure builtins; a program that binds one of those
+    # names anywhere may be calling something else.
+    external_names = set(external_names)
+    statements = program.statements if isinstance(program, Program) else [program]
+    bindings = BindingCollector().collect(statements)
+    native_names = {name for name in native_names if name not in bindings}
+    candidates = [statement for statement in statements if isinstance(statement, FunctionDeclaration)]
+
+    # A top-level function is only a safe callee if its name is bound exactly
+    # once in the program and was not already bound before it.
+    pure = {}
+    for declaration in candidates:
+        stable = bindings.get(declaration.name) == [None] and declaration.name not in external_names
+        if declaration.memoize is not None:
+            if declaration.memoize and stable:
+                pure[declaration.name] = declaration
+        elif stable:
+            pure[declaration.name] = declaration
+
+    changed = True
+    while changed:
+        changed = False
+        for name, declaration in list(pure.items()):
+            if declaration.memoize:
+                continue
+            if not PurityChecker(declaration, bindings, pure, external_names, native_names).check():
+                del pure[name]
+                changed = True
+
+    forced = [declaration for declaration in candidates if declaration.memoize]
+    return set(pure.values()) | set(forced)
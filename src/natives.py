@@ -0,0 +1,201 @@
+import math
+import time
+
+from .arrays import JanArray
+from .rope import Rope
+
+class NativeFunction:
+    # A builtin implemented in Python. It is called with the evaluated
+    # arguments directly, without an Environment or a Jan call frame.
+    __slots__ = ('name', 'arity', 'function', 'pure', 'size')
+
+    def __init__(self, name, arity, function, pure=True, size=None):
+        self.name = name
+        self.arity = arity
+        self.function = function
+        self.pure = pure
+        # Bytes a call with these arguments is about to allocate, for
+        # builtins that can build a value far larger than their arguments.
+        self.size = size
+
+    def __repr__(self):
+        return f"<native function {self.name}>"
+
+    def check_arity(self, count):
+        # An arity of None takes any number of arguments.
+        if self.arity is not None and count != self.arity:
+            raise Exception(f"Expected {self.arity} arguments but got {count}")
+
+    def call(self, interpreter, arguments):
+        return self.function(*arguments)
+
+NATIVES = {}
+
+def native(name, arity, pure=True, size=None):
+    def register(function):
+        NATIVES[name] = NativeFunction(name, arity, function, pure, size)
+        return function
+    return register
+
+def define_natives(environment):
+    for name, function in NATIVES.items():
+        environment.define(name, function)
+
+def is_native(name, value):
+    return value is NATIVES.get(name)
+
+def number(name, value):
+    if value.__class__ is not int and value.__class__ is not float:
+        raise Exception(f"{name} needs a number")
+    return value
+
+def integer(name, value):
+    if value.__class__ is not int:
+        raise Exception(f"{name} needs an integer")
+    return value
+
+def text(name, value):
+    if value.__class__ is Rope:
+        return str(value)
+    if value.__class__ is not str:
+        raise Exception(f"{name} needs a string")
+    return value
+
+def math_function(name, function):
+    def call(value):
+        try:
+            return function(number(name, value))
+        except (ValueError, OverflowError):
+            raise Exception(f"{name} of {value} is undefined")
+    native(name, 1)(call)
+
+for name, function in (('sqrt', math.sqrt), ('floor', math.floor), ('ceil', math.ceil),
+                       ('sin', math.sin), ('cos', math.cos), ('tan', math.tan),
+                       ('log', math.log), ('exp', math.exp)):
+    math_function(name, function)
+
+@native('abs', 1)
+def native_abs(value):
+    return abs(number('abs', value))
+
+@native('round', 1)
+def native_round(value):
+    try:
+        return round(number('round', value))
+    except (ValueError, OverflowError):
+        raise Exception(f"round of {value} is undefined")
+
+@native('pow', 2)
+def native_pow(base, exponent):
+    try:
+        return number('pow', base) ** number('pow', exponent)
+    except (ZeroDivisionError, OverflowError):
+        raise Exception(f"pow of {base} and {exponent} is undefined")
+
+@native('min', 2)
+def native_min(left, right):
+    return min(number('min', left), number('min', right))
+
+@native('max', 2)
+def native_max(left, right):
+    return max(number('max', left), number('max', right))
+
+@native('upper', 1)
+def native_upper(value):
+    return text('upper', value).upper()
+
+@native('lower', 1)
+def native_lower(value):
+    return text('lower', value).lower()
+
+@native('trim', 1)
+def native_trim(value):
+    return text('trim', value).strip()
+
+@native('contains', 2)
+def native_contains(value, part):
+    return text('contains', part) in text('contains', value)
+
+@native('index_of', 2)
+def native_index_of(value, part):
+    return text('index_of', value).find(text('index_of', part))
+
+@native('replace', 3)
+def native_replace(value, old, new):
+    return text('replace', value).replace(text('replace', old), text('replace', new))
+
+@native('substring', 3)
+def native_substring(value, start, end):
+    # Indexes are clamped to the string, like Python slicing.
+    return text('substring', value)[integer('substring', start):integer('substring', end)]
+
+def repeat_size(value, count):
+    if (value.__class__ is str or value.__class__ is Rope) and count.__class__ is int:
+        return len(value) * count
+    return 0
+
+@native('repeat', 2, size=repeat_size)
+def native_repeat(value, count):
+    return text('repeat', value) * integer('repeat', count)
+
+@native('len', 1)
+def native_len(value):
+    if value.__class__ is not str and value.__class__ is not Rope and value.__class__ is not JanArray:
+        raise Exception("len needs a string or an array")
+    return len(value)
+
+@native('str', 1)
+def native_str(value):
+    # The same text `"" + value` gives.
+    return str(value)
+
+def parse_number(name, value, convert):
+    if value.__class__ is Rope:
+        value = str(value)
+    if value.__class__ is str:
+        try:
+            return convert(value.strip())
+        except ValueError:
+            raise Exception(f"Cannot convert '{value}' to a number")
+    return convert(number(name, value))
+
+@native('number', 1)
+def native_number(value):
+    if value.__class__ is int or value.__class__ is float:
+        return value
+    try:
+        return parse_number('number', value, int)
+    except Exception:
+        return parse_number('number', value, float)
+
+@native('int', 1)
+def native_int(value):
+    if value.__class__ is str or value.__class__ is Rope:
+        value = parse_number('int', value, float)
+    try:
+        return int(number('int', value))
+    except (ValueError, OverflowError):
+        raise Exception(f"Cannot convert '{value}' to an integer")
+
+@native('float', 1)
+def native_float(value):
+    return parse_number('float', value, float)
+
+TYPE_NAMES = {int: "number", float: "number", str: "string", Rope: "string", bool: "bool",
+              type(None): "nil", JanArray: "array"}
+
+@native('type', 1)
+def native_type(value):
+    return TYPE_NAMES.get(value.__class__, "function")
+
+@native('clock', 0, pure=False)
+def native_clock():
+    return time.perf_counter()
+
+@native('time', 0, pure=False)
+def native_time():
+    return time.time()
+
+@native('print', None, pure=False)
+def native_print(*values):
+    print(*values)
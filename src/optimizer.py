@@ -0,0 +1,181 @@
+from .ast import *
+from .interpreter import Interpreter
+
+LITERALS = (NumberLiteral, StringLiteral, BooleanLiteral, NilLiteral)
+
+def is_literal(expr):
+    return isinstance(expr, LITERALS)
+
+def make_literal(value):
+    if value is None:
+        return NilLiteral()
+    if isinstance(value, bool):
+        return BooleanLiteral(value)
+    if isinstance(value, (int, float)):
+        return NumberLiteral(value)
+    if isinstance(value, str):
+        return StringLiteral(value)
+    return None
+
+def literal_value(expr):
+    if isinstance(expr, NilLiteral):
+        return None
+    return expr.value
+
+def is_number_literal(expr, value):
+    return (isinstance(expr, NumberLiteral) and type(expr.value) is type(value)
+            and expr.value == value)
+
+class Optimizer:
+    def __init__(self):
+        self.evaluator = Interpreter()
+
+    def optimize(self, program):
+        if isinstance(program, Program):
+            program.statements = self.optimize_statements(program.statements)
+            return program
+        return self.optimize_statement(program) or Block([])
+
+    def optimize_statements(self, statements):
+        optimized = []
+        for statement in statements:
+            statement = self.optimize_statement(statement)
+            if statement is not None:
+                optimized.append(statement)
+        return optimized
+
+    def optimize_branch(self, stmt):
+        optimized = self.optimize_statement(stmt)
+        return optimized if optimized is not None else Block([])
+
+    def optimize_statement(self, stmt):
+        if isinstance(stmt, ExpressionStatement):
+            stmt.expression = self.optimize_expression(stmt.expression)
+        elif isinstance(stmt, Assignment):
+            stmt.value = self.optimize_expression(stmt.value)
+        elif isinstance(stmt, VariableDeclaration):
+            stmt.initializer = self.optimize_expression(stmt.initializer)
+        elif isinstance(stmt, IfStatement):
+            stmt.condition = self.optimize_expression(stmt.condition)
+            if is_literal(stmt.condition):
+                if self.evaluator.is_truthy(literal_value(stmt.condition)):
+                    return self.optimize_statement(stmt.then_branch)
+                if stmt.else_branch:
+                    return self.optimize_statement(stmt.else_branch)
+                return None
+            stmt.then_branch = self.optimize_branch(stmt.then_branch)
+            if stmt.else_branch:
+                stmt.else_branch = self.optimize_statement(stmt.else_branch)
+        elif isinstance(stmt, WhileStatement):
+            stmt.condition = self.optimize_expression(stmt.condition)
+            if is_literal(stmt.condition) and not self.evaluator.is_truthy(literal_value(stmt.condition)):
+                return None
+            stmt.body = self.optimize_branch(stmt.body)
+        elif isinstance(stmt, ForStatement):
+            stmt.start = self.optimize_expression(stmt.start)
+            stmt.end = self.optimize_expression(stmt.end)
+            if stmt.step is not None:
+                stmt.step = self.optimize_expression(stmt.step)
+            stmt.body = self.optimize_branch(stmt.body)
+        elif isinstance(stmt, (Block, IndentedBlock)):
+            stmt.statements = self.optimize_statements(stmt.statements)
+        elif isinstance(stmt, FunctionDeclaration):
+            stmt.body.statements = self.optimize_statements(stmt.body.statements)
+        elif isinstance(stmt, ReturnStatement):
+            if stmt.value:
+                stmt.value = self.optimize_expression(stmt.value)
+        elif isinstance(stmt, IndexAssignment):
+            stmt.target = self.optimize_expression(stmt.target)
+            stmt.index = self.optimize_expression(stmt.index)
+            stmt.value = self.optimize_expression(stmt.value)
+        return stmt
+
+    def optimize_expression(self, expr):
+        if isinstance(expr, BinaryOp):
+            expr.left = self.optimize_expression(expr.left)
+            expr.right = self.optimize_expression(expr.right)
+            if is_literal(expr.left) and is_literal(expr.right):
+                return self.fold(expr)
+            return self.simplify(expr)
+        elif isinstance(expr, UnaryOp):
+            expr.operand = self.optimize_expression(expr.operand)
+            if is_literal(expr.operand):
+                return self.fold(expr)
+        elif isinstance(expr, FunctionCall):
+            expr.callee = self.optimize_expression(expr.callee)
+            expr.arguments = [self.optimize_expression(argument) for argument in expr.arguments]
+        elif isinstance(expr, IndexExpression):
+            expr.target = self.optimize_expression(expr.target)
+            expr.index = self.optimize_expression(expr.index)
+        elif isinstance(expr, MethodCall):
+            expr.target = self.optimize_expression(expr.target)
+            expr.arguments = [self.optimize_expression(argument) for argument in expr.arguments]
+        elif isinstance(expr, ArrayLiteral):
+            expr.elements = [self.optimize_expression(element) for element in expr.elements]
+        elif isinstance(expr, ArrayFill):
+            expr.value = self.optimize_expression(expr.value)
+            expr.count = self.optimize_expression(expr.count)
+        return expr
+
+    def fold(self, expr):
+        # Anything that would raise at runtime (division by zero, type
+        # errors) is left in place so the error still happens when executed.
+        try:
+            value = self.evaluator.evaluate(expr)
+        except Exception:
+            return expr
+        literal = make_literal(value)
+        return literal if literal is not None else expr
+
+    def simplify(self, expr):
+        left, operator, right = expr.left, expr.operator, expr.right
+
+        if operator == '*':
+            if is_number_literal(right, 1) and self.number_kind(left):
+                return left
+            if is_number_literal(left, 1) and self.number_kind(right):
+                return right
+        elif operator == '+':
+            # x + 0 is only an identity for ints: strings concatenate and
+            # -0.0 + 0 is 0.0.
+            if is_number_literal(right, 0) and self.number_kind(left) == 'int':
+                return left
+            if is_number_literal(left, 0) and self.number_kind(right) == 'int':
+                return right
+        elif operator == '-':
+            if is_number_literal(right, 0) and self.number_kind(left):
+                return left
+        elif operator == '/':
+            if is_number_literal(right, 1) and self.number_kind(left) == 'float':
+                return left
+        return expr
+
+    def number_kind(self, expr):
+        # 'int', 'float' or 'number' when the expression is known to produce
+        # a number if it produces a value at all, otherwise None.
+        if isinstance(expr, NumberLiteral):
+            if isinstance(expr.value, bool):
+                return None
+            return 'int' if isinstance(expr.value, int) else 'float'
+        if isinstance(expr, UnaryOp) and expr.operator == '-':
+            return self.number_kind(expr.operand) or 'number'
+        if isinstance(expr, BinaryOp):
+            if expr.operator == '/':
+                return 'float'
+            if expr.operator in ('-', '*'):
+                left, right = self.number_kind(expr.left), self.number_kind(expr.right)
+                return self.combine_kinds(left, right) or 'number'
+            if expr.operator == '+':
+                left, right = self.number_kind(expr.left), self.number_kind(expr.right)
+                if left and right:
+                    return self.combine_kinds(left, right)
+        return None
+
+    def combine_kinds(self, left, right):
+        if left == 'int' and right == 'int':
+            return 'int'
+        if left == 'float' or right == 'float':
+            return 'float'
+        if left and right:
+            return 'number'
+        return None
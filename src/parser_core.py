@@ -0,0 +1,266 @@
+from .tokens import TokenStream, TokenType
+from .ast import *
+
+# Words that may come before function to force or forbid memoizing it.
+FUNCTION_MODIFIERS = ('pure', 'impure')
+
+# How tightly each binary operator holds its operands; all of them are
+# left-associative. Prefix operators and postfix indexing, calls and
+# method calls bind tighter than any of these.
+BINARY_POWERS = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.EQUALS: 3,
+    TokenType.NOT_EQUALS: 3,
+    TokenType.LESS_THAN: 4,
+    TokenType.GREATER_THAN: 4,
+    TokenType.LESS_EQUALS: 4,
+    TokenType.GREATER_EQUALS: 4,
+    TokenType.PLUS: 5,
+    TokenType.MINUS: 5,
+    TokenType.MULTIPLY: 6,
+    TokenType.DIVIDE: 6,
+}
+
+LITERALS = {
+    TokenType.NUMBER: NumberLiteral,
+    TokenType.STRING: StringLiteral,
+}
+
+CONSTANTS = {
+    TokenType.TRUE: lambda: BooleanLiteral(True),
+    TokenType.FALSE: lambda: BooleanLiteral(False),
+    TokenType.NIL: NilLiteral,
+}
+
+class ParserCore:
+    # Token handling, the statements both surface syntaxes share and a
+    # Pratt expression parser: one loop driven by BINARY_POWERS instead of
+    # a method per precedence level. Parser and SimpleParser supply the
+    # statements whose syntax differs.
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.stream = TokenStream(lexer)
+        self.current_token = None
+        self.previous_token = None
+        self.next_token()
+
+    def next_token(self):
+        self.previous_token = self.current_token
+        self.current_token = self.stream.next()
+
+    def peek(self, offset=1):
+        return self.stream.peek(offset)
+
+    def expect(self, token_type):
+        if self.current_token.type == token_type:
+            token = self.current_token
+            self.next_token()
+            return token
+        else:
+            raise Exception(f"Expected {token_type}, got {self.current_token.type}")
+
+    def expect_word(self, word):
+        if self.current_token.type != TokenType.IDENTIFIER or self.current_token.value != word:
+            raise Exception(f"Expected '{word}', got {self.current_token.type}")
+        self.next_token()
+
+    def starts_line(self):
+        previous = self.previous_token
+        return previous is None or previous.line != self.current_token.line
+
+    def parse(self):
+        statements = []
+        while self.current_token.type != TokenType.EOF:
+            statements.append(self.parse_statement())
+        return Program(statements)
+
+    def parse_statement(self):
+        line = self.current_token.line
+        statement = self.parse_bare_statement()
+        statement.line = line
+        return statement
+
+    def parse_bare_statement(self):
+        token_type = self.current_token.type
+        if token_type == TokenType.IDENTIFIER:
+            # pure and impure are only keywords in front of function, so
+            # they stay usable as names everywhere else.
+            if self.current_token.value in FUNCTION_MODIFIERS and self.peek().type == TokenType.FUNCTION:
+                return self.parse_function_modifier()
+            return self.parse_identifier_statement()
+        elif token_type == TokenType.VAR:
+            return self.parse_variable_declaration()
+        elif token_type == TokenType.IF:
+            return self.parse_if_statement()
+        elif token_type == TokenType.WHILE:
+            return self.parse_while_statement()
+        elif token_type == TokenType.FOR:
+            return self.parse_for_statement()
+        elif token_type == TokenType.FUNCTION:
+            return self.parse_function_declaration()
+        elif token_type == TokenType.RETURN:
+            return self.parse_return_statement()
+        else:
+            return self.parse_expression_statement(self.parse_expression())
+
+    def parse_expression_statement(self, expr):
+        return ExpressionStatement(expr)
+
+    def parse_if_statement(self):
+        self.expect(TokenType.IF)
+        condition = self.parse_expression()
+        then_branch = self.parse_statement()
+
+        else_branch = None
+        if self.current_token.type == TokenType.ELSE:
+            self.next_token()
+            else_branch = self.parse_statement()
+
+        return IfStatement(condition, then_branch, else_branch)
+
+    def parse_while_statement(self):
+        self.expect(TokenType.WHILE)
+        condition = self.parse_expression()
+        body = self.parse_statement()
+        return WhileStatement(condition, body)
+
+    def parse_for_statement(self):
+        # from, to and step are only keywords here, so they stay usable as
+        # variable names everywhere else.
+        self.expect(TokenType.FOR)
+        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect_word('from')
+        start = self.parse_expression()
+        self.expect_word('to')
+        end = self.parse_expression()
+        step = None
+        if self.current_token.type == TokenType.IDENTIFIER and self.current_token.value == 'step':
+            self.next_token()
+            step = self.parse_expression()
+        body = self.parse_statement()
+        return ForStatement(name, start, end, step, body)
+
+    def parse_function_declaration(self):
+        self.expect(TokenType.FUNCTION)
+        name = self.expect(TokenType.IDENTIFIER).value
+
+        params = []
+        while self.current_token.type == TokenType.IDENTIFIER:
+            params.append(self.expect(TokenType.IDENTIFIER).value)
+
+        body = self.parse_indented_block()
+        return FunctionDeclaration(name, params, body)
+
+    def parse_function_modifier(self):
+        memoize = self.current_token.value == 'pure'
+        self.next_token()
+        declaration = self.parse_function_declaration()
+        declaration.memoize = memoize
+        return declaration
+
+    def parse_return_statement(self):
+        self.expect(TokenType.RETURN)
+        value = None
+        if self.current_token.type != TokenType.EOF:
+            value = self.parse_expression()
+        return ReturnStatement(value)
+
+    def parse_expression(self, min_power=0):
+        left = self.parse_unary()
+        powers = BINARY_POWERS
+        while True:
+            token = self.current_token
+            power = powers.get(token.type, 0)
+            if power <= min_power:
+                return left
+            self.next_token()
+            left = BinaryOp(left, token.value, self.parse_expression(power))
+
+    def parse_unary(self):
+        token = self.current_token
+        if token.type == TokenType.MINUS or token.type == TokenType.NOT:
+            self.next_token()
+            return UnaryOp(token.value, self.parse_unary())
+
+        return self.parse_postfix(self.parse_primary())
+
+    def parse_postfix(self, expr):
+        while True:
+            token_type = self.current_token.type
+            if token_type == TokenType.DOT:
+                self.next_token()
+                name = self.expect(TokenType.IDENTIFIER).value
+                arguments = []
+                if self.current_token.type == TokenType.LPAREN and not self.starts_line():
+                    self.next_token()
+                    arguments = self.parse_arguments(TokenType.RPAREN)
+                expr = MethodCall(expr, name, arguments)
+            # A bracket or parenthesis that starts a new line begins a new
+            # expression, not an index into or a call of the previous line's.
+            elif token_type == TokenType.LBRACKET and not self.starts_line():
+                self.next_token()
+                index = self.parse_expression()
+                self.expect(TokenType.RBRACKET)
+                expr = IndexExpression(expr, index)
+            elif token_type == TokenType.LPAREN and not self.starts_line():
+                self.next_token()
+                expr = FunctionCall(expr, self.parse_arguments(TokenType.RPAREN))
+            else:
+                return expr
+
+    def parse_arguments(self, end):
+        arguments = []
+        while self.current_token.type != end:
+            arguments.append(self.parse_expression())
+            if self.current_token.type != TokenType.COMMA:
+                break
+            self.next_token()
+        self.expect(end)
+        return arguments
+
+    def parse_array(self):
+        self.expect(TokenType.LBRACKET)
+        if self.current_token.type == TokenType.RBRACKET:
+            self.next_token()
+            return ArrayLiteral([])
+        first = self.parse_expression()
+        if self.current_token.type == TokenType.SEMICOLON:
+            self.next_token()
+            count = self.parse_expression()
+            self.expect(TokenType.RBRACKET)
+            return ArrayFill(first, count)
+        if self.current_token.type == TokenType.COMMA:
+            self.next_token()
+            return ArrayLiteral([first] + self.parse_arguments(TokenType.RBRACKET))
+        self.expect(TokenType.RBRACKET)
+        return ArrayLiteral([first])
+
+    def parse_primary(self):
+        token = self.current_token
+        token_type = token.type
+
+        if token_type == TokenType.IDENTIFIER:
+            self.next_token()
+            return Identifier(token.value)
+
+        literal = LITERALS.get(token_type)
+        if literal is not None:
+            self.next_token()
+            return literal(token.value)
+
+        constant = CONSTANTS.get(token_type)
+        if constant is not None:
+            self.next_token()
+            return constant()
+
+        if token_type == TokenType.LPAREN:
+            self.next_token()
+            expr = self.parse_expression()
+            self.expect(TokenType.RPAREN)
+            return expr
+
+        if token_type == TokenType.LBRACKET:
+            return self.parse_array()
+
+        raise Exception(f"Unexpected token: {token_type}")
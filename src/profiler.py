@@ -0,0 +1,147 @@
+import json
+import sys
+import time
+
+from .interpreter import Interpreter
+from .natives import NativeFunction
+
+class FunctionStats:
+    def __init__(self, name, line):
+        self.name = name
+        self.line = line
+        self.calls = 0
+        self.total = 0.0
+        self.self_time = 0.0
+
+    def to_dict(self):
+        return {'name': self.name, 'line': self.line, 'calls': self.calls,
+                'total': self.total, 'self': self.self_time}
+
+class LineStats:
+    def __init__(self, line):
+        self.line = line
+        self.hits = 0
+        self.time = 0.0
+
+    def to_dict(self):
+        return {'line': self.line, 'hits': self.hits, 'time': self.time}
+
+class ProfilingInterpreter(Interpreter):
+    # Tail calls are turned off so every Jan call has its own Python frame
+    # to time; very deep tail recursion can hit the recursion limit here.
+    optimize_tail_calls = False
+
+    def __init__(self, *args, clock=time.perf_counter, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.clock = clock
+        self.function_stats = {}
+        self.line_stats = {}
+        self.program = FunctionStats('<program>', None)
+        # Each frame is [stats, start, time spent in callees or, for lines,
+        # in statements on other lines].
+        self.frames = []
+        self.line_frames = []
+        self.active = {}
+        self.current_line = None
+
+    def interpret(self, statements):
+        self.enter(self.program)
+        try:
+            super().interpret(statements)
+        finally:
+            self.leave()
+
+    def execute(self, stmt):
+        line = stmt.line
+        if line is None:
+            return super().execute(stmt)
+
+        stats = self.line_stats.get(line)
+        if stats is None:
+            stats = self.line_stats[line] = LineStats(line)
+        stats.hits += 1
+
+        # Statements nested on the line that is already being timed (a
+        # one-line while body, say) are counted but not timed twice.
+        if line == self.current_line:
+            return super().execute(stmt)
+
+        previous = self.current_line
+        self.current_line = line
+        self.line_frames.append([stats, self.clock(), 0.0])
+        try:
+            return super().execute(stmt)
+        finally:
+            stats, start, children = self.line_frames.pop()
+            elapsed = self.clock() - start
+            stats.time += elapsed - children
+            if self.line_frames:
+                self.line_frames[-1][2] += elapsed
+            self.current_line = previous
+
+    def evaluate_function_call(self, expr):
+        callee, arguments = self.prepare_call(expr)
+        if callee.__class__ is NativeFunction:
+            key, name, line = callee, callee.name, None
+        else:
+            key, name, line = callee.declaration, callee.declaration.name, callee.declaration.line
+
+        stats = self.function_stats.get(key)
+        if stats is None:
+            stats = self.function_stats[key] = FunctionStats(name, line)
+
+        # The callee's statements are timed on their own lines even when a
+        # recursive call re-enters the line that made it.
+        previous = self.current_line
+        self.current_line = None
+        self.enter(stats)
+        try:
+            return callee.call(self, arguments)
+        finally:
+            self.leave()
+            self.current_line = previous
+
+    def enter(self, stats):
+        stats.calls += 1
+        self.active[stats] = self.active.get(stats, 0) + 1
+        self.frames.append([stats, self.clock(), 0.0])
+
+    def leave(self):
+        stats, start, children = self.frames.pop()
+        elapsed = self.clock() - start
+        stats.self_time += elapsed - children
+        # Recursive calls are already inside the outermost call's total.
+        self.active[stats] -= 1
+        if not self.active[stats]:
+            stats.total += elapsed
+        if self.frames:
+            self.frames[-1][2] += elapsed
+
+    def function_report(self):
+        return sorted([self.program] + list(self.function_stats.values()),
+                      key=lambda stats: stats.self_time, reverse=True)
+
+    def line_report(self):
+        return sorted(self.line_stats.values(), key=lambda stats: stats.time, reverse=True)
+
+    def to_dict(self):
+        return {
+            'functions': [stats.to_dict() for stats in self.function_report()],
+            'lines': [stats.to_dict() for stats in self.line_report()],
+        }
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_report(self, out=None, limit=20):
+        out = out or sys.stderr
+        print(f"{'function':<24} {'line':>6} {'calls':>9} {'total ms':>11} {'self ms':>11}", file=out)
+        for stats in self.function_report()[:limit]:
+            line = '' if stats.line is None else stats.line
+            print(f"{stats.name:<24} {line:>6} {stats.calls:>9} {stats.total * 1000:>11.3f} "
+                  f"{stats.self_time * 1000:>11.3f}", file=out)
+        print(file=out)
+        print(f"{'line':>6} {'hits':>9} {'time ms':>11}", file=out)
+        for stats in self.line_report()[:limit]:
+            print(f"{stats.line:>6} {stats.hits:>9} {stats.time * 1000:>11.3f}", file=out)
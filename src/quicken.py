@@ -0,0 +1,67 @@
+import operator
+
+from .rope import Rope, concat
+
+# A BinaryOp that keeps seeing new operand types after this many rewrites is
+# left on the generic path for good.
+MAX_RESPECIALIZATIONS = 4
+
+# Stored on a BinaryOp whose site turned out to be polymorphic.
+MEGAMORPHIC = (None, None, None)
+
+def divide(left, right):
+    if right == 0:
+        raise Exception("Division by zero")
+    return left / right
+
+NUMBER_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+STRING_OPERATIONS = {
+    '+': concat,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# (operator, left type, right type) -> function giving exactly the result
+# Interpreter.evaluate_binary would. Types are matched exactly, so bool
+# (an int subclass) and None always take the generic path.
+SPECIALIZATIONS = {}
+for left_type in (int, float):
+    for right_type in (int, float):
+        for symbol, function in NUMBER_OPERATIONS.items():
+            SPECIALIZATIONS[symbol, left_type, right_type] = function
+for left_type in (str, Rope):
+    for right_type in (str, Rope):
+        for symbol, function in STRING_OPERATIONS.items():
+            SPECIALIZATIONS[symbol, left_type, right_type] = function
+# Adding a rope flattens it, which the generic path checks against the
+# memory limit first.
+for left_type in (str, Rope):
+    del SPECIALIZATIONS['+', left_type, Rope]
+
+def quicken(expr, left, right):
+    # Rewrites the site's inline cache for the operand types it just saw.
+    # The cache is a (left type, right type, function) triple that
+    # evaluate_binary checks before anything else.
+    if expr.inline_cache is MEGAMORPHIC:
+        return
+    function = SPECIALIZATIONS.get((expr.operator, left.__class__, right.__class__))
+    if function is None:
+        return
+    if expr.inline_cache is not None:
+        expr.respecializations += 1
+        if expr.respecializations > MAX_RESPECIALIZATIONS:
+            expr.inline_cache = MEGAMORPHIC
+            return
+    expr.inline_cache = (left.__class__, right.__class__, function)
@@ -0,0 +1,111 @@
+from .interpreter import Function, Interpreter, Return
+from .lexer import RegexLexer
+from .memo import DEFAULT_MEMO_SIZE, LRUCache, MISSING
+from .natives import NativeFunction
+from .parser_core import FUNCTION_MODIFIERS
+from .simple_parser import SimpleParser
+from .tokens import TokenType
+
+class ReplSession:
+    def __init__(self, engine='tree', optimize=False, memo_size=DEFAULT_MEMO_SIZE, parse_cache_size=256):
+        self.engine = engine
+        self.optimize = optimize
+        self.buffer = []
+        self.parsed = LRUCache(parse_cache_size)
+        self.optimizer = None
+        if optimize:
+            from .optimizer import Optimizer
+            self.optimizer = Optimizer()
+
+        if engine == 'vm':
+            from .vm import VM
+            self.runtime = VM()
+        elif engine == 'closure':
+            from .closures import ClosureInterpreter
+            self.runtime = ClosureInterpreter()
+        else:
+            self.runtime = Interpreter(memo_size)
+
+    @property
+    def globals(self):
+        return self.runtime.globals
+
+    def push(self, line):
+        # Returns True while more input is needed. A function body has no
+        # terminator, so it runs until a blank line; anything else runs as
+        # soon as it parses, or keeps reading if it stopped at end of input.
+        # A blank line always ends the input.
+        self.buffer.append(line)
+        source = "\n".join(self.buffer)
+        if line.strip():
+            if self.opens_block():
+                return True
+            if self.parse(source, incomplete_ok=True) is None:
+                return True
+        self.buffer = []
+        if source.strip():
+            self.execute(source)
+        return False
+
+    def opens_block(self):
+        words = self.buffer[0].split(None, 2)
+        if words and words[0] in FUNCTION_MODIFIERS:
+            words = words[1:]
+        return bool(words) and words[0] == 'function'
+
+    def reset_buffer(self):
+        self.buffer = []
+
+    def parse(self, source, incomplete_ok=False):
+        program = self.parsed.get(source)
+        if program is not MISSING:
+            return program
+
+        parser = SimpleParser(RegexLexer(source))
+        try:
+            program = parser.parse()
+        except Exception:
+            if incomplete_ok and parser.current_token.type == TokenType.EOF:
+                return None
+            raise
+
+        if self.optimizer is not None:
+            program = self.optimizer.optimize(program)
+        self.parsed.put(source, program)
+        return program
+
+    def execute(self, source):
+        program = self.parse(source)
+        before = self.function_bindings()
+        try:
+            if self.engine == 'vm':
+                from .compiler import Compiler
+                self.runtime.run(Compiler(self.runtime.globals.scope).compile(program))
+            else:
+                self.runtime.interpret(program)
+        except Return as returned:
+            if returned.value is not None:
+                print(returned.value)
+        finally:
+            self.recover(before)
+
+    def function_bindings(self):
+        if not isinstance(self.runtime, Interpreter):
+            return None
+        environment = self.runtime.globals
+        return {name: value for name, value in zip(environment.scope.names, environment.values)
+                if isinstance(value, (Function, NativeFunction))}
+
+    def recover(self, before):
+        runtime = self.runtime
+        if not isinstance(runtime, Interpreter):
+            return
+        # An error can leave the interpreter inside a block or a call.
+        runtime.environment = runtime.globals
+        runtime.return_value = None
+        runtime.tail_call = None
+        # Memoized results may depend on the function a global name used to
+        # hold, so rebinding any function drops every cache.
+        after = self.function_bindings()
+        if any(after.get(name) is not function for name, function in before.items()):
+            runtime.clear_memo()
@@ -0,0 +1,129 @@
+from .ast import *
+
+class Scope:
+    def __init__(self):
+        self.slots = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def declare(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+class Resolver:
+    def __init__(self, globals_scope=None):
+        self.scopes = [globals_scope if globals_scope is not None else Scope()]
+
+    def resolve(self, program):
+        statements = program.statements if isinstance(program, Program) else [program]
+        self.resolve_body(statements)
+        return program
+
+    def resolve_body(self, statements):
+        scope = self.scopes[-1]
+        for statement in statements:
+            self.declare(scope, statement)
+        for statement in statements:
+            self.resolve_statement(statement)
+
+    def declare(self, scope, stmt):
+        # Names bound by statements that run in the enclosing environment
+        # (if/while bodies are not blocks of their own) belong to this scope.
+        if isinstance(stmt, (Assignment, VariableDeclaration, FunctionDeclaration)):
+            scope.declare(stmt.name)
+        elif isinstance(stmt, IfStatement):
+            self.declare(scope, stmt.then_branch)
+            if stmt.else_branch:
+                self.declare(scope, stmt.else_branch)
+        elif isinstance(stmt, WhileStatement):
+            self.declare(scope, stmt.body)
+        elif isinstance(stmt, ForStatement):
+            scope.declare(stmt.name)
+            self.declare(scope, stmt.body)
+
+    def begin_scope(self):
+        scope = Scope()
+        self.scopes.append(scope)
+        return scope
+
+    def end_scope(self):
+        self.scopes.pop()
+
+    def lookup(self, name):
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot = scope.slots.get(name)
+            if slot is not None:
+                return depth, slot
+        return None, None
+
+    def resolve_statement(self, stmt):
+        if isinstance(stmt, ExpressionStatement):
+            self.resolve_expression(stmt.expression)
+        elif isinstance(stmt, Assignment):
+            self.resolve_expression(stmt.value)
+            stmt.depth, stmt.slot = self.lookup(stmt.name)
+        elif isinstance(stmt, VariableDeclaration):
+            self.resolve_expression(stmt.initializer)
+            stmt.depth, stmt.slot = self.lookup(stmt.name)
+        elif isinstance(stmt, IfStatement):
+            self.resolve_expression(stmt.condition)
+            self.resolve_statement(stmt.then_branch)
+            if stmt.else_branch:
+                self.resolve_statement(stmt.else_branch)
+        elif isinstance(stmt, WhileStatement):
+            self.resolve_expression(stmt.condition)
+            self.resolve_statement(stmt.body)
+        elif isinstance(stmt, ForStatement):
+            self.resolve_expression(stmt.start)
+            self.resolve_expression(stmt.end)
+            if stmt.step is not None:
+                self.resolve_expression(stmt.step)
+            stmt.depth, stmt.slot = self.lookup(stmt.name)
+            self.resolve_statement(stmt.body)
+        elif isinstance(stmt, (Block, IndentedBlock)):
+            stmt.scope = self.begin_scope()
+            self.resolve_body(stmt.statements)
+            self.end_scope()
+        elif isinstance(stmt, FunctionDeclaration):
+            stmt.scope = self.begin_scope()
+            stmt.param_slots = [stmt.scope.declare(param) for param in stmt.params]
+            self.resolve_body(stmt.body.statements)
+            self.end_scope()
+        elif isinstance(stmt, ReturnStatement):
+            if stmt.value:
+                self.resolve_expression(stmt.value)
+        elif isinstance(stmt, IndexAssignment):
+            self.resolve_expression(stmt.target)
+            self.resolve_expression(stmt.index)
+            self.resolve_expression(stmt.value)
+
+    def resolve_expression(self, expr):
+        if isinstance(expr, BinaryOp):
+            self.resolve_expression(expr.left)
+            self.resolve_expression(expr.right)
+        elif isinstance(expr, UnaryOp):
+            self.resolve_expression(expr.operand)
+        elif isinstance(expr, Identifier):
+            expr.depth, expr.slot = self.lookup(expr.name)
+        elif isinstance(expr, FunctionCall):
+            self.resolve_expression(expr.callee)
+            for argument in expr.arguments:
+                self.resolve_expression(argument)
+        elif isinstance(expr, IndexExpression):
+            self.resolve_expression(expr.target)
+            self.resolve_expression(expr.index)
+        elif isinstance(expr, MethodCall):
+            self.resolve_expression(expr.target)
+            for argument in expr.arguments:
+                self.resolve_expression(argument)
+        elif isinstance(expr, ArrayLiteral):
+            for element in expr.elements:
+                self.resolve_expression(element)
+        elif isinstance(expr, ArrayFill):
+            self.resolve_expression(expr.value)
+            self.resolve_expression(expr.count)
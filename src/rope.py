@@ -0,0 +1,62 @@
+# Concatenations shorter than this produce ordinary strings.
+ROPE_THRESHOLD = 256
+
+class Rope:
+    # A Jan string built by concatenation, kept as a list of pieces until
+    # something needs its characters. Appending to the newest rope made from
+    # a piece list extends that list in place, so `s = s + piece` in a loop
+    # is linear; older ropes keep seeing only the prefix they were made with.
+    __slots__ = ('pieces', 'count', 'length', 'flat')
+
+    def __init__(self, pieces, count, length):
+        self.pieces = pieces
+        self.count = count
+        self.length = length
+        self.flat = None
+
+    def append(self, piece):
+        pieces = self.pieces
+        if len(pieces) != self.count:
+            pieces = pieces[:self.count]
+        pieces.append(piece)
+        return Rope(pieces, self.count + 1, self.length + len(piece))
+
+    def __str__(self):
+        flat = self.flat
+        if flat is None:
+            flat = self.flat = ''.join(self.pieces[:self.count])
+        return flat
+
+    def __len__(self):
+        return self.length
+
+    def __eq__(self, other):
+        if other.__class__ is Rope:
+            return self.length == other.length and str(self) == str(other)
+        if other.__class__ is str:
+            return self.length == len(other) and str(self) == other
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+def concat(left, right):
+    # Jan's string +: the other operand is converted with str().
+    if right.__class__ is not str:
+        right = str(right)
+    if left.__class__ is Rope:
+        return left.append(right)
+    if left.__class__ is not str:
+        left = str(left)
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        return left + right
+    return Rope([left, right], 2, len(left) + len(right))
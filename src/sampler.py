@@ -0,0 +1,87 @@
+import sys
+import threading
+import time
+from collections import Counter
+
+from .interpreter import Function
+
+CALL_CODE = Function.call.__code__
+
+def is_execute(code):
+    # Interpreter.execute and any subclass override of it.
+    return code.co_name == 'execute' and code.co_varnames[:2] == ('self', 'stmt')
+
+def jan_stack(frame):
+    # Rebuilds the Jan call stack, outermost first, from a Python frame by
+    # pairing each Function.call frame with the innermost statement that
+    # was running inside it.
+    stack = []
+    line = None
+    while frame is not None:
+        code = frame.f_code
+        if code is CALL_CODE:
+            local_values = frame.f_locals
+            # 'function' is rebound on every tail call; before its first
+            # assignment the callee is still 'self'.
+            function = local_values.get('function') or local_values.get('self')
+            name = function.declaration.name
+            stack.append(f"{name}:{line}" if line is not None else name)
+            line = None
+        elif line is None and is_execute(code):
+            stmt = frame.f_locals.get('stmt')
+            if stmt is not None and stmt.line is not None:
+                line = stmt.line
+        frame = frame.f_back
+    stack.append(f"<program>:{line}" if line is not None else "<program>")
+    stack.reverse()
+    return stack
+
+class Sampler:
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = Counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name='jan-sampler', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def run(self):
+        while self.running:
+            time.sleep(self.interval)
+            self.sample()
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = jan_stack(frame)
+        # Samples taken before the program starts or after it finishes
+        # only see the driver; they say nothing about the Jan code.
+        if stack != ["<program>"]:
+            self.samples[";".join(stack)] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.samples.items()))
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write(self.collapsed())
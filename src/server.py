@@ -0,0 +1,191 @@
+import json
+import multiprocessing
+import os
+import queue
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .execution import ENGINES, limit_engines, run_captured
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 5.0
+MAX_REQUEST_BYTES = 1 << 20
+
+WARM_UP = 'var a is 1 + 2 * 3\nvar b is "jan" + a\nwhile a < 10 a = a + 1\n'
+
+def warm_worker():
+    # Runs in every worker as it starts, so imports and first-use costs are
+    # paid before the first request arrives.
+    for engine in ENGINES:
+        run_captured(WARM_UP, engine)
+
+def run_job(code, engine, optimize, timeout, limits):
+    return run_captured(code, engine, optimize, timeout=timeout, limits=limits)
+
+def serve_jobs(connection):
+    warm_worker()
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        connection.send(run_job(*job))
+
+class Worker:
+    # One pre-warmed process that runs a single snippet at a time, so a
+    # snippet that has to be killed takes no other request down with it.
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=serve_jobs, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def run(self, job, timeout):
+        # None if the worker did not answer in time or died.
+        try:
+            self.connection.send(job)
+            if self.connection.poll(timeout):
+                return self.connection.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class WorkerPool:
+    def __init__(self, processes=None, timeout=DEFAULT_TIMEOUT, limits=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.timeout = timeout
+        self.limits = limits
+        self.engines = limit_engines(limits)
+        self.context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        self.idle = queue.Queue()
+        for _ in range(self.processes):
+            self.idle.put(Worker(self.context))
+
+    def run(self, code, engine='tree', optimize=False):
+        worker = self.idle.get()
+        # Workers stop themselves at the time limit; the grace period
+        # only matters if a worker is wedged outside the interpreter.
+        result = worker.run((code, engine, optimize, self.timeout, self.limits), self.timeout + 1 if self.timeout else None)
+        if result is None:
+            # Only this worker is replaced; the others keep running their
+            # requests.
+            stuck = worker.process.is_alive()
+            worker.stop()
+            worker = Worker(self.context)
+            if stuck:
+                error, run_ms = f"Time limit of {self.timeout:g}s exceeded", self.timeout * 1000
+            else:
+                error, run_ms = "Worker stopped unexpectedly", 0.0
+            result = {'output': '', 'truncated': False, 'error': error, 'limit': None,
+                      'timing': {'parse_ms': 0.0, 'run_ms': run_ms}}
+        self.idle.put(worker)
+        return result
+
+    def close(self):
+        for _ in range(self.processes):
+            self.idle.get().stop()
+
+class PlaygroundHandler(BaseHTTPRequestHandler):
+    server_version = 'JanServer'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_cors_headers()
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_cors_headers(self):
+        # Only sent when the server was given an origin, such as the
+        # playground's dev server, that may call it from a browser.
+        if self.server.cors_origin is None:
+            return
+        self.send_header('Access-Control-Allow-Origin', self.server.cors_origin)
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_cors_headers()
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok', 'workers': self.server.workers.processes,
+                                 'engines': self.server.workers.engines})
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/run':
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            self.send_json(400, {'error': 'Invalid Content-Length'})
+            return
+        if length < 0:
+            self.send_json(400, {'error': 'Invalid Content-Length'})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {'error': 'Request too large'})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': 'Request body must be JSON'})
+            return
+        if not isinstance(request, dict):
+            self.send_json(400, {'error': 'Request body must be a JSON object'})
+            return
+
+        code = request.get('code')
+        engine = request.get('engine', 'tree')
+        if not isinstance(code, str):
+            self.send_json(400, {'error': "'code' must be a string"})
+            return
+        engines = self.server.workers.engines
+        if engine not in engines:
+            self.send_json(400, {'error': f"'engine' must be one of {', '.join(engines)}"})
+            return
+
+        start = time.perf_counter()
+        result = self.server.workers.run(code, engine, bool(request.get('optimize')))
+        result['timing']['total_ms'] = (time.perf_counter() - start) * 1000
+        self.send_json(200, result)
+
+class PlaygroundServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, workers, verbose=False, cors_origin=None):
+        super().__init__(address, PlaygroundHandler)
+        self.workers = workers
+        self.verbose = verbose
+        self.cors_origin = cors_origin
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, processes=None, timeout=DEFAULT_TIMEOUT, verbose=True, limits=None,
+          cors_origin=None):
+    workers = WorkerPool(processes, timeout, limits)
+    server = PlaygroundServer((host, port), workers, verbose, cors_origin)
+    print(f"Jan server on http://{host}:{server.server_address[1]} with {workers.processes} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        workers.close()
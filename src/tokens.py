@@ -1,6 +1,13 @@
+import re
+from array import array
+from collections import deque
 from enum import Enum, auto
 
 class TokenType(Enum):
+    # Members are singletons, so identity hashing is equivalent to Enum's
+    # name hashing and keeps dict lookups keyed by token type in C.
+    __hash__ = object.__hash__
+    
     NUMBER = auto()
     STRING = auto()
     IDENTIFIER = auto()
@@ -14,6 +21,8 @@ class TokenType(Enum):
     RPAREN = auto()
     LBRACE = auto()
     RBRACE = auto()
+    LBRACKET = auto()
+    RBRACKET = auto()
     SEMICOLON = auto()
     COMMA = auto()
     DOT = auto()
@@ -39,6 +48,8 @@ class TokenType(Enum):
     EOF = auto()
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+    
     def __init__(self, type, value, line, column):
         self.type = type
         self.value = value
@@ -49,4 +60,132 @@ class Token:
         return f"Token({self.type}, {self.value}, line={self.line}, col={self.column})"
     
     def __repr__(self):
-        return self.__str__() 
\ No newline at end of file
+        return self.__str__()
+
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+ESCAPE_PATTERN = re.compile(r'\\([\s\S])')
+
+def unescape(match):
+    char = match.group(1)
+    return ESCAPES.get(char, char)
+
+def unescape_string(text):
+    if '\\' in text:
+        return ESCAPE_PATTERN.sub(unescape, text)
+    return text
+
+TOKEN_TYPES = tuple(TokenType)
+TOKEN_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+
+class TokenBuffer:
+    def __init__(self, source):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.line_starts = array('I', [0])
+    
+    def __len__(self):
+        return len(self.types)
+    
+    def append(self, token_type, start, end, line):
+        self.types.append(TOKEN_CODES[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+    
+    def type(self, index):
+        return TOKEN_TYPES[self.types[index]]
+    
+    def lexeme(self, index):
+        return self.source[self.starts[index]:self.ends[index]]
+    
+    def value(self, index):
+        token_type = TOKEN_TYPES[self.types[index]]
+        if token_type == TokenType.EOF:
+            return None
+        text = self.source[self.starts[index]:self.ends[index]]
+        if token_type == TokenType.NUMBER:
+            return float(text) if '.' in text else int(text)
+        if token_type == TokenType.STRING:
+            return unescape_string(text[1:-1])
+        return text
+    
+    def line(self, index):
+        return self.lines[index]
+    
+    def column(self, index):
+        return self.starts[index] - self.line_starts[self.lines[index] - 1] + 1
+    
+    def token(self, index):
+        return Token(self.type(index), self.value(index), self.line(index), self.column(index))
+    
+    def tokenize(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
+
+class TokenView:
+    __slots__ = ('buffer', 'index', 'type')
+    
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+        self.type = TOKEN_TYPES[buffer.types[index]]
+    
+    @property
+    def value(self):
+        return self.buffer.value(self.index)
+    
+    @property
+    def line(self):
+        return self.buffer.lines[self.index]
+    
+    @property
+    def column(self):
+        return self.buffer.column(self.index)
+    
+    def __str__(self):
+        return f"Token({self.type}, {self.value}, line={self.line}, col={self.column})"
+    
+    def __repr__(self):
+        return self.__str__()
+
+class TokenStream:
+    def __init__(self, source, lookahead=2):
+        self.tokens = source.tokenize() if hasattr(source, 'tokenize') else iter(source)
+        self.lookahead = lookahead
+        self.buffer = deque()
+        self.eof = None
+        self.position = 0
+    
+    def pull(self):
+        if self.eof is not None:
+            return self.eof
+        token = next(self.tokens, None)
+        if token is None:
+            token = Token(TokenType.EOF, None, 0, 0)
+        if token.type == TokenType.EOF:
+            self.eof = token
+        return token
+    
+    def next(self):
+        self.position += 1
+        if self.buffer:
+            return self.buffer.popleft()
+        if self.eof is None:
+            # pull() inlined for the common case of an ordinary token.
+            token = next(self.tokens, None)
+            if token is not None and token.type != TokenType.EOF:
+                return token
+            if token is not None:
+                self.eof = token
+                return token
+        return self.pull()
+    
+    def peek(self, offset=1):
+        if offset > self.lookahead:
+            raise Exception(f"Lookahead of {offset} exceeds buffer size {self.lookahead}")
+        while len(self.buffer) < offset:
+            self.buffer.append(self.pull())
+        return self.buffer[offset - 1]
@@ -0,0 +1,270 @@
+from .arrays import JanArray, array_operation, call_method, fill_array, index_value, make_array, negate_array, store_index
+from .compiler import *
+from .interpreter import STACK_OVERFLOW, UNDEFINED, Environment, Return, for_range
+from .natives import NativeFunction, define_natives
+
+# Frames live on the heap, so without a cap runaway recursion would run
+# until memory ran out.
+MAX_FRAMES = 100000
+
+class VMFunction:
+    def __init__(self, prototype, closure):
+        self.prototype = prototype
+        self.closure = closure
+
+    def __repr__(self):
+        return f"<function {self.prototype.name}>"
+
+def is_truthy(value):
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    return True
+
+def is_equal(a, b):
+    if a is None and b is None:
+        return True
+    if a is None:
+        return False
+    return a == b
+
+def check_number_operands(operator, left, right):
+    if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+        raise Exception(f"Operands must be numbers for {operator}")
+
+class VM:
+    def __init__(self):
+        self.globals = Environment()
+        define_natives(self.globals)
+        self.stack = []
+
+    def run(self, chunk):
+        if chunk.scope is not None and chunk.scope is not self.globals.scope:
+            self.globals = Environment(None, chunk.scope)
+            define_natives(self.globals)
+        self.globals.grow()
+        
+        stack = self.stack = []
+        frames = []
+        env = self.globals
+        global_values = env.values
+        code = chunk.code
+        constants = chunk.constants
+        names = chunk.names
+        variables = chunk.variables
+        ip = 0
+
+        while True:
+            op = code[ip]
+            arg = code[ip + 1]
+            ip += 2
+
+            if op == LOAD_LOCAL:
+                slot, name = variables[arg]
+                value = env.values[slot]
+                stack.append(env.get(name) if value is UNDEFINED else value)
+            elif op == LOAD_CONST:
+                stack.append(constants[arg])
+            elif op == JUMP_IF_FALSE:
+                value = stack.pop()
+                if value is None or value is False:
+                    ip = arg
+            elif op == STORE_LOCAL:
+                slot, name = variables[arg]
+                value = stack.pop()
+                if env.values[slot] is not UNDEFINED:
+                    env.values[slot] = value
+                else:
+                    try:
+                        env.assign(name, value)
+                    except:
+                        env.values[slot] = value
+            elif op == JUMP:
+                ip = arg
+            elif op == ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+                    stack[-1] = left + right
+                elif isinstance(left, JanArray) or isinstance(right, JanArray):
+                    stack[-1] = array_operation('+', left, right)
+                elif isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = str(left) + str(right)
+                else:
+                    raise Exception("Operands must be numbers or strings")
+            elif op == LESS:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    check_number_operands('<', left, right)
+                stack[-1] = left < right
+            elif op == SUBTRACT:
+                right = stack.pop()
+                left = stack[-1]
+                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+                    stack[-1] = left - right
+                else:
+                    stack[-1] = array_operation('-', left, right)
+            elif op == LOAD_GLOBAL:
+                slot, name = variables[arg]
+                value = global_values[slot]
+                stack.append(env.get(name) if value is UNDEFINED else value)
+            elif op == CALL:
+                function = stack[-arg - 1]
+                if function.__class__ is NativeFunction:
+                    # Builtins run in place: no frame, no environment.
+                    arguments = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg - 1:]
+                    stack.append(function.function(*arguments))
+                    continue
+                prototype = function.prototype
+                if len(frames) >= MAX_FRAMES:
+                    raise Exception(STACK_OVERFLOW)
+                frames.append((code, constants, names, variables, ip, env, len(stack) - arg - 1))
+                env = Environment(function.closure, prototype.scope)
+                if arg:
+                    arguments = stack[-arg:]
+                    if prototype.param_slots is not None:
+                        values = env.values
+                        for i, slot in enumerate(prototype.param_slots):
+                            values[slot] = arguments[i]
+                    else:
+                        for i, param in enumerate(prototype.params):
+                            env.define(param, arguments[i])
+                del stack[-arg - 1:]
+                chunk = prototype.chunk
+                code = chunk.code
+                constants = chunk.constants
+                names = chunk.names
+                variables = chunk.variables
+                ip = 0
+            elif op == CHECK_CALL:
+                callee = stack[-1]
+                if callee.__class__ is NativeFunction:
+                    callee.check_arity(arg)
+                elif not isinstance(callee, VMFunction):
+                    raise Exception("Can only call functions")
+                elif arg != len(callee.prototype.params):
+                    raise Exception(f"Expected {len(callee.prototype.params)} arguments but got {arg}")
+            elif op == RETURN:
+                if not frames:
+                    raise Return(stack.pop())
+                code, constants, names, variables, ip, env, base = frames.pop()
+                if len(stack) != base + 1:
+                    # Returning from inside a for loop leaves its iterator
+                    # under the return value.
+                    stack[base:] = [stack[-1]]
+            elif op == MULTIPLY:
+                right = stack.pop()
+                left = stack[-1]
+                if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+                    stack[-1] = left * right
+                else:
+                    stack[-1] = array_operation('*', left, right)
+            elif op == LESS_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    check_number_operands('<=', left, right)
+                stack[-1] = left <= right
+            elif op == GREATER:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    check_number_operands('>', left, right)
+                stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    check_number_operands('>=', left, right)
+                stack[-1] = left >= right
+            elif op == EQUAL:
+                right = stack.pop()
+                stack[-1] = is_equal(stack[-1], right)
+            elif op == NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = not is_equal(stack[-1], right)
+            elif op == DIVIDE:
+                right = stack.pop()
+                left = stack[-1]
+                if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+                    stack[-1] = array_operation('/', left, right)
+                elif right == 0:
+                    raise Exception("Division by zero")
+                else:
+                    stack[-1] = left / right
+            elif op == DEFINE_LOCAL:
+                env.values[variables[arg][0]] = stack.pop()
+            elif op == PRINT:
+                value = stack.pop()
+                if value is not None:
+                    print(value)
+            elif op == LOAD_NAME:
+                stack.append(env.get(names[arg]))
+            elif op == STORE_NAME:
+                value = stack.pop()
+                try:
+                    env.assign(names[arg], value)
+                except:
+                    env.define(names[arg], value)
+            elif op == DEFINE_NAME:
+                env.define(names[arg], stack.pop())
+            elif op == AND:
+                right = stack.pop()
+                stack[-1] = is_truthy(stack[-1]) and is_truthy(right)
+            elif op == OR:
+                right = stack.pop()
+                stack[-1] = is_truthy(stack[-1]) or is_truthy(right)
+            elif op == NEGATE:
+                if isinstance(stack[-1], JanArray):
+                    stack[-1] = negate_array(stack[-1])
+                elif not isinstance(stack[-1], (int, float)):
+                    raise Exception("Operand must be a number for -")
+                else:
+                    stack[-1] = -stack[-1]
+            elif op == NOT:
+                stack[-1] = not is_truthy(stack[-1])
+            elif op == POP:
+                stack.pop()
+            elif op == ENTER_SCOPE:
+                env = Environment(env, constants[arg])
+            elif op == EXIT_SCOPE:
+                env = env.enclosing
+            elif op == MAKE_FUNCTION:
+                stack[-1] = VMFunction(stack[-1], env)
+            elif op == INDEX:
+                index = stack.pop()
+                stack[-1] = index_value(stack[-1], index)
+            elif op == STORE_INDEX:
+                value = stack.pop()
+                index = stack.pop()
+                store_index(stack.pop(), index, value)
+            elif op == CALL_METHOD:
+                name, count = constants[arg]
+                arguments = stack[len(stack) - count:]
+                del stack[len(stack) - count:]
+                stack[-1] = call_method(stack[-1], name, arguments)
+            elif op == BUILD_ARRAY:
+                elements = stack[len(stack) - arg:]
+                del stack[len(stack) - arg:]
+                stack.append(make_array(elements))
+            elif op == FILL_ARRAY:
+                count = stack.pop()
+                stack[-1] = fill_array(stack[-1], count)
+            elif op == FOR_RANGE:
+                step = stack.pop()
+                end = stack.pop()
+                stack[-1] = iter(for_range(stack[-1], end, step))
+            elif op == FOR_ITER:
+                value = next(stack[-1], UNDEFINED)
+                if value is UNDEFINED:
+                    stack.pop()
+                    ip = arg
+                else:
+                    stack.append(value)
+            elif op == HALT:
+                return
+            else:
+                raise Exception(f"Unknown opcode: {op}")
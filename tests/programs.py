@@ -0,0 +1,19 @@
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+
+# Small recursive Jan programs shared by the interpreter and engine tests.
+
+def parse(source):
+    return SimpleParser(RegexLexer(source)).parse()
+
+def fib_program(n):
+    return parse(f"function fib n\n    if n <= 1 return n\n    return fib(n - 1) + fib(n - 2)\nfib({n})")
+
+def countdown_program(n, result=False):
+    # Not a tail call: the result is stored before it is returned. With
+    # result the top-level call is stored too instead of printed.
+    call = f"var result is down({n})" if result else f"down({n})"
+    return parse(f"function down n\n    if n == 0 return 0\n    var r is down(n - 1)\n    return r\n{call}")
+
+def sum_to_program(n):
+    return parse(f"function total n acc\n    if n == 0 return acc\n    return total(n - 1, acc + n)\ntotal({n}, 0)")
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src import arrays
+from src.arrays import JanArray, fill_array, make_array
+from src.ast import *
+from src.execution import ENGINES, parse, run_captured
+from src.lexer import Lexer, RegexLexer
+from src.memo import find_pure_functions
+from src.tokens import TokenType
+
+PROGRAM = """var xs is [1, 2, 3]
+var ys is [0.5; 3]
+var a is xs + ys
+a
+var b is 10 - xs * 2
+b
+var c is -xs / 2
+c
+xs[1] = 2.5
+xs
+xs.sum
+xs.dot(ys)
+xs.min
+xs.length
+var copy is xs.copy
+copy[0] = 7
+var same is xs == [1, 2.5, 3]
+same
+var total is ([1.5; 1000] * 2 + 1).sum
+total
+"""
+
+EXPECTED = """[1.5, 2.5, 3.5]
+[8, 6, 4]
+[-0.5, -1.0, -1.5]
+[1.0, 2.5, 3.0]
+6.5
+3.25
+1.0
+3
+True
+4000.0
+"""
+
+@pytest.fixture(params=["array", "numpy"])
+def backend(request, monkeypatch):
+    # Runs a test on both storage backends; the NumPy one only when NumPy
+    # is installed.
+    monkeypatch.setattr(arrays, 'numpy', pytest.importorskip("numpy") if request.param == "numpy" else None)
+    return request.param
+
+def test_brackets_are_tokens():
+    for lexer in (Lexer, RegexLexer):
+        types = [token.type for token in lexer("xs[0]").tokenize()]
+        assert types == [TokenType.IDENTIFIER, TokenType.LBRACKET, TokenType.NUMBER, TokenType.RBRACKET, TokenType.EOF]
+
+def test_parse_array_syntax():
+    statements = parse("var xs is [1, 2]\nvar ys is [0; 5]\nxs[0] = ys[1]\nxs.dot(ys)\n[]").statements
+    assert isinstance(statements[0].initializer, ArrayLiteral)
+    assert isinstance(statements[1].initializer, ArrayFill)
+    assert isinstance(statements[2], IndexAssignment)
+    assert isinstance(statements[2].value, IndexExpression)
+    method = statements[3].expression
+    assert isinstance(method, MethodCall) and method.name == "dot" and len(method.arguments) == 1
+    # A bracket on a new line starts a literal instead of indexing.
+    assert statements[4].expression.elements == []
+
+def test_parenthesis_on_next_line_is_not_method_arguments():
+    statements = parse("var xs is [1, 2]\nvar x is 1\nxs.sum\n(x)").statements
+    method = statements[2].expression
+    assert isinstance(method, MethodCall) and method.name == "sum" and method.arguments == []
+    assert isinstance(statements[3].expression, Identifier)
+    assert run_captured("var xs is [1, 2]\nvar x is 1\nxs.sum\n(x)")['output'] == "3\n1\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_agree(engine, backend):
+    result = run_captured(PROGRAM, engine)
+    assert result['error'] is None
+    assert result['output'] == EXPECTED
+
+@pytest.mark.parametrize("code, message", [
+    ("var xs is [1, 2] + [1]", "Array lengths differ for +: 2 and 1"),
+    ("var xs is [1, 2] / [1, 0]", "Division by zero"),
+    ("var xs is [1, 2] < 3", "Operands must be numbers for <"),
+    ('var xs is [1, "a"]', "Array elements must be numbers"),
+    ("var xs is [1; -1]", "Array size must be a non-negative integer"),
+    ("var xs is [1, 2]\nvar x is xs[2]", "Array index 2 out of range for length 2"),
+    ("var xs is [1, 2]\nvar x is xs[0.5]", "Array index must be an integer"),
+    ("var x is 1\nvar y is x[0]", "Can only index arrays"),
+    ("var xs is [1]\nvar y is xs.mean", "Unknown array method 'mean'"),
+    ("var xs is []\nvar y is xs.max", "max of an empty array"),
+])
+def test_errors(code, message, backend):
+    for engine in ENGINES:
+        assert run_captured(code, engine)['error'] == message
+
+def test_storage_is_typed(backend):
+    ints = make_array([1, 2, 3])
+    assert isinstance(ints, JanArray) and not ints.is_float
+    ints.set(0, 1.5)
+    assert ints.is_float and ints.tolist() == [1.5, 2.0, 3.0]
+    assert ints.nbytes == 3 * 8
+
+def test_integers_beyond_64_bits_become_floats(backend):
+    big = make_array([2 ** 63, 1])
+    assert big.is_float and big.tolist() == [2.0 ** 63, 1.0]
+    assert fill_array(2 ** 63, 2).tolist() == [2.0 ** 63] * 2
+    ints = make_array([1, 2])
+    ints.set(1, 2 ** 64)
+    assert ints.is_float and ints.tolist() == [1.0, 2.0 ** 64]
+    assert make_array([2, 3]) == make_array([2.0, 3.0])
+    assert make_array([1, 2]).get(1).__class__ is int
+
+def test_array_functions_are_not_memoized():
+    program = Program(
+        parse("function zeros n\n    return [0; n]").statements
+        + parse("function first xs\n    return xs[0]").statements
+        + parse("function clear xs\n    var i is 0\n    xs[i] = 0\n    return nil").statements
+    )
+    assert [declaration.name for declaration in find_pure_functions(program)] == ["first"]
+
+def test_memory_limit_counts_arrays():
+    result = run_captured("var xs is [0; 1000000]", limits={'max_memory': 1 << 20})
+    assert result['limit']['kind'] == 'memory'
+
+if __name__ == "__main__":
+    pytest.main([__file__])
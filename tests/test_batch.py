@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.batch import EXIT_ERROR, EXIT_LIMIT, EXIT_OK, BatchOptions, BatchSummary, expand, run_many
+from src.cache import CACHE_DIR
+
+def write(directory, name, code):
+    path = directory / name
+    path.write_text(code)
+    return str(path)
+
+def test_expand_globs_and_keeps_order(tmp_path):
+    a = write(tmp_path, "a.jan", "1")
+    b = write(tmp_path, "b.jan", "2")
+    assert expand([b, str(tmp_path / "*.jan")]) == [b, a]
+    assert expand([str(tmp_path / "missing.jan")]) == [str(tmp_path / "missing.jan")]
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_run_many_collects_each_result(tmp_path, processes):
+    paths = [
+        write(tmp_path, "ok.jan", 'var x is 6 * 7\nx'),
+        write(tmp_path, "bad.jan", 'var x is 1 / 0'),
+        write(tmp_path, "loop.jan", 'var i is 0\nwhile true i = i + 1'),
+        str(tmp_path / "missing.jan"),
+    ]
+    options = BatchOptions(limits={'max_statements': 1000})
+    results = list(run_many(paths, options, processes))
+    assert [result['path'] for result in results] == paths
+    assert [result['status'] for result in results] == [EXIT_OK, EXIT_ERROR, EXIT_LIMIT, EXIT_ERROR]
+    assert results[0]['output'] == "42\n"
+    assert results[1]['error'] == "Division by zero"
+    assert results[3]['error'].startswith("Cannot read")
+
+    summary = BatchSummary(processes)
+    for result in results:
+        summary.add(result)
+    assert summary.to_dict()['passed'] == 1
+    assert summary.to_dict()['failed'] == 2
+    assert summary.to_dict()['limited'] == 1
+    assert "4 files: 1 passed, 2 failed, 1 over limits" in summary.format()
+
+def test_run_many_shares_the_program_cache(tmp_path):
+    cache_dir = tmp_path / "cache"
+    paths = [write(tmp_path, f"p{i}.jan", f'"file {i}"') for i in range(3)]
+    options = BatchOptions(cache_dir=str(cache_dir))
+    assert [result['output'] for result in run_many(paths, options, 2)] == ["file 0\n", "file 1\n", "file 2\n"]
+    assert len(os.listdir(cache_dir)) == 3
+    assert [result['output'] for result in run_many(paths, options, 2)] == ["file 0\n", "file 1\n", "file 2\n"]
+
+    list(run_many(paths, BatchOptions(cache=False), 1))
+    assert not (tmp_path / CACHE_DIR).exists()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
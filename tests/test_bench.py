@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from bench.suite import PHASES, compare, run_suite, scaling
+from bench.workloads import SYNTHETIC, examples
+
+def result(workload, size, phase, seconds, peak_bytes=1024):
+    return {'workload': workload, 'size': size, 'phase': phase, 'seconds': seconds,
+            'median': seconds, 'peak_bytes': peak_bytes}
+
+def test_quick_suite_times_every_phase():
+    report = run_suite(repeat=1, quick=True, only=['while_loop'])
+    assert {(entry['size'], entry['phase']) for entry in report['results']} == {
+        (size, phase) for size in (1000, 4000) for phase in PHASES}
+    assert all(entry['seconds'] >= 0 for entry in report['results'])
+
+def test_workloads_run_without_errors(capsys):
+    from src.interpreter import Interpreter
+    from src.lexer import RegexLexer
+    from src.simple_parser import SimpleParser
+    for name, (generate, sizes) in SYNTHETIC.items():
+        Interpreter().interpret(SimpleParser(RegexLexer(generate(10))).parse())
+    assert list(examples())
+
+def test_compare_reports_slowdowns_over_threshold():
+    baseline = {'results': [result('loop', 10, 'parse', 0.010), result('loop', 10, 'interpret', 0.010),
+                            result('tiny', 1, 'lex', 0.0001)]}
+    report = {'results': [result('loop', 10, 'parse', 0.0105), result('loop', 10, 'interpret', 0.013),
+                          result('tiny', 1, 'lex', 0.001), result('new', 1, 'lex', 1.0)]}
+    regressions = compare(report, baseline, threshold=0.10)
+    assert [(entry['workload'], entry['phase']) for entry in regressions] == [('loop', 'interpret')]
+    assert regressions[0]['change'] == pytest.approx(0.3)
+
+def test_scaling_exponent():
+    report = {'results': [result('loop', 100, 'lex', 0.001, 100), result('loop', 400, 'lex', 0.016, 400)]}
+    [row] = scaling(report)
+    assert row['time_exponent'] == pytest.approx(2.0)
+    assert row['memory_exponent'] == pytest.approx(1.0)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import src
+from src import cache
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+
+SOURCE = 'var x is 6 * 7\nx'
+
+def write_source(tmp_path, source=SOURCE):
+    path = tmp_path / "program.jan"
+    path.write_text(source)
+    return str(path)
+
+class CountingParser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, source):
+        self.calls += 1
+        return SimpleParser(RegexLexer(source)).parse()
+
+def test_second_load_skips_parsing(tmp_path, capsys):
+    path = write_source(tmp_path)
+    build = CountingParser()
+    cache.load_program(path, SOURCE, build)
+    program = cache.load_program(path, SOURCE, build)
+    assert build.calls == 1
+    assert os.path.exists(tmp_path / cache.CACHE_DIR / "program.janc")
+    Interpreter().interpret(program)
+    assert capsys.readouterr().out == "42\n"
+
+def test_changed_source_is_reparsed(tmp_path):
+    path = write_source(tmp_path)
+    build = CountingParser()
+    cache.load_program(path, SOURCE, build)
+    cache.load_program(path, SOURCE + '\nx', build)
+    assert build.calls == 2
+
+def test_version_and_optimize_flag_invalidate(tmp_path, monkeypatch):
+    path = write_source(tmp_path)
+    build = CountingParser()
+    cache.load_program(path, SOURCE, build)
+    cache.load_program(path, SOURCE, build, optimize=True)
+    monkeypatch.setattr(cache, '__version__', src.__version__ + '+1')
+    cache.load_program(path, SOURCE, build, optimize=True)
+    assert build.calls == 3
+
+def test_cache_dir(tmp_path):
+    path = write_source(tmp_path)
+    shared = tmp_path / "shared"
+    cache.load_program(path, SOURCE, CountingParser(), cache_dir=str(shared))
+    assert not os.path.exists(tmp_path / cache.CACHE_DIR)
+    assert [name.endswith(cache.SUFFIX) for name in os.listdir(shared)] == [True]
+
+def test_corrupt_cache_file_is_ignored(tmp_path):
+    path = write_source(tmp_path)
+    build = CountingParser()
+    cache.load_program(path, SOURCE, build)
+    with open(cache.cache_path(path), 'r+b') as f:
+        f.seek(len(cache.MAGIC) + 64)
+        f.write(b'garbage')
+    cache.load_program(path, SOURCE, build)
+    assert build.calls == 2
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,68 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.closures import ClosureInterpreter
+from src.execution import ENGINES, execute
+from src.interpreter import STACK_OVERFLOW, Interpreter
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+from tests.programs import countdown_program, fib_program
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+def parse(code):
+    return SimpleParser(RegexLexer(code)).parse()
+
+def run_both(source, capsys):
+    Interpreter().interpret(parse(source))
+    expected = capsys.readouterr().out
+    ClosureInterpreter().interpret(parse(source))
+    assert capsys.readouterr().out == expected
+    return expected
+
+@pytest.mark.parametrize("name", ["calculator", "function_test", "hello", "simple", "simple_func", "test_arithmetic"])
+def test_closure_engine_matches_interpreter_on_examples(name, capsys):
+    with open(os.path.join(EXAMPLES, name + ".jan")) as f:
+        assert run_both(f.read(), capsys)
+
+def test_closure_engine_loops_and_operators(capsys):
+    source = "\n".join([
+        'var i is 0',
+        'while i < 10 i = i + 1',
+        'var s is "n=" + i',
+        'var big is i * 2 >= 20',
+        'var flag is !(i == 10)',
+        'var q is -i / 4',
+        's', 'big', 'flag', 'q',
+    ])
+    assert run_both(source, capsys) == "n=10\nTrue\nFalse\n-2.5\n"
+
+def test_closure_engine_recursion(capsys):
+    ClosureInterpreter().interpret(fib_program(12))
+    assert capsys.readouterr().out == "144\n"
+
+def test_closure_engine_errors():
+    with pytest.raises(Exception, match="Division by zero"):
+        ClosureInterpreter().interpret(parse("1 / 0"))
+    with pytest.raises(Exception, match="Operands must be numbers for -"):
+        ClosureInterpreter().interpret(parse('"a" - 1'))
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_deep_recursion_is_a_jan_error(engine, capsys):
+    execute(countdown_program(100), engine)
+    assert capsys.readouterr().out == "0\n"
+    runaway = parse("function f n\n    return 1 + f(n + 1)\nf(0)")
+    with pytest.raises(Exception) as raised:
+        execute(runaway, engine)
+    assert type(raised.value) is Exception and str(raised.value) == STACK_OVERFLOW
+
+def test_vm_recursion_goes_deeper_than_the_python_stack(capsys):
+    # The VM keeps its frames on the heap, up to MAX_FRAMES of them.
+    execute(countdown_program(50000), 'vm')
+    assert capsys.readouterr().out == "0\n"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
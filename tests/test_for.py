@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.execution import ENGINES, parse, run_captured
+from src.interpreter import Interpreter, for_range
+from src.lexer import Lexer
+from src.parser import Parser
+
+PROGRAM = """var total is 0
+for i from 1 to 10 total = total + i
+total
+i
+for i from 10 to 1 step -3 print(i)
+for x from 0 to 0.3 step 0.1 print(x)
+for i from 5 to 1 print("never")
+function first_over limit
+    for k from 1 to 100
+        if k * k > limit
+            return k
+    return 0
+print(1 + first_over(50))
+var step is 2
+for j from 0 to 6 step step print(j)
+"""
+
+OUTPUT = "55\n10\n10\n7\n4\n1\n0.0\n0.1\n0.2\n0.30000000000000004\n9\n0\n2\n4\n6\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_for_matches_across_engines(engine):
+    result = run_captured(PROGRAM, engine)
+    assert result['error'] is None
+    assert result['output'] == OUTPUT
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_for_optimized(engine):
+    assert run_captured(PROGRAM, engine, optimize=True)['output'] == OUTPUT
+
+def test_parse_for():
+    statement = parse("for i from 1 to n step 2 print(i)").statements[0]
+    assert isinstance(statement, ForStatement)
+    assert statement.name == 'i'
+    assert statement.start.value == 1
+    assert statement.end.name == 'n'
+    assert statement.step.value == 2
+    assert isinstance(statement.body, ExpressionStatement)
+    assert parse("for i from 1 to 3 i").statements[0].step is None
+
+def test_parse_for_with_assignment_syntax():
+    statement = Parser(Lexer("for i from 0 to 3 x = i")).parse().statements[0]
+    assert isinstance(statement, ForStatement)
+    assert isinstance(statement.body, Assignment)
+
+def test_for_requires_from_and_to():
+    with pytest.raises(Exception, match="Expected 'to'"):
+        parse("for i from 1 until 3 i")
+
+def test_for_range():
+    assert list(for_range(1, 3, 1)) == [1, 2, 3]
+    assert list(for_range(3, 1, -1)) == [3, 2, 1]
+    assert list(for_range(1, 0, 1)) == []
+    assert list(for_range(0, 1, 0.5)) == [0, 0.5, 1.0]
+    assert isinstance(for_range(0, 10 ** 9, 1), range)
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("code,error", [
+    ('for i from 1 to "3" i', "for loop bounds must be numbers"),
+    ("for i from 1 to 3 step 0 i", "for loop step cannot be zero"),
+])
+def test_for_errors(engine, code, error):
+    assert run_captured(code, engine)['error'] == error
+
+def test_for_counts_only_body_statements():
+    interpreter = Interpreter()
+    interpreter.instrument()
+    interpreter.interpret(parse("var t is 0\nfor i from 1 to 100 t = t + i"))
+    assert interpreter.stats()['statements'] == 102
+
+def test_functions_with_for_loops_are_memoized():
+    interpreter = Interpreter()
+    interpreter.interpret(parse("function total n\n    var t is 0\n    for i from 1 to n t = t + i\n    return t\n"))
+    assert [function.declaration.name for function in interpreter.functions] == ['total']
+
+if __name__ == "__main__":
+    pytest.main([__file__])
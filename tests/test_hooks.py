@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.interpreter import Interpreter
+from tests.programs import countdown_program, parse, sum_to_program
+
+def test_uninstrumented_interpreter_uses_class_methods():
+    interpreter = Interpreter()
+    interpreter.interpret(parse("var x is 1"))
+    assert 'execute' not in vars(interpreter)
+    assert interpreter.stats() == {'statements': 0, 'environments': 0, 'calls': 0, 'max_call_depth': 0}
+
+def test_stats_count_statements_calls_and_depth(capsys):
+    interpreter = Interpreter(memo_size=0)
+    interpreter.instrument()
+    interpreter.interpret(countdown_program(5))
+    assert capsys.readouterr().out == "0\n"
+    stats = interpreter.stats()
+    assert stats['calls'] == 6
+    assert stats['max_call_depth'] == 6
+    assert stats['environments'] == 6
+    # if, var and return per call that recurses, if and its return for the
+    # last one, plus the declaration and the top-level call.
+    assert stats['statements'] == 5 * 3 + 2 + 2
+
+def test_tail_calls_do_not_add_depth():
+    interpreter = Interpreter(memo_size=0)
+    interpreter.instrument()
+    interpreter.interpret(sum_to_program(50))
+    assert interpreter.stats()['calls'] == 51
+    assert interpreter.stats()['max_call_depth'] == 1
+
+def test_hooks_receive_events(capsys):
+    interpreter = Interpreter(memo_size=0)
+    events = []
+    interpreter.add_hook('on_call', lambda callee, arguments: events.append(('call', callee.declaration.name, arguments)))
+    interpreter.add_hook('on_return', lambda expr, value: events.append(('return', value)))
+    interpreter.add_hook('on_env_alloc', lambda environment: events.append(('env', len(environment.values))))
+    interpreter.interpret(countdown_program(1))
+    assert events == [
+        ('call', 'down', [1]), ('env', 2),
+        ('call', 'down', [0]), ('env', 2),
+        ('return', 0), ('return', 0),
+    ]
+
+def test_statement_and_error_hooks():
+    interpreter = Interpreter()
+    lines = []
+    errors = []
+    interpreter.add_hook('on_statement', lambda stmt: lines.append(stmt.line))
+    interpreter.add_hook('on_error', lambda error, stmt: errors.append((str(error), stmt.line)))
+    with pytest.raises(Exception, match="Division by zero"):
+        interpreter.interpret(parse("var a is 1\nif a > 0 var b is a / 0"))
+    assert lines == [1, 2, 2]
+    assert errors == [("Division by zero", 2)]
+
+def test_removed_hook_is_not_called():
+    interpreter = Interpreter()
+    seen = []
+    hook = lambda stmt: seen.append(stmt)
+    interpreter.add_hook('on_statement', hook)
+    interpreter.remove_hook('on_statement', hook)
+    interpreter.interpret(parse("var a is 1"))
+    assert seen == []
+    with pytest.raises(Exception, match="Unknown hook"):
+        interpreter.add_hook('on_everything', hook)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
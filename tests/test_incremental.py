@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import pytest
+
+from src import incremental
+from src.incremental import IncrementalDocument
+from src.lexer import RegexLexer
+from src.parser import Parser
+from src.simple_parser import SimpleParser
+
+SOURCE = '''var a is 1
+function f x
+    return x + 1
+if a < 2 print(a)
+greet "Jan" 2
+while a < 3 a = a + 1
+for i from 1 to 3 print(i)
+// comment
+var b is [1, 2][0]'''
+
+def dump(node):
+    if isinstance(node, list):
+        return [dump(item) for item in node]
+    if hasattr(node, '__dict__'):
+        return (type(node).__name__, {key: dump(value) for key, value in vars(node).items()})
+    return node
+
+def full_parse(source, parser_class=SimpleParser):
+    try:
+        return dump(parser_class(RegexLexer(source)).parse())
+    except Exception:
+        return None
+
+@pytest.mark.parametrize("source", [SOURCE, 'var s is "one\ntwo"\nprint(s)\n' + SOURCE, 'var s is "a\nb"(1)\nprint(s)'])
+def test_matches_full_parse(source):
+    document = IncrementalDocument(source)
+    assert document.error is None
+    assert dump(document.program) == full_parse(source)
+
+def test_edit_reuses_untouched_statements():
+    document = IncrementalDocument(SOURCE)
+    before = document.program.statements
+    document.edit((4, 7), (4, 10), "Ada")
+    after = document.program.statements
+    assert after[3].expression.arguments[0].value == "Ada"
+    # The if statement looked past its end for an else, so it is parsed again.
+    assert [a is b for a, b in zip(before, after)] == [True, True, False, False, True, True, True]
+    assert dump(document.program) == full_parse(document.source)
+
+def test_inserted_lines_shift_later_statements():
+    document = IncrementalDocument(SOURCE)
+    last = document.program.statements[-1]
+    document.edit((0, 0), (0, 0), "var z is 0\n\n")
+    assert document.program.statements[-1] is last
+    assert last.line == 11
+    assert dump(document.program) == full_parse(document.source)
+
+def test_multiline_string_state_carries_across_lines():
+    document = IncrementalDocument('var s is "one\ntwo"\nprint(s)')
+    assert document.program.statements[0].initializer.value == "one\ntwo"
+    document.edit((1, 0), (1, 0), "and ")
+    assert document.program.statements[0].initializer.value == "one\nand two"
+    assert document.program.statements[1].line == 3
+
+    document.edit((0, 9), (0, 10), "")
+    assert document.program is None
+    assert document.error == "Unterminated string"
+    document.edit((0, 9), (0, 9), '"')
+    assert document.program.statements[0].initializer.value == "one\nand two"
+
+def test_errors_then_recovery():
+    document = IncrementalDocument(SOURCE)
+    document.edit((3, 5), (3, 6), "@")
+    assert document.error == "Unknown character: @"
+    document.edit((3, 5), (3, 6), "<")
+    assert document.error is None
+    document.edit((0, 6), (0, 8), "")
+    assert document.program is None
+    assert "Expected" in document.error
+    document.update(SOURCE)
+    assert dump(document.program) == full_parse(SOURCE)
+
+def test_edits_far_below_do_not_touch_earlier_chunks(monkeypatch):
+    monkeypatch.setattr(incremental, 'CHUNK_LINES', 4)
+    document = IncrementalDocument("\n".join([SOURCE] * 4))
+    first = document.chunks[0].statements[0]
+    starts = [(chunk, chunk.start) for chunk in document.chunks]
+    document.edit((30, 0), (30, 0), "var z is 0\n")
+    assert document.chunks[0].statements[0] is first
+    assert all(chunk.start == start for chunk, start in starts[:7])
+    assert all(chunk.start == start + 1 for chunk, start in starts[8:])
+    assert dump(document.program) == full_parse(document.source)
+
+@pytest.mark.parametrize("parser_class", [SimpleParser, Parser])
+@pytest.mark.parametrize("chunk_lines", [3, 64])
+def test_random_edits_match_full_parse(parser_class, chunk_lines, monkeypatch):
+    monkeypatch.setattr(incremental, 'CHUNK_LINES', chunk_lines)
+    random.seed(7)
+    source = "\n".join([SOURCE] * 3)
+    if parser_class is Parser:
+        source = source.replace(" is ", " = ")
+    pieces = ['var q is 3', 'var q = 3', 'x', '\n', '+ 1', ' ', 'print(q)\n', '1.2.3', '@',
+              'function g y\n', 'return y\n', 'a b\n', '"s"', '"', '"x\ny"']
+    document = IncrementalDocument(source, parser_class)
+    for _ in range(1000):
+        lines = document.source.split("\n")
+        first = random.randrange(len(lines))
+        last = random.randint(first, min(first + random.choice([0, 1, 2, 8]), len(lines) - 1))
+        start = random.randint(0, len(lines[first]))
+        end = random.randint(0, len(lines[last])) if last > first else random.randint(start, len(lines[first]))
+        document.edit((first, start), (last, end), random.choice(pieces) if random.random() < 0.7 else "")
+        expected = full_parse(document.source, parser_class)
+        assert (dump(document.program) if document.program else None) == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.execution import parse, run_captured
+from src.interpreter import Interpreter
+from src.limits import JanLimitError, parse_size
+from tests.programs import countdown_program
+
+def run_limited(program, **limits):
+    interpreter = Interpreter(memo_size=0)
+    interpreter.set_limits(**limits)
+    interpreter.interpret(program)
+    return interpreter
+
+def test_statement_budget_stops_runaway_loop():
+    with pytest.raises(JanLimitError) as info:
+        run_limited(parse("var i is 0\nwhile true i = i + 1"), max_statements=500)
+    assert info.value.to_dict() == {'kind': 'statements', 'limit': 500, 'used': 501,
+                                    'message': 'Statements limit of 500 exceeded (501)'}
+
+def test_call_depth_limit():
+    run_limited(countdown_program(10, result=True), max_call_depth=11)
+    with pytest.raises(JanLimitError) as info:
+        run_limited(countdown_program(10, result=True), max_call_depth=10)
+    assert info.value.kind == 'call_depth'
+
+DOWN = "function down n\n    if n == 0 return 0\n    var r is down(n - 1)\n    return r\ndown(100000)"
+
+@pytest.mark.parametrize("depth", [100, 200, 50000])
+def test_call_depth_limit_near_the_python_stack(depth):
+    # The Python stack runs out somewhere past 100 nested Jan calls; deeper
+    # limits still stop the program with a call depth error.
+    result = run_captured(DOWN, limits={'max_call_depth': depth})
+    assert result['limit']['kind'] == 'call_depth'
+    assert result['limit']['limit'] == depth
+    assert 100 <= result['limit']['used'] <= depth + 1
+
+def test_memory_limit_catches_doubling_string():
+    interpreter = Interpreter()
+    interpreter.set_limits(max_memory=1 << 20)
+    with pytest.raises(JanLimitError) as info:
+        interpreter.interpret(parse('var s is "ab"\nwhile true s = s + s'))
+    assert info.value.kind == 'memory'
+    assert info.value.used < 4 << 20
+
+def test_memory_limit_catches_slow_growth():
+    interpreter = Interpreter()
+    interpreter.set_limits(max_memory=64 * 1024)
+    with pytest.raises(JanLimitError):
+        interpreter.interpret(parse('var s is ""\nwhile true s = s + "abc"'))
+
+@pytest.mark.parametrize("code", ['var a is [0; 1000000000]', 'var s is repeat("x", 1000000000)',
+                                  'var s is repeat("x", 1000)\nvar t is len(repeat(s + s, 100000))'])
+def test_memory_limit_checked_before_large_allocations(code):
+    result = run_captured(code, limits={'max_memory': 1 << 20})
+    assert result['limit']['kind'] == 'memory'
+    assert result['limit']['used'] > 100 << 20
+
+def test_programs_within_limits_run_normally(capsys):
+    run_limited(parse("var i is 0\nwhile i < 10 i = i + 1\ni"), max_statements=100, max_call_depth=5, max_memory=1 << 20)
+    assert capsys.readouterr().out == "10\n"
+
+def test_run_captured_reports_structured_limit():
+    result = run_captured("var i is 0\nwhile true i = i + 1", limits={'max_statements': 100})
+    assert result['limit']['kind'] == 'statements'
+    assert result['error'] == 'Statements limit of 100 exceeded (101)'
+    assert run_captured("var i is 1", engine='vm', limits={'max_statements': 100})['error'].startswith("Execution limits")
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("64k") == 64 * 1024
+    assert parse_size("1.5M") == 3 * 1024 * 1024 // 2
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.execution import run_captured
+from src.interpreter import Interpreter
+from src.memo import LRUCache, MISSING, find_pure_functions
+from tests.programs import fib_program, parse
+
+def declarations(program):
+    return {statement.name: statement for statement in program.statements if isinstance(statement, FunctionDeclaration)}
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put(1, 'a')
+    cache.put(2, 'b')
+    assert cache.get(1) == 'a'
+    cache.put(3, 'c')
+    assert cache.get(2) is MISSING
+    assert cache.get(3) == 'c'
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 2, 'maxsize': 2}
+
+def test_fib_is_memoized(capsys):
+    interpreter = Interpreter()
+    interpreter.interpret(fib_program(30))
+    assert capsys.readouterr().out == "832040\n"
+    stats = interpreter.memo_stats()['fib']
+    assert stats['misses'] == 31
+    assert stats['hits'] == 28
+
+def test_memo_size_zero_disables_caching(capsys):
+    interpreter = Interpreter(memo_size=0)
+    interpreter.interpret(fib_program(10))
+    assert capsys.readouterr().out == "55\n"
+    assert interpreter.memo_stats() == {}
+
+def test_impure_functions_are_detected():
+    # Function bodies run to the end of the source, so each one is parsed
+    # separately.
+    program = Program(
+        parse("var total is 0").statements
+        + parse("function add x\n    var y is x\n    total = total + y\n    return total").statements
+        + parse("function show x\n    \"value \" + x").statements
+        + parse("function square x\n    var y is x * x\n    return y").statements
+        + parse("function reads x\n    return x + total").statements
+    )
+    functions = declarations(program)
+    pure = find_pure_functions(program)
+    assert functions['square'] in pure
+    assert functions['add'] not in pure
+    assert functions['show'] not in pure
+    assert functions['reads'] not in pure
+
+def test_rebound_function_is_not_pure():
+    program = parse("function f x\n    return x\nf = 1")
+    assert find_pure_functions(program) == set()
+
+def test_calling_impure_function_is_impure():
+    program = Program(parse("function inner x\n    \"value \" + x").statements + parse("function outer x\n    return inner(x)").statements)
+    assert find_pure_functions(program) == set()
+
+def test_modifiers_force_behaviour():
+    program = Program(
+        parse("pure function noisy x\n    \"value \" + x").statements
+        + parse("impure function square x\n    return x * x").statements
+    )
+    functions = declarations(program)
+    assert functions['noisy'].memoize is True
+    assert functions['square'].memoize is False
+    assert find_pure_functions(program) == {functions['noisy']}
+
+def test_pure_and_impure_are_still_names():
+    result = run_captured("var pure is 1\nvar impure is pure + 1\nfunction f pure\n    return pure * impure\nf(3)")
+    assert result['error'] is None and result['output'] == "6\n"
+    assert parse("pure function f x\n    return x").statements[0].memoize is True
+
+def test_assigning_a_builtin_is_not_pure():
+    code = "function f n\n    var t is 0\n    max = n\n    return n\nf(1)\nf(2)\nf(1)\nprint(max)\n"
+    cached = run_captured(code)
+    uncached = run_captured(code, memo_size=0)
+    assert cached['output'] == uncached['output']
+    assert cached['output'].splitlines()[-1] == "1"
+
+def test_cache_distinguishes_argument_types(capsys):
+    interpreter = Interpreter()
+    interpreter.interpret(parse('function show x\n    return x + ""\nshow(1)\nshow(1.0)'))
+    assert capsys.readouterr().out == "1\n1.0\n"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
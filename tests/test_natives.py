@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.execution import ENGINES, parse, run_captured
+from src.interpreter import Interpreter
+from src.natives import NATIVES
+from src.profiler import ProfilingInterpreter
+from src.repl import ReplSession
+
+PROGRAM = """var s is "  Hello Jan  "
+var t is trim(s)
+print(upper(t), len(t), type(t))
+print(sqrt(16) + pow(2, 10), floor(2.7), max(3, 9))
+print(number("42") + 1, int("3.9"), float(2), str(12) + "!")
+print(substring(t, 0, 5), index_of(t, "Jan"), replace(t, "Jan", "World"), repeat("ab", 3))
+print(len([1, 2, 3]), type(len), type(nil))
+print "x" 1
+function hyp a b
+    return sqrt(a * a + b * b)
+hyp(3, 4)
+"""
+
+OUTPUT = """HELLO JAN 9 string
+1028.0 2 9
+43 3 2.0 12!
+Hello 6 Hello World ababab
+3 function nil
+x 1
+"""
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_natives_match_across_engines(engine):
+    result = run_captured(PROGRAM, engine)
+    assert result['error'] is None
+    assert result['output'] == OUTPUT + "5.0\n"
+
+def test_natives_are_preregistered_globals():
+    interpreter = Interpreter()
+    for name, function in NATIVES.items():
+        assert interpreter.globals.get(name) is function
+    assert repr(NATIVES['len']) == "<native function len>"
+
+def test_call_syntax_needs_the_same_line():
+    program = parse("var x is clock()\nf(1, 2)\nabs\n(1)")
+    assert isinstance(program.statements[0].initializer, FunctionCall)
+    assert program.statements[0].initializer.arguments == []
+    assert len(program.statements[1].expression.arguments) == 2
+    assert isinstance(program.statements[2].expression, Identifier)
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("code,error", [
+    ("sqrt(1, 2)", "Expected 1 arguments but got 2"),
+    ("upper(1)", "upper needs a string"),
+    ("sqrt(-1)", "sqrt of -1 is undefined"),
+    ('number("abc")', "Cannot convert 'abc' to a number"),
+    ("len(1)", "len needs a string or an array"),
+])
+def test_native_errors(engine, code, error):
+    assert run_captured(code, engine)['error'] == error
+
+def test_natives_can_be_shadowed():
+    result = run_captured('function len s\n    return 0\nlen("abc")')
+    assert result['output'] == "0\n"
+
+def test_native_tail_call():
+    result = run_captured('function f x\n    return abs(x)\nf(-3)')
+    assert result['output'] == "3\n"
+
+def test_pure_natives_keep_callers_memoizable():
+    interpreter = Interpreter()
+    interpreter.interpret(parse("function h a b\n    return sqrt(a * a + b * b)\n"
+                                "function t a\n    return a + clock()\n"))
+    assert [function.declaration.name for function in interpreter.functions] == ['h']
+
+def test_rebinding_a_native_makes_it_impure():
+    interpreter = Interpreter()
+    interpreter.interpret(parse("var sqrt is 2\nfunction h a\n    return sqrt(a)\n"))
+    assert interpreter.functions == []
+
+def test_repl_can_rebind_natives():
+    session = ReplSession()
+    session.push("var len is 5")
+    assert session.globals.get('len') == 5
+    assert session.globals.get('abs') is NATIVES['abs']
+
+def test_profiler_reports_natives():
+    interpreter = ProfilingInterpreter(0)
+    interpreter.interpret(parse("var i is 0\nwhile i < 3 i = i + abs(1)\n"))
+    stats = {entry['name']: entry for entry in interpreter.to_dict()['functions']}
+    assert stats['abs']['calls'] == 3
+    assert stats['abs']['line'] is None
+
+def test_hooks_see_native_calls():
+    interpreter = Interpreter()
+    calls = []
+    interpreter.add_hook('on_call', lambda callee, arguments: calls.append((callee, arguments)))
+    interpreter.interpret(parse("var x is max(1, 2)"))
+    assert calls == [(NATIVES['max'], [1, 2])]
+    assert interpreter.stats()['environments'] == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.optimizer import Optimizer
+from src.simple_parser import SimpleParser
+
+def optimize(code):
+    return Optimizer().optimize(SimpleParser(RegexLexer(code)).parse())
+
+def test_constant_folding():
+    program = optimize('var x is 60 * 60 * 24\nvar s is "n" + 1 + 2\nvar b is !(3 < 2)')
+    values = [statement.initializer for statement in program.statements]
+    assert isinstance(values[0], NumberLiteral) and values[0].value == 86400
+    assert isinstance(values[1], StringLiteral) and values[1].value == "n12"
+    assert isinstance(values[2], BooleanLiteral) and values[2].value is True
+
+def test_folding_keeps_runtime_errors():
+    program = optimize("var x is 1 / 0")
+    assert isinstance(program.statements[0].initializer, BinaryOp)
+    with pytest.raises(Exception, match="Division by zero"):
+        Interpreter().interpret(program)
+
+def test_dead_branch_elimination():
+    program = optimize("if 1 > 2 var a is 1\nif true var b is 2 else var c is 3\nwhile false var d is 4")
+    assert len(program.statements) == 1
+    assert isinstance(program.statements[0], VariableDeclaration)
+    assert program.statements[0].name == "b"
+
+def test_algebraic_identities_respect_types():
+    program = optimize("var a is (x - y) * 1\nvar b is x * 1\nvar c is (x * y) - 0\nvar d is x + 0\nvar e is (2 * x) + 0")
+    values = [statement.initializer for statement in program.statements]
+    assert values[0].operator == '-'
+    assert values[1].operator == '*'
+    assert values[2].operator == '*'
+    assert values[3].operator == '+'
+    assert values[4].operator == '+'
+
+def test_optimized_program_prints_the_same(capsys):
+    source = 'var i is 0\nwhile i < 3 i = i + 1 * 1\nvar s is "v" + (2 + 3)\ns\ni'
+    Interpreter().interpret(SimpleParser(RegexLexer(source)).parse())
+    expected = capsys.readouterr().out
+    Interpreter().interpret(optimize(source))
+    assert capsys.readouterr().out == expected == "v5\n3\n"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
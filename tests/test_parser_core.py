@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.lexer import Lexer, RegexLexer
+from src.parser import Parser
+from src.simple_parser import SimpleParser
+
+def show(expr):
+    # Fully parenthesized form of an expression tree.
+    if isinstance(expr, BinaryOp):
+        return f"({show(expr.left)} {expr.operator} {show(expr.right)})"
+    if isinstance(expr, UnaryOp):
+        return f"({expr.operator} {show(expr.operand)})"
+    if isinstance(expr, Identifier):
+        return expr.name
+    if isinstance(expr, FunctionCall):
+        return f"{show(expr.callee)}({', '.join(show(argument) for argument in expr.arguments)})"
+    if isinstance(expr, IndexExpression):
+        return f"{show(expr.target)}[{show(expr.index)}]"
+    if isinstance(expr, ArrayLiteral):
+        return f"[{', '.join(show(element) for element in expr.elements)}]"
+    if isinstance(expr, NilLiteral):
+        return "nil"
+    return repr(expr.value)
+
+CASES = [
+    ("1 + 2 * 3", "(1 + (2 * 3))"),
+    ("1 - 2 - 3", "((1 - 2) - 3)"),
+    ("8 / 4 / 2", "((8 / 4) / 2)"),
+    ("a or b and c", "(a or (b and c))"),
+    ("a == b < c", "(a == (b < c))"),
+    ("a < b == c > d", "((a < b) == (c > d))"),
+    ("-a * b", "((- a) * b)"),
+    ("not a == b", "((not a) == b)"),
+    ("- - a", "(- (- a))"),
+    ("(1 + 2) * 3", "((1 + 2) * 3)"),
+    ("a + b * c - d / e", "((a + (b * c)) - (d / e))"),
+    ("-xs[0] + f(1, 2 * 3)", "((- xs[0]) + f(1, (2 * 3)))"),
+    ("[1, 2][0] + nil", "([1, 2][0] + nil)"),
+    ('"a" + true', "('a' + True)"),
+]
+
+@pytest.mark.parametrize("source,expected", CASES)
+def test_var_is_syntax(source, expected):
+    program = SimpleParser(RegexLexer(f"var x is {source}")).parse()
+    assert show(program.statements[0].initializer) == expected
+
+@pytest.mark.parametrize("source,expected", CASES)
+def test_var_assign_syntax(source, expected):
+    program = Parser(Lexer(f"var x = {source}")).parse()
+    assert show(program.statements[0].initializer) == expected
+
+def test_surface_syntaxes_keep_their_statements():
+    simple = SimpleParser(RegexLexer('var a is 1\ngreet "Jan" 2\nfunction f x\n    return x')).parse()
+    assert [type(statement) for statement in simple.statements] == [VariableDeclaration, ExpressionStatement,
+                                                                   FunctionDeclaration]
+    assert len(simple.statements[1].expression.arguments) == 2
+    assert isinstance(simple.statements[2].body.statements[0], ReturnStatement)
+
+    assign = Parser(Lexer("var a = 1\nx = a + 1\ngreet a b")).parse()
+    assert [type(statement) for statement in assign.statements] == [VariableDeclaration, Assignment,
+                                                                   ExpressionStatement]
+    assert [argument.name for argument in assign.statements[2].expression.arguments] == ['a', 'b']
+
+def test_unexpected_token():
+    with pytest.raises(Exception, match="Unexpected token"):
+        SimpleParser(RegexLexer("var x is 1 + *")).parse()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+from src.lexer import Lexer, RegexLexer
+from src.parser import Parser
+from src.profiler import ProfilingInterpreter
+from src.simple_parser import SimpleParser
+
+SOURCE = """var total is 0
+function add d n
+    var m is n - 1
+    total = total + n
+    if n > 0 add 0 m
+    return nil
+add 0 4
+var result is total
+result
+"""
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+def parse(source):
+    return SimpleParser(RegexLexer(source)).parse()
+
+def profile(source):
+    interpreter = ProfilingInterpreter(clock=FakeClock())
+    interpreter.interpret(parse(source))
+    return interpreter
+
+def test_statements_carry_line_numbers():
+    program = parse(SOURCE)
+    assert [statement.line for statement in program.statements] == [1, 2, 7, 8, 9]
+    assert [statement.line for statement in program.statements[1].body.statements] == [3, 4, 5, 6]
+    assert [statement.line for statement in Parser(Lexer("var a = 1\n\nvar b = 2")).parse().statements] == [1, 3]
+
+def test_function_counts_and_times(capsys):
+    interpreter = profile(SOURCE)
+    assert capsys.readouterr().out == "10\n"
+    report = {stats['name']: stats for stats in interpreter.to_dict()['functions']}
+    assert report['add']['calls'] == 5
+    assert report['add']['line'] == 2
+    assert report['<program>']['calls'] == 1
+    # Recursive calls are counted once in the total but every frame adds
+    # its own self time.
+    assert report['add']['total'] <= report['<program>']['total']
+    assert report['add']['self'] + report['<program>']['self'] == report['<program>']['total']
+
+def test_line_counts_and_times(capsys):
+    interpreter = profile("var i is 0\nwhile i < 3 i = i + 1\ni")
+    lines = {stats['line']: stats for stats in interpreter.to_dict()['lines']}
+    assert lines[1]['hits'] == 1
+    assert lines[2]['hits'] == 4
+    assert lines[3]['hits'] == 1
+    assert sum(stats['time'] for stats in lines.values()) <= interpreter.program.total
+
+def test_report_output(tmp_path, capsys):
+    interpreter = profile(SOURCE)
+    path = tmp_path / "profile.json"
+    interpreter.write(str(path))
+    data = json.loads(path.read_text())
+    assert [stats['name'] for stats in data['functions']][0] in ('add', '<program>')
+    interpreter.print_report()
+    err = capsys.readouterr().err
+    assert 'add' in err and 'hits' in err
+
+if __name__ == "__main__":
+    pytest.main([__file__])
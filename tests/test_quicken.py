@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.interpreter import Interpreter
+from src.quicken import MAX_RESPECIALIZATIONS, MEGAMORPHIC
+
+def evaluate(interpreter, expr, x):
+    interpreter.globals.define("x", x)
+    return interpreter.evaluate(expr)
+
+def site(operator, right):
+    return BinaryOp(Identifier("x"), operator, right)
+
+def test_site_specializes_on_operand_types():
+    interpreter = Interpreter()
+    expr = site("*", NumberLiteral(2))
+    assert expr.inline_cache is None
+    assert evaluate(interpreter, expr, 21) == 42
+    assert expr.inline_cache[:2] == (int, int)
+    assert evaluate(interpreter, expr, 1.5) == 3.0
+    assert expr.inline_cache[:2] == (float, int)
+
+def test_fast_path_keeps_errors_and_semantics():
+    interpreter = Interpreter()
+    divide = site("/", NumberLiteral(0))
+    with pytest.raises(Exception, match="Division by zero"):
+        evaluate(interpreter, divide, 1)
+    with pytest.raises(Exception, match="Division by zero"):
+        evaluate(interpreter, divide, 1)
+
+    subtract = site("-", NumberLiteral(1))
+    assert evaluate(interpreter, subtract, 5) == 4
+    with pytest.raises(Exception, match="Operands must be numbers for -"):
+        evaluate(interpreter, subtract, "5")
+
+    add = site("+", NumberLiteral(1))
+    assert evaluate(interpreter, add, 1) == 2
+    assert evaluate(interpreter, add, "a") == "a1"
+    assert evaluate(interpreter, add, 1) == 2
+
+def test_bool_and_nil_stay_generic():
+    interpreter = Interpreter()
+    expr = site("==", NilLiteral())
+    assert evaluate(interpreter, expr, None) is True
+    assert expr.inline_cache is None
+    expr = site("+", NumberLiteral(1))
+    assert evaluate(interpreter, expr, True) == 2
+    assert expr.inline_cache is None
+
+def test_polymorphic_site_goes_megamorphic():
+    interpreter = Interpreter()
+    expr = site("+", NumberLiteral(1))
+    values = [1, 1.5] * MAX_RESPECIALIZATIONS
+    for value in values:
+        assert evaluate(interpreter, expr, value) == value + 1
+    assert expr.inline_cache is MEGAMORPHIC
+    assert evaluate(interpreter, expr, 2) == 3
+
+def test_loop_result_unchanged(capsys):
+    from src.execution import parse
+    Interpreter().interpret(parse('var x is 0.5\nwhile x < 100.0 x = x * 2 + 1 / 4\nx\nvar s is "a" + "b"\ns'))
+    assert capsys.readouterr().out == "191.75\nab\n"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
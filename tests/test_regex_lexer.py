@@ -0,0 +1,59 @@
+import sys
+import os
+import glob
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.lexer import Lexer, RegexLexer
+from src.tokens import TokenType
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+def token_stream(lexer):
+    return [(token.type, token.value, token.line, token.column) for token in lexer.tokenize()]
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(EXAMPLES, "*.jan"))))
+def test_regex_lexer_matches_lexer_on_examples(path):
+    with open(path) as f:
+        source = f.read()
+    assert token_stream(RegexLexer(source)) == token_stream(Lexer(source))
+
+@pytest.mark.parametrize("source", [
+    "",
+    "   \n\n  ",
+    "+-*/= == != < > <= >= ! ( ) { } ; , .",
+    'var s is "tab\\there \\"quoted\\" \\\\ back"',
+    '"line one\nline two" x',
+    "var x_1 is 12.5 // trailing comment\n  y",
+    "1.2.3",
+])
+def test_regex_lexer_matches_lexer_on_edge_cases(source):
+    try:
+        expected = token_stream(Lexer(source))
+    except Exception as error:
+        with pytest.raises(Exception, match=str(error)):
+            token_stream(RegexLexer(source))
+    else:
+        assert token_stream(RegexLexer(source)) == expected
+
+def test_regex_lexer_errors():
+    with pytest.raises(Exception, match="Unterminated string"):
+        token_stream(RegexLexer('"open'))
+    with pytest.raises(Exception, match="Unknown character: @"):
+        token_stream(RegexLexer('x @ y'))
+
+def test_regex_lexer_positions():
+    tokens = list(RegexLexer("var a is 1\n  a + 2").tokenize())
+    assert [(t.line, t.column) for t in tokens] == [(1, 1), (1, 5), (1, 7), (1, 10), (2, 3), (2, 5), (2, 7), (2, 8)]
+    assert tokens[-1].type == TokenType.EOF
+
+def test_strings_spanning_lines_advance_the_line():
+    source = 'var s is "one\ntwo\\\nthree" x\ny'
+    expected = [(1, 1), (1, 5), (1, 7), (1, 10), (3, 8), (4, 1), (4, 2)]
+    assert [(t.line, t.column) for t in RegexLexer(source).tokenize()] == expected
+    assert [(t.line, t.column) for t in Lexer(source).tokenize()] == expected
+    assert [(t.line, t.column) for t in RegexLexer(source).to_buffer().tokenize()] == expected
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,60 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.repl import ReplSession
+
+def feed(session, *lines):
+    return [session.push(line) for line in lines]
+
+@pytest.mark.parametrize("engine", ["tree", "vm", "closure"])
+def test_globals_persist_across_inputs(engine, capsys):
+    session = ReplSession(engine)
+    feed(session, "var x is 41", "x = x + 1", "x")
+    assert capsys.readouterr().out == "42\n"
+
+def test_function_definition_continues_until_blank_line(capsys):
+    session = ReplSession()
+    assert feed(session, "function double n", "    return n * 2", "") == [True, True, False]
+    feed(session, "var y is double 21", "y")
+    assert capsys.readouterr().out == "42\n"
+
+def test_modifiers_open_blocks_only_before_function(capsys):
+    session = ReplSession()
+    assert feed(session, "pure function double n", "    return n * 2", "") == [True, True, False]
+    assert feed(session, "var pure is double(4)", "pure") == [False, False]
+    assert capsys.readouterr().out == "8\n"
+
+def test_incomplete_statement_asks_for_more(capsys):
+    session = ReplSession()
+    assert feed(session, "var x is 5", "if x > 1", '    "big"') == [False, True, False]
+    assert capsys.readouterr().out == "big\n"
+
+def test_errors_keep_the_session_usable(capsys):
+    session = ReplSession()
+    feed(session, "var x is 1")
+    with pytest.raises(Exception, match="Undefined variable"):
+        session.push("missing")
+    assert session.runtime.environment is session.globals
+    feed(session, "x")
+    assert capsys.readouterr().out == "1\n"
+
+def test_repeated_input_reuses_the_parse(capsys):
+    session = ReplSession()
+    feed(session, "var x is 0", "x = x + 1", "x = x + 1", "x")
+    assert capsys.readouterr().out == "2\n"
+    assert session.parsed.hits >= 2
+
+def test_redefining_a_function_clears_memo_caches(capsys):
+    session = ReplSession()
+    feed(session, "function f n", "    return n + 1", "", "var a is f 1")
+    old = session.globals.get("f")
+    assert len(old.cache) == 1
+    feed(session, "function f n", "    return n + 2", "", "var b is f 1", "b")
+    assert capsys.readouterr().out == "3\n"
+    assert len(old.cache) == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__])
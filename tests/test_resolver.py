@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.compiler import Compiler
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.resolver import Resolver
+from src.simple_parser import SimpleParser
+from src.vm import VM
+
+def parse(code):
+    return SimpleParser(RegexLexer(code)).parse()
+
+def test_resolver_annotates_depth_and_slot():
+    program = parse("var a is 1\nfunction f x\n    var y is x + a\n    return y")
+    Resolver().resolve(program)
+    declaration = program.statements[1]
+    local = declaration.body.statements[0]
+    assert (local.depth, local.slot) == (0, 1)
+    assert declaration.param_slots == [0]
+    left, right = local.initializer.left, local.initializer.right
+    assert (left.name, left.depth, left.slot) == ("x", 0, 0)
+    assert (right.name, right.depth, right.slot) == ("a", 1, 0)
+
+def test_unresolved_names_fall_back_to_lookup_by_name():
+    program = parse("missing")
+    Resolver().resolve(program)
+    assert program.statements[0].expression.depth is None
+    with pytest.raises(Exception, match="Undefined variable 'missing'"):
+        Interpreter().interpret(program)
+
+def scoping_program():
+    # var total is 1
+    # function add d n
+    #     if n > 100 var total is 0
+    #     total = total + n
+    #     return total
+    # add 0 5
+    # { var total is 40  total = total + 2  total }
+    # total
+    body = IndentedBlock([
+        IfStatement(BinaryOp(Identifier("n"), ">", NumberLiteral(100)),
+                    VariableDeclaration("total", NumberLiteral(0))),
+        Assignment("total", BinaryOp(Identifier("total"), "+", Identifier("n"))),
+        ReturnStatement(Identifier("total")),
+    ])
+    return Program([
+        VariableDeclaration("total", NumberLiteral(1)),
+        FunctionDeclaration("add", ["d", "n"], body),
+        ExpressionStatement(FunctionCall(Identifier("add"), [NumberLiteral(0), NumberLiteral(5)])),
+        Block([
+            VariableDeclaration("total", NumberLiteral(40)),
+            Assignment("total", BinaryOp(Identifier("total"), "+", NumberLiteral(2))),
+            ExpressionStatement(Identifier("total")),
+        ]),
+        ExpressionStatement(Identifier("total")),
+    ])
+
+def test_slot_frames_keep_dynamic_scoping_rules(capsys):
+    Interpreter().interpret(scoping_program())
+    assert capsys.readouterr().out == "6\n42\n6\n"
+    VM().run(Compiler().compile(scoping_program()))
+    assert capsys.readouterr().out == "6\n42\n6\n"
+
+def test_globals_persist_across_interpret_calls(capsys):
+    interpreter = Interpreter()
+    interpreter.interpret(parse("var a is 2"))
+    interpreter.interpret(parse("var b is a * 21\nb"))
+    assert capsys.readouterr().out == "42\n"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
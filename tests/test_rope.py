@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.execution import parse, run_captured
+from src.interpreter import Interpreter
+from src.rope import ROPE_THRESHOLD, Rope, concat
+
+def test_short_concatenations_stay_strings():
+    assert concat("a", 1) == "a1"
+    assert type(concat("a", "b")) is str
+
+def test_long_concatenations_build_ropes():
+    head = "x" * ROPE_THRESHOLD
+    rope = concat(head, "y")
+    assert type(rope) is Rope
+    longer = concat(concat(rope, "z"), 1.5)
+    assert len(longer) == ROPE_THRESHOLD + 5
+    assert str(longer) == head + "yz1.5"
+    assert longer == head + "yz1.5" and head + "yz1.5" == longer
+    assert longer != head
+    assert hash(longer) == hash(head + "yz1.5")
+
+def test_older_ropes_keep_their_value():
+    base = concat("x" * ROPE_THRESHOLD, "!")
+    first = concat(base, "a")
+    second = concat(base, "b")
+    assert str(first).endswith("!a")
+    assert str(second).endswith("!b")
+    assert str(base).endswith("!")
+    assert str(concat(first, "c")).endswith("!ac")
+
+def test_loop_builds_rope_and_prints_flat_string(capsys):
+    program = parse(
+        'var s is ""\n'
+        'var i is 0\n'
+        'function tick d\n'
+        '    var t is d\n'
+        '    s = s + "line " + i + ","\n'
+        '    i = i + 1\n'
+        '    return nil\n'
+        'while i < 500 tick 0\n'
+        'var same is s == s + ""\n'
+        'same\n'
+        's\n'
+    )
+    interpreter = Interpreter()
+    interpreter.interpret(program)
+    expected = "".join(f"line {i}," for i in range(500))
+    assert type(interpreter.globals.get("s")) is Rope
+    assert capsys.readouterr().out == f"True\n{expected}\n"
+
+def test_memory_limit_sees_ropes():
+    result = run_captured('var s is "' + "x" * ROPE_THRESHOLD + '"\nwhile true s = s + "abcdefgh"',
+                          limits={'max_memory': 64 * 1024})
+    assert result['limit']['kind'] == 'memory'
+
+if __name__ == "__main__":
+    pytest.main([__file__])
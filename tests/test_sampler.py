@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+import pytest
+
+from src.ast import *
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.sampler import Sampler, jan_stack
+from src.simple_parser import SimpleParser
+
+def parse(source):
+    return SimpleParser(RegexLexer(source)).parse()
+
+class StackRecorder(Interpreter):
+    # Captures the Jan stack at the innermost statement of the program.
+    def __init__(self):
+        super().__init__(memo_size=0)
+        self.stacks = []
+
+    def execute(self, stmt):
+        if isinstance(stmt, VariableDeclaration) and stmt.name == 'probe':
+            self.stacks.append(jan_stack(sys._getframe()))
+        return super().execute(stmt)
+
+def test_stack_is_rebuilt_from_call_frames():
+    source = ("function outer d\n"
+              "    var x is d\n"
+              "    inner 0\n"
+              "    return nil\n")
+    inner = parse("function inner d\n    var t is d\n    var probe is 1\n    return nil").statements
+    program = parse(source)
+    interpreter = StackRecorder()
+    interpreter.interpret(Program(inner + program.statements + parse("outer 0").statements))
+    assert interpreter.stacks == [["<program>:1", "outer:3", "inner:3"]]
+
+def test_sampler_collects_collapsed_stacks(capsys):
+    source = ('var i is 0\n'
+              'function tick d\n'
+              '    var t is d\n'
+              '    i = i + 1\n'
+              '    return nil\n'
+              'while i < 20000 tick 0\n'
+              'var done is i\n')
+    program = parse(source)
+    with Sampler(interval=0.001) as sampler:
+        Interpreter().interpret(program)
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('<program>')
+        assert int(count) > 0
+    assert any(';tick' in line for line in lines)
+
+def test_sampler_ignores_other_threads():
+    sampler = Sampler(thread_id=threading.get_ident() + 1)
+    sampler.sample()
+    assert sampler.collapsed() == ""
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import contextlib
+import http.client
+import json
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from src.execution import run_captured
+from src import server as server_module
+from src.server import PlaygroundServer, WorkerPool
+
+def test_run_captured_returns_output_and_timing():
+    result = run_captured('var x is 6 * 7\n"done"\nx')
+    assert result['output'] == "done\n42\n"
+    assert result['error'] is None
+    assert result['timing']['parse_ms'] >= 0 and result['timing']['run_ms'] >= 0
+
+def test_run_captured_reports_errors_and_truncates():
+    assert run_captured("var x is 1 / 0")['error'] == "Division by zero"
+    result = run_captured('var i is 0\nwhile i < 100 i = i + 1\n"' + "x" * 50 + '"', max_output=10)
+    assert result['truncated'] and result['output'] == "x" * 10
+
+def test_run_captured_enforces_time_limit():
+    result = run_captured("var i is 0\nwhile true i = i + 1", timeout=0.2)
+    assert result['error'] == "Time limit of 0.2s exceeded"
+
+@contextlib.contextmanager
+def running_server(workers, **options):
+    server = PlaygroundServer(('127.0.0.1', 0), workers, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        workers.close()
+
+@pytest.fixture(scope="module")
+def server():
+    with running_server(WorkerPool(processes=2, timeout=2)) as url:
+        yield url
+
+def post(url, body):
+    request = urllib.request.Request(url + "/run", json.dumps(body).encode(), {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_server_runs_snippets(server):
+    status, result = post(server, {'code': 'var x is 40 + 2\nx', 'engine': 'vm'})
+    assert status == 200
+    assert result['output'] == "42\n"
+    assert result['timing']['total_ms'] >= result['timing']['run_ms']
+
+def test_server_handles_concurrent_requests(server):
+    results = []
+    def run(i):
+        results.append(post(server, {'code': f'var x is {i}\nx'}))
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(result['output'] for status, result in results) == sorted(f"{i}\n" for i in range(8))
+
+def test_server_rejects_bad_requests(server):
+    assert post(server, {'code': 42})[0] == 400
+    assert post(server, {'code': 'x', 'engine': 'jit'})[0] == 400
+    with urllib.request.urlopen(server + "/health") as response:
+        assert json.loads(response.read())['status'] == 'ok'
+
+def post_raw(url, body, headers):
+    connection = http.client.HTTPConnection(url[len("http://"):])
+    connection.request("POST", "/run", body, headers)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read()), response.getheader('Access-Control-Allow-Origin')
+    connection.close()
+    return result
+
+def test_server_rejects_malformed_bodies(server):
+    status, result, origin = post_raw(server, b'[]', {'Content-Type': 'application/json'})
+    assert status == 400 and result['error'] == 'Request body must be a JSON object'
+    assert origin is None
+    assert post_raw(server, b'"x"', {})[0] == 400
+    status, result, origin = post_raw(server, b'{}', {'Content-Length': 'abc'})
+    assert status == 400 and result['error'] == 'Invalid Content-Length'
+
+def test_server_sends_cors_headers_only_when_configured():
+    with running_server(WorkerPool(processes=1, timeout=2), cors_origin='http://localhost:3000') as url:
+        assert post_raw(url, b'{"code": "1"}', {})[2] == 'http://localhost:3000'
+
+def test_server_with_limits_offers_only_the_tree_engine():
+    with running_server(WorkerPool(processes=1, timeout=2, limits={'max_statements': 100})) as url:
+        with urllib.request.urlopen(url + "/health") as response:
+            assert json.loads(response.read())['engines'] == ['tree']
+        status, result = post(url, {'code': '1', 'engine': 'vm'})
+        assert status == 400 and result['error'] == "'engine' must be one of tree"
+        status, result = post(url, {'code': '1'})
+        assert status == 200 and result['output'] == "1\n"
+
+def wedged_job(code, *rest):
+    # The other request is still running when the wedged one is killed.
+    time.sleep(60 if code == 'wedged' else 1.2)
+    return run_captured(code)
+
+@pytest.mark.skipif(not hasattr(__import__('os'), 'fork'), reason="needs fork to patch the workers")
+def test_timeout_replaces_only_the_stuck_worker(monkeypatch):
+    monkeypatch.setattr(server_module, 'run_job', wedged_job)
+    workers = WorkerPool(processes=2, timeout=0.5)
+    results = {}
+    def run(code):
+        results[code] = workers.run(code)
+    threads = [threading.Thread(target=run, args=(code,)) for code in ('wedged', '"fine"')]
+    try:
+        threads[0].start()
+        time.sleep(0.8)
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+        assert results['wedged']['error'] == "Time limit of 0.5s exceeded"
+        assert results['"fine"']['output'] == "fine\n"
+    finally:
+        workers.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__])
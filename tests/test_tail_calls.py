@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.execution import ENGINES, execute, run_captured
+from src.interpreter import Interpreter, Return
+from tests.programs import parse, sum_to_program
+
+def test_tail_recursion_runs_in_constant_stack(capsys):
+    n = sys.getrecursionlimit() * 20
+    Interpreter().interpret(sum_to_program(n))
+    assert capsys.readouterr().out == f"{n * (n + 1) // 2}\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_agree_on_deep_tail_recursion(engine, capsys):
+    n = sys.getrecursionlimit() * 10
+    execute(sum_to_program(n), engine)
+    assert capsys.readouterr().out == f"{n * (n + 1) // 2}\n"
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_tail_call_errors_and_top_level_returns(engine):
+    assert run_captured("function f x\n    return g(x)\nf(1)", engine)['error'] == "Undefined variable 'g'"
+    assert run_captured("function f x\n    return len(x, 1)\nf(1)", engine)['error'] == "Expected 1 arguments but got 2"
+    assert run_captured("function f x\n    return x + 1\nreturn f(1)", engine)['output'] == "2\n"
+
+def test_return_from_inside_loop(capsys):
+    source = "function first d limit\n    var i is 0\n    while i < 100 if i * i > limit return i else i = i + 1\n    return nil\nfirst 0 50"
+    Interpreter().interpret(parse(source))
+    assert capsys.readouterr().out == "8\n"
+
+def test_top_level_return_still_escapes():
+    with pytest.raises(Return) as raised:
+        Interpreter().interpret(Program([ReturnStatement(NumberLiteral(3))]))
+    assert raised.value.value == 3
+
+if __name__ == "__main__":
+    pytest.main([__file__])
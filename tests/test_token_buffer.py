@@ -0,0 +1,44 @@
+import sys
+import os
+import glob
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.interpreter import Interpreter
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+from src.tokens import Token, TokenType
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+def token_tuples(tokens):
+    return [(token.type, token.value, token.line, token.column) for token in tokens]
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(EXAMPLES, "*.jan"))))
+def test_token_buffer_matches_regex_lexer(path):
+    with open(path) as f:
+        source = f.read()
+    buffer = RegexLexer(source).to_buffer()
+    assert token_tuples(buffer.tokenize()) == token_tuples(RegexLexer(source).tokenize())
+
+def test_token_buffer_lexemes_are_lazy_slices():
+    buffer = RegexLexer('var s is "a\\tb"\n  s').to_buffer()
+    assert len(buffer) == 6
+    assert buffer.lexeme(3) == '"a\\tb"'
+    assert buffer.value(3) == "a\tb"
+    assert buffer.type(4) == TokenType.IDENTIFIER
+    assert (buffer.line(4), buffer.column(4)) == (2, 3)
+    assert buffer.token(5).type == TokenType.EOF
+
+def test_parsers_accept_token_buffer(capsys):
+    source = 'var a is 10\nvar b is a * 2 + 1\nb'
+    Interpreter().interpret(SimpleParser(RegexLexer(source).to_buffer()).parse())
+    assert capsys.readouterr().out == "21\n"
+
+def test_token_has_slots():
+    token = Token(TokenType.NUMBER, 1, 1, 1)
+    assert not hasattr(token, "__dict__")
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.lexer import RegexLexer
+from src.simple_parser import SimpleParser
+from src.tokens import TokenStream, TokenType
+
+def test_token_stream_peek_and_next():
+    stream = TokenStream(RegexLexer("var x is 1"))
+    assert stream.peek().type == TokenType.VAR
+    assert stream.peek(2).type == TokenType.IDENTIFIER
+    assert stream.next().type == TokenType.VAR
+    assert stream.next().value == "x"
+    assert stream.next().type == TokenType.IS
+    assert stream.next().value == 1
+    assert stream.next().type == TokenType.EOF
+    assert stream.next().type == TokenType.EOF
+
+def test_token_stream_lookahead_is_bounded():
+    stream = TokenStream(RegexLexer("a b c d"), lookahead=2)
+    with pytest.raises(Exception, match="Lookahead"):
+        stream.peek(3)
+
+def test_parser_pulls_tokens_lazily():
+    pulled = []
+
+    def tokens():
+        for token in RegexLexer("var a is 1\nvar b is a + 2\nb").tokenize():
+            pulled.append(token)
+            yield token
+
+    parser = SimpleParser(tokens())
+    first = parser.parse_statement()
+    assert isinstance(first, VariableDeclaration)
+    assert len(pulled) <= 6
+    assert len(parser.stream.buffer) <= parser.stream.lookahead
+
+def test_variable_declaration_from_identifier_expression():
+    program = SimpleParser(RegexLexer("var a is 1\nvar b is a + 2")).parse()
+    initializer = program.statements[1].initializer
+    assert isinstance(initializer, BinaryOp)
+    assert initializer.left.name == "a"
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from src.ast import *
+from src.compiler import Compiler
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.simple_parser import SimpleParser
+from src.vm import VM
+from tests.programs import fib_program
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples")
+
+def parse(code):
+    return SimpleParser(Lexer(code)).parse()
+
+def run_both(program, capsys):
+    Interpreter().interpret(program)
+    expected = capsys.readouterr().out
+    VM().run(Compiler().compile(program))
+    assert capsys.readouterr().out == expected
+    return expected
+
+@pytest.mark.parametrize("name", ["function_test", "hello", "simple_func", "test_arithmetic", "test_func"])
+def test_vm_matches_interpreter_on_examples(name, capsys):
+    with open(os.path.join(EXAMPLES, name + ".jan")) as f:
+        program = parse(f.read())
+    assert run_both(program, capsys)
+
+def test_vm_while_loop(capsys):
+    program = parse('var i is 0\nwhile i < 10 i = i + 1\n"done " + i\ni')
+    assert run_both(program, capsys) == "done 10\n10\n"
+
+def test_vm_recursion(capsys):
+    assert run_both(fib_program(15), capsys) == "610\n"
+
+def test_vm_runtime_errors():
+    with pytest.raises(Exception, match="Division by zero"):
+        VM().run(Compiler().compile(parse("10 / 0")))
+    with pytest.raises(Exception, match="Can only call functions"):
+        VM().run(Compiler().compile(Program([ExpressionStatement(FunctionCall(NumberLiteral(1), []))])))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
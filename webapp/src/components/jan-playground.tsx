@@ -15,65 +15,100 @@ var message is "Hello from Jan!"
 message
 x + 8`
 
+const JAN_SERVER_URL = process.env.NEXT_PUBLIC_JAN_SERVER_URL ?? "http://127.0.0.1:8765"
+
+type RunResult = {
+  output: string
+  truncated: boolean
+  error: string | null
+  timing: { parse_ms: number; run_ms: number; total_ms: number }
+}
+
+// Used when the local Jan server (python3 jan.py serve) is not running
+function simulate(code: string): string[] {
+  const lines = code.split('\n').filter(line => line.trim())
+  const results: string[] = []
+  
+  for (const line of lines) {
+    if (line.trim().startsWith('//')) continue // Skip comments
+    
+    // Simple simulation of Jan execution
+    if (line.includes('var') && line.includes('is')) {
+      // Variable declaration
+      const match = line.match(/var\s+(\w+)\s+is\s+(.+)/)
+      if (match) {
+        const [, varName, value] = match
+        results.push(`✓ Declared ${varName} = ${value.trim()}`)
+      }
+    } else if (line.includes('function')) {
+      // Function declaration
+      const match = line.match(/function\s+(\w+)\s+(\w+)/)
+      if (match) {
+        const [, funcName, param] = match
+        results.push(`✓ Defined function ${funcName}(${param})`)
+      }
+    } else if (line.trim() && !line.includes('if') && !line.includes('else')) {
+      // Expression or function call
+      const trimmed = line.trim()
+      if (trimmed.includes('"')) {
+        results.push(`→ ${trimmed}`)
+      } else if (trimmed.match(/\d+/)) {
+        results.push(`→ ${trimmed}`)
+      } else {
+        results.push(`→ Executed: ${trimmed}`)
+      }
+    }
+  }
+  return results
+}
+
+async function runOnServer(code: string): Promise<RunResult> {
+  const response = await fetch(`${JAN_SERVER_URL}/run`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ code }),
+  })
+  if (!response.ok) {
+    throw new Error(`Jan server responded with ${response.status}`)
+  }
+  return response.json()
+}
+
 export function JanPlayground() {
   const [code, setCode] = useState(defaultCode)
   const [output, setOutput] = useState<string[]>([])
   const [isRunning, setIsRunning] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const [timing, setTiming] = useState<RunResult["timing"] | null>(null)
 
   const runCode = async () => {
     setIsRunning(true)
     setError(null)
     setOutput([])
 
+    let result: RunResult
     try {
-      // For now, we'll simulate running Jan code
-      // In a real implementation, this would call the Jan interpreter
-      const lines = code.split('\n').filter(line => line.trim())
-      const results: string[] = []
-      
-      for (const line of lines) {
-        if (line.trim().startsWith('//')) continue // Skip comments
-        
-        // Simple simulation of Jan execution
-        if (line.includes('var') && line.includes('is')) {
-          // Variable declaration
-          const match = line.match(/var\s+(\w+)\s+is\s+(.+)/)
-          if (match) {
-            const [, varName, value] = match
-            results.push(`✓ Declared ${varName} = ${value.trim()}`)
-          }
-        } else if (line.includes('function')) {
-          // Function declaration
-          const match = line.match(/function\s+(\w+)\s+(\w+)/)
-          if (match) {
-            const [, funcName, param] = match
-            results.push(`✓ Defined function ${funcName}(${param})`)
-          }
-        } else if (line.trim() && !line.includes('if') && !line.includes('else')) {
-          // Expression or function call
-          const trimmed = line.trim()
-          if (trimmed.includes('"')) {
-            results.push(`→ ${trimmed}`)
-          } else if (trimmed.match(/\d+/)) {
-            results.push(`→ ${trimmed}`)
-          } else {
-            results.push(`→ Executed: ${trimmed}`)
-          }
-        }
-      }
-      
-      setOutput(results)
-    } catch (err) {
-      setError(err instanceof Error ? err.message : 'An error occurred')
-    } finally {
+      result = await runOnServer(code)
+    } catch {
+      setTiming(null)
+      setOutput(simulate(code))
       setIsRunning(false)
+      return
     }
+
+    const lines = result.output.split('\n')
+    if (lines[lines.length - 1] === '') lines.pop()
+    if (result.truncated) lines.push('… output truncated')
+    setOutput(lines)
+    setError(result.error)
+    setTiming(result.timing)
+    setIsRunning(false)
   }
 
   const clearOutput = () => {
     setOutput([])
     setError(null)
+    setTiming(null)
   }
 
   const loadExample = (exampleCode: string) => {
@@ -176,7 +211,14 @@ sum`)}
               )}
             </div>
             <div className="mt-4 text-xs text-slate-400">
-              <p>💡 This is a simulation. In a real implementation, this would run the actual Jan interpreter.</p>
+              {timing ? (
+                <p>
+                  ⚡ Ran on the local Jan server in {timing.total_ms.toFixed(1)} ms
+                  (parse {timing.parse_ms.toFixed(1)} ms, run {timing.run_ms.toFixed(1)} ms)
+                </p>
+              ) : (
+                <p>💡 Start the Jan server with <code>python3 jan.py serve</code> to run real code; until then this is a simulation.</p>
+              )}
             </div>
           </CardContent>
         </Card>